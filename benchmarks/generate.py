@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import codecs
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.writer import XlsxChunkWriter
+
+# Column kinds cycled through (after the leading id column) as the width grows
+COLUMN_KINDS = ("float", "int", "category", "date", "mixed", "flag", "text")
+
+DEFAULT_SPEC = {
+    "columns": 8,
+    "missing_ratio": 0.05,
+    "duplicate_ratio": 0.02,
+    "outlier_rate": 0.01,
+    "mixed_ratio": 0.02,
+    "seed": 0,
+}
+
+_CITIES = ["Amman", "Irbid", "Zarqa", "Aqaba", "Madaba", "Karak", "Salt", "Jerash", "Zürich", "Montréal", "São Paulo",
+           "Kraków", "عمّان", "إربد", "الزرقاء"]
+_NAMES = ["Ali", "Sara", "Omar", "Lina", "Yousef", "Abeer", "Hassan", "Noor", "José", "Zoë", "Renée", "Łukasz",
+          "علي", "سارة", "عمر"]
+_FLAGS = ["yes", "no", "Y", "N", "true", "false", "1", "0"]
+_JUNK = ["N/A", "-", "unknown", "?", "n.a."]
+_DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m-%d-%Y %H:%M"]
+
+
+def encodable(values: list[str], encoding: str) -> list[str]:
+    """
+    The values that `encoding` can represent in any letter case
+    (e.g. no Arabic in cp1252, no "MONTRÉAL" in cp1256).
+    """
+    kept = []
+    for value in values:
+        try:
+            for variant in (value, value.lower(), value.upper()):
+                variant.encode(encoding)
+        except UnicodeEncodeError:
+            continue
+        kept.append(value)
+    return kept
+
+
+def column_names(columns: int) -> list[str]:
+    names = ["id"]
+    for i in range(columns - 1):
+        kind = COLUMN_KINDS[i % len(COLUMN_KINDS)]
+        names.append(f"{kind}_{i // len(COLUMN_KINDS) + 1}")
+    return names
+
+
+def _messy_case(values: np.ndarray, rng: np.random.Generator, ratio: float) -> np.ndarray:
+    # Client-style spelling variants: padded, lower-case, upper-case
+    values = values.astype(object)
+    picked = np.flatnonzero(rng.random(values.size) < ratio)
+    variant = rng.integers(0, 3, picked.size)
+    text = pd.Series(values[picked], dtype=object)
+    values[picked] = np.where(variant == 0, " " + text + " ", np.where(variant == 1, text.str.lower(), text.str.upper()))
+    return values
+
+
+def _column(kind: str, rows: int, rng: np.random.Generator, spec: dict, vocab: dict) -> np.ndarray:
+    mixed = spec["mixed_ratio"]
+
+    if kind == "float":
+        values = np.round(rng.normal(3000.0, 600.0, rows), 2)
+        spikes = rng.random(rows) < spec["outlier_rate"]
+        values[spikes] = np.round(values[spikes] * rng.choice([-20.0, 20.0], int(spikes.sum())), 2)
+        return values
+
+    if kind == "int":
+        values = rng.integers(18, 80, rows)
+        spikes = rng.random(rows) < spec["outlier_rate"]
+        values[spikes] = rng.integers(500, 1000, int(spikes.sum()))
+        return values
+
+    if kind == "category":
+        return _messy_case(rng.choice(vocab["cities"], rows), rng, mixed)
+
+    if kind == "date":
+        days = rng.integers(0, 3650, rows).astype("timedelta64[D]")
+        dates = pd.Series(np.datetime64("2015-01-01") + days)
+        values = dates.dt.strftime(_DATE_FORMATS[0]).to_numpy(dtype=object)
+        odd = np.flatnonzero(rng.random(rows) < mixed)
+        if odd.size:
+            fmt = _DATE_FORMATS[1:][int(rng.integers(0, len(_DATE_FORMATS) - 1))]
+            values[odd] = dates.iloc[odd].dt.strftime(fmt).to_numpy(dtype=object)
+        return values
+
+    if kind == "mixed":
+        # mostly numbers written as text, with thousands separators and junk tokens
+        numbers = np.round(rng.gamma(2.0, 500.0, rows), 1)
+        values = numbers.astype(str).astype(object)
+        grouped = np.flatnonzero(rng.random(rows) < mixed)
+        values[grouped] = [f"{value:,.1f}" for value in numbers[grouped]]
+        junk = np.flatnonzero(rng.random(rows) < mixed)
+        values[junk] = rng.choice(_JUNK, junk.size)
+        return values
+
+    if kind == "flag":
+        return rng.choice(_FLAGS, rows).astype(object)
+
+    return rng.choice(vocab["names"], rows).astype(object)
+
+
+def messy_chunk(rows: int, spec: dict, rng: np.random.Generator, start: int = 0, encoding: str = "utf-8") -> pd.DataFrame:
+    """
+    One block of a synthetic client dataset: ids from `start`, then columns of
+    every kind in COLUMN_KINDS with missing cells, IQR outliers, mixed-type
+    text, several date formats, spelling variants and exact duplicate rows.
+    Text values are limited to what `encoding` can write.
+    """
+    vocab = {"cities": encodable(_CITIES, encoding), "names": encodable(_NAMES, encoding)}
+    data = {"id": np.arange(start, start + rows, dtype="int64")}
+
+    for name in column_names(spec["columns"])[1:]:
+        kind = name.rsplit("_", 1)[0]
+        values = _column(kind, rows, rng, spec, vocab)
+        missing = rng.random(rows) < spec["missing_ratio"]
+        if missing.any():
+            if kind == "int":
+                values = values.astype("float64")
+            values[missing] = None if values.dtype == object else np.nan
+        data[name] = values
+
+    # Exact copies of other rows, ids included, as left by double exports
+    copies = int(round(rows * spec["duplicate_ratio"]))
+    if copies and rows > 1:
+        targets = rng.choice(rows, size=copies, replace=False)
+        sources = rng.integers(0, rows, copies)
+        for values in data.values():
+            values[targets] = values[sources]
+
+    return pd.DataFrame(data)
+
+
+def write_dataset(
+    path: Path,
+    rows: int,
+    spec: dict | None = None,
+    *,
+    encoding: str = "utf-8",
+    sep: str = ",",
+    chunk_rows: int = 500_000,
+) -> Path:
+    """
+    Write a synthetic messy dataset of `rows` rows to a CSV/TXT or .xlsx file,
+    block by block so memory stays flat up to 1e8 rows and beyond. The same
+    spec and seed always produce the same file.
+    """
+    spec = {**DEFAULT_SPEC, **(spec or {})}
+    if spec["columns"] < 1:
+        raise ValueError(f"columns must be at least 1, got {spec['columns']}")
+    codecs.lookup(encoding)
+
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in (".csv", ".txt", ".xlsx"):
+        raise ValueError(f"Unsupported output format: {suffix} (use .csv, .txt or .xlsx)")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    def blocks():
+        for i, start in enumerate(range(0, rows, chunk_rows)):
+            rng = np.random.default_rng([spec["seed"], i])
+            yield messy_chunk(min(chunk_rows, rows - start), spec, rng, start, encoding)
+
+    if suffix == ".xlsx":
+        writer = XlsxChunkWriter(path)
+        for block in blocks():
+            writer.write(block)
+        writer.close(column_names(spec["columns"]))
+        return path
+
+    with open(path, "w", encoding=encoding, newline="") as f:
+        for i, block in enumerate(blocks()):
+            block.to_csv(f, sep=sep, index=False, header=i == 0)
+    return path
+
+
+def _count(text: str) -> int:
+    # accepts 100000, 1e5 or 100_000
+    return int(float(text.replace("_", "")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic messy dataset for testing and benchmarks")
+    parser.add_argument("output", help="Output file (.csv, .txt or .xlsx).")
+    parser.add_argument("--rows", type=_count, default=100_000, help="Rows, e.g. 1e6 (default: 100000).")
+    parser.add_argument("--columns", type=int, default=DEFAULT_SPEC["columns"], help="Columns, id included.")
+    parser.add_argument("--missing-ratio", type=float, default=DEFAULT_SPEC["missing_ratio"])
+    parser.add_argument("--duplicate-ratio", type=float, default=DEFAULT_SPEC["duplicate_ratio"])
+    parser.add_argument("--outlier-rate", type=float, default=DEFAULT_SPEC["outlier_rate"])
+    parser.add_argument(
+        "--mixed-ratio",
+        type=float,
+        default=DEFAULT_SPEC["mixed_ratio"],
+        help="Share of odd values: junk tokens in numeric text, other date formats, case variants.",
+    )
+    parser.add_argument("--encoding", default="utf-8", help="e.g. utf-8, utf-8-sig, cp1252, cp1256.")
+    parser.add_argument("--sep", default=",", help="CSV separator (default: ',').")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SPEC["seed"])
+    parser.add_argument("--chunk-rows", type=_count, default=500_000, help="Rows generated per block.")
+    args = parser.parse_args()
+
+    spec = {
+        "columns": args.columns,
+        "missing_ratio": args.missing_ratio,
+        "duplicate_ratio": args.duplicate_ratio,
+        "outlier_rate": args.outlier_rate,
+        "mixed_ratio": args.mixed_ratio,
+        "seed": args.seed,
+    }
+    path = write_dataset(Path(args.output), args.rows, spec, encoding=args.encoding, sep=args.sep,
+                         chunk_rows=args.chunk_rows)
+    print(f"Wrote {args.rows} rows x {args.columns} columns to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import ctypes
+import gc
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.generate import _count
+from benchmarks.run import BENCH_CONFIG, BENCH_DIR, DEFAULT_DATA_DIR, dataset
+
+REPO_DIR = BENCH_DIR.parent
+
+# Peak memory of the cleaning stages, as a multiple of the input frame's size
+DEFAULT_LIMIT = 1.5
+
+# Rows of the warm-up run before measuring
+WARMUP_ROWS = 1000
+
+# Allocator settings of the measuring process: glibc returns every block over
+# 128 KB to the OS when freed and Arrow allocates through malloc, so resident
+# memory follows live buffers instead of what the allocators keep for reuse
+MEASURE_ENV = {"MALLOC_MMAP_THRESHOLD_": "131072", "ARROW_DEFAULT_MEMORY_POOL": "system"}
+
+# handle_* keyword arguments per execution mode; the limit applies to "inplace",
+# the mode main.py uses unless execution.copy is set
+MODES = {
+    "inplace": {"copy": False, "inplace": True},
+    "shared": {"copy": False},
+    "copy": {"copy": True},
+}
+
+
+def _release_free_memory() -> None:
+    # Hand freed heap pages back to the OS, so memory reused by the stages counts in the peak
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass  # not glibc
+
+
+def measure(path: Path, mode: str) -> dict:
+    """
+    Peak RSS of the four cleaning stages on the CSV at `path`, run as main.py
+    runs them (one shared ColumnStats), above the memory held once the input
+    is loaded. Run it in a fresh process: earlier work would hide allocations
+    in already-resident memory.
+    """
+    from src.cleaner import (
+        enable_copy_on_write,
+        handle_duplicates,
+        handle_missing_values,
+        handle_outliers,
+        handle_scaling,
+    )
+    from src.column_stats import ColumnStats
+    from src.loader import load_data
+    from src.perf import peak_rss, reset_peak_rss
+
+    stages = (handle_missing_values, handle_duplicates, handle_outliers, handle_scaling)
+    enable_copy_on_write()
+    frame = load_data(str(path))
+    input_bytes = int(frame.memory_usage(deep=True).sum())
+
+    # Run once on a few rows first: imports and first calls into pandas/Arrow
+    # kernels cost the same on any input and are not part of the bound
+    sample = frame.head(WARMUP_ROWS).copy()
+    sample_stats = ColumnStats(sample)
+    for stage in stages:
+        sample, _ = stage(sample, BENCH_CONFIG, sample_stats, **MODES[mode])
+    del sample, sample_stats
+
+    stats = ColumnStats(frame)
+
+    gc.collect()
+    _release_free_memory()
+    if not reset_peak_rss():
+        raise SystemExit("Measuring the peak of one step needs Linux (/proc/self/clear_refs).")
+    start = peak_rss()
+    for stage in stages:
+        frame, _ = stage(frame, BENCH_CONFIG, stats, **MODES[mode])
+    extra = peak_rss() - start
+    return {"input_bytes": input_bytes, "extra_bytes": extra, "peak_ratio": 1 + extra / input_bytes}
+
+
+def measure_in_subprocess(path: Path, mode: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory", "--measure", str(path), mode],
+        cwd=REPO_DIR,
+        env={**os.environ, **MEASURE_ENV},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check that the cleaning stages' peak memory stays within a multiple of the input size"
+    )
+    parser.add_argument(
+        "--rows",
+        type=_count,
+        nargs="+",
+        default=[1_000_000],
+        help="Dataset sizes in rows (default: 1e6; below about 1e5 rows fixed overheads dominate).",
+    )
+    parser.add_argument("--columns", type=int, nargs="+", default=[12], help="Dataset widths (default: 12).")
+    parser.add_argument(
+        "--limit",
+        type=float,
+        default=DEFAULT_LIMIT,
+        help=f"Largest peak allowed in in-place mode, in input sizes (default: {DEFAULT_LIMIT}).",
+    )
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Where generated datasets are kept.")
+    parser.add_argument("--measure", nargs=2, metavar=("CSV", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        path, mode = args.measure
+        print(json.dumps(measure(Path(path), mode)))
+        return
+
+    failures = []
+    print(f"{'dataset':<32}  {'input':>9}  " + "  ".join(f"{mode:>8}" for mode in MODES))
+    for columns in args.columns:
+        for rows in args.rows:
+            path = dataset(rows, columns, Path(args.data_dir))
+            results = {mode: measure_in_subprocess(path, mode) for mode in MODES}
+            input_mb = results["inplace"]["input_bytes"] / 1e6
+            ratios = "  ".join(f"{results[mode]['peak_ratio']:>7.2f}x" for mode in MODES)
+            print(f"{path.name:<32}  {input_mb:>7.1f}MB  {ratios}")
+            if results["inplace"]["peak_ratio"] > args.limit:
+                failures.append(path.name)
+
+    if failures:
+        print(f"Peak memory over {args.limit}x the input in in-place mode: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"In-place peak memory within {args.limit}x the input on every dataset")
+
+
+if __name__ == "__main__":
+    main()
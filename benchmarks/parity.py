@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate import _count
+from benchmarks.run import DEFAULT_DATA_DIR, dataset
+from src.cleaner import (
+    enable_copy_on_write,
+    handle_duplicates,
+    handle_missing_values,
+    handle_outliers,
+    handle_scaling,
+)
+from src.column_stats import ColumnStats
+from src.engines import ENGINES, run_engine
+from src.loader import load_data
+from src.writer import save_data
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+METRIC_KEYS = ["rows_before", "rows_after", "missing_handled", "duplicates_removed", "outliers_removed", "scaling_applied"]
+
+# pandas and the engines sum floats in different orders, so computed statistics can differ
+# in the last bits; ATOL covers standardized values near 0, where a last-bit difference in
+# the mean is a large relative error
+RTOL = 1e-9
+ATOL = 1e-9
+
+# Settings combinations checked on every dataset
+CONFIGS = {
+    "median-mode-remove-cap-standard": {
+        "missing": {"numeric": {"strategy": "median"}, "text": {"strategy": "mode"}},
+        "duplicates": {"strategy": "remove"},
+        "outliers": {"method": "IQR", "action": "cap"},
+        "scaling": {"numeric": "standard"},
+    },
+    "mean-unknown-keeplast-drop-minmax": {
+        "missing": {"numeric": {"strategy": "mean"}, "text": {"strategy": "Unknown"}},
+        "duplicates": {"strategy": "keep_last"},
+        "outliers": {"method": "IQR", "action": "drop"},
+        "scaling": {"numeric": "minmax"},
+    },
+    "drop-constant-subset-drop-none": {
+        "missing": {"numeric": {"strategy": "drop"}, "text": {"strategy": "constant", "fill_value": "n/a"}},
+        "duplicates": {"strategy": "remove", "subset": ["id"]},
+        "outliers": {"method": "IQR", "action": "drop"},
+        "scaling": {"numeric": "none"},
+    },
+    "zero-drop-none-flag-standard": {
+        "missing": {"numeric": {"strategy": "zero"}, "text": {"strategy": "drop"}},
+        "duplicates": {"strategy": "none"},
+        "outliers": {"method": "IQR", "action": "flag"},
+        "scaling": {"numeric": "standard"},
+    },
+    "median-drop-none-flag-none": {
+        "missing": {"numeric": {"strategy": "median"}, "text": {"strategy": "drop"}},
+        "duplicates": {"strategy": "none"},
+        "outliers": {"method": "IQR", "action": "flag"},
+        "scaling": {"numeric": "none"},
+    },
+    "drop-mode-none-flag-none": {
+        "missing": {"numeric": {"strategy": "drop"}, "text": {"strategy": "mode"}},
+        "duplicates": {"strategy": "none"},
+        "outliers": {"method": "IQR", "action": "flag"},
+        "scaling": {"numeric": "none"},
+    },
+    "constant-mode-keepfirst-cap-none": {
+        "missing": {"numeric": {"strategy": "constant", "fill_value": -1}, "text": {"strategy": "mode"}},
+        "duplicates": {"strategy": "keep_first"},
+        "outliers": {"method": "IQR", "action": "cap"},
+        "scaling": {"numeric": "none"},
+    },
+}
+
+
+def reference(input_path: Path, output_path: Path, config: dict) -> dict:
+    """
+    The pandas pipeline's cleaning stages, as run by main.py in memory.
+    """
+    df = load_data(str(input_path))
+    metrics = {"rows_before": len(df)}
+    df, metrics["missing_handled"] = handle_missing_values(df, config, ColumnStats(df), copy=False)
+    df, metrics["duplicates_removed"] = handle_duplicates(df, config, ColumnStats(df), copy=False)
+    df, metrics["outliers_removed"] = handle_outliers(df, config, ColumnStats(df), copy=False)
+    df, metrics["scaling_applied"] = handle_scaling(df, config, ColumnStats(df), copy=False)
+    metrics["rows_after"] = len(df)
+    save_data(df, output_path, "csv")
+    return metrics
+
+
+def _float_text(cells: pd.Series) -> pd.Series:
+    # Cells written as floats ("25.0", "1e-05"), not as integers or text
+    return cells.str.contains(r"^[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?$") & cells.str.contains(r"[.eE]")
+
+
+def compare_files(expected_path: Path, actual_path: Path) -> list[str]:
+    """
+    Differences between two cleaned CSV outputs. Identical bytes pass;
+    otherwise columns, row count, the dtypes pd.read_csv infers and every
+    cell's text must match, except float cells whose values differ within
+    RTOL / ATOL (statistics summed in a different order).
+    """
+    if expected_path.read_bytes() == actual_path.read_bytes():
+        return []
+    expected = pd.read_csv(expected_path, dtype=str, keep_default_na=False)
+    actual = pd.read_csv(actual_path, dtype=str, keep_default_na=False)
+    if list(expected.columns) != list(actual.columns):
+        return [f"columns differ: {list(expected.columns)} vs {list(actual.columns)}"]
+    if len(expected) != len(actual):
+        return [f"row count differs: {len(expected)} vs {len(actual)}"]
+
+    problems = [
+        f"{col}: dtype {left} vs {right}"
+        for col, left, right in zip(expected.columns, pd.read_csv(expected_path).dtypes, pd.read_csv(actual_path).dtypes)
+        if left != right
+    ]
+    for col in expected.columns:
+        left, right = expected[col], actual[col]
+        same = (left == right).to_numpy()
+        if same.all():
+            continue
+        floats = (_float_text(left) & _float_text(right)).to_numpy()
+        close = np.isclose(
+            pd.to_numeric(left.where(floats), errors="coerce").to_numpy(dtype=float),
+            pd.to_numeric(right.where(floats), errors="coerce").to_numpy(dtype=float),
+            rtol=RTOL,
+            atol=ATOL,
+        )
+        same = same | (floats & close)
+        if not same.all():
+            first = int(np.flatnonzero(~same)[0])
+            problems.append(f"{col}: {int((~same).sum())} cell(s) differ, e.g. row {first}: {left.iloc[first]!r} vs {right.iloc[first]!r}")
+    return problems
+
+
+def check(engine: str, input_path: Path, name: str, config: dict, work_dir: Path) -> list[str]:
+    expected_path = work_dir / "expected.csv"
+    actual_path = work_dir / f"{engine}.csv"
+    expected_metrics = reference(input_path, expected_path, config)
+
+    start = time.perf_counter()
+    metrics = run_engine(engine, str(input_path), str(actual_path), {**config, "execution": {"engine": engine}})
+    seconds = time.perf_counter() - start
+
+    problems = [
+        f"{key}: {expected_metrics[key]!r} vs {metrics[key]!r}"
+        for key in METRIC_KEYS
+        if expected_metrics[key] != metrics[key]
+    ]
+    problems += compare_files(expected_path, actual_path)
+    print(f"{'ok  ' if not problems else 'FAIL'} {engine:<7} {input_path.name} [{name}] {seconds:.2f}s")
+    for problem in problems:
+        print(f"       {problem}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check that the polars and duckdb engines match the pandas pipeline")
+    parser.add_argument("--engines", nargs="+", default=ENGINES[1:], choices=ENGINES[1:])
+    parser.add_argument("--rows", type=_count, nargs="+", default=[10_000, 50_000], help="Generated dataset sizes.")
+    parser.add_argument("--columns", type=int, default=12, help="Generated dataset width (default: 12).")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Where generated datasets are kept.")
+    args = parser.parse_args()
+
+    enable_copy_on_write()
+    data_dir = Path(args.data_dir)
+    inputs = [REPO_DIR / "data.csv"] + [dataset(rows, args.columns, data_dir) for rows in args.rows]
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for input_path in inputs:
+            for name, config in CONFIGS.items():
+                for engine in args.engines:
+                    failures += bool(check(engine, input_path, name, config, Path(tmp)))
+
+    if failures:
+        print(f"{failures} parity check(s) failed")
+        sys.exit(1)
+    print("All engines match the pandas pipeline")
+
+
+if __name__ == "__main__":
+    main()
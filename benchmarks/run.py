@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks.generate import DEFAULT_SPEC, _count, write_dataset
+from src.cleaner import (
+    enable_copy_on_write,
+    handle_duplicates,
+    handle_missing_values,
+    handle_outliers,
+    handle_scaling,
+)
+from src.column_stats import ColumnStats
+from src.loader import load_data
+from src.profiler import extended_profile
+from src.type_validator import infer_column_types
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_DATA_DIR = BENCH_DIR / ".data"
+
+# Fixed cleaning settings, so timings stay comparable whatever config.yml says
+BENCH_CONFIG = {
+    "missing": {"numeric": {"strategy": "median"}, "text": {"strategy": "mode"}},
+    "duplicates": {"strategy": "remove"},
+    "outliers": {"method": "IQR", "action": "cap"},
+    "scaling": {"numeric": "standard"},
+    "quantiles": {"method": "exact"},
+}
+
+# Differences below this many seconds are timer noise, never a regression
+NOISE_FLOOR = 0.01
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    """
+    Best wall time of `repeat` calls, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def dataset(rows: int, columns: int, data_dir: Path) -> Path:
+    """
+    Synthetic messy CSV of the given size, generated once and reused.
+    """
+    path = data_dir / f"messy_{rows}x{columns}_seed{DEFAULT_SPEC['seed']}.csv"
+    if not path.exists():
+        print(f"Generating {path.name} ...")
+        tmp = path.with_suffix(".tmp.csv")
+        write_dataset(tmp, rows, {"columns": columns})
+        os.replace(tmp, path)
+    return path
+
+
+def bench_dataset(path: Path, repeat: int) -> dict[str, float]:
+    """
+    Time every benchmarked stage on one dataset. Each cleaning stage runs on
+    the output of the previous one, as in the pipeline, with fresh column
+    statistics per call.
+    """
+    results = {}
+    results["load_data"] = measure(lambda: load_data(str(path)), repeat)
+    df = load_data(str(path))
+
+    results["infer_column_types"] = measure(lambda: infer_column_types(df, ColumnStats(df)), repeat)
+    results["extended_profile"] = measure(lambda: extended_profile(df, stats=ColumnStats(df)), repeat)
+
+    frame = df
+    for name, stage in [
+        ("handle_missing_values", handle_missing_values),
+        ("handle_duplicates", handle_duplicates),
+        ("handle_outliers", handle_outliers),
+        ("handle_scaling", handle_scaling),
+    ]:
+        stage_input = frame
+        results[name] = measure(lambda: stage(stage_input, BENCH_CONFIG, ColumnStats(stage_input), copy=False), repeat)
+        frame, _ = stage(frame, BENCH_CONFIG, ColumnStats(frame), copy=False)
+
+    return results
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[dict]:
+    """
+    One row per benchmark: baseline and current seconds, the ratio, and a
+    status of "regression" (slower by more than `tolerance` and NOISE_FLOOR),
+    "faster", "ok" or "new".
+    """
+    rows = []
+    for key, seconds in results.items():
+        base = baseline.get(key)
+        if base is None:
+            status, ratio = "new", None
+        else:
+            ratio = seconds / base if base > 0 else float("inf")
+            if ratio > 1 + tolerance and seconds - base > NOISE_FLOOR:
+                status = "regression"
+            elif ratio < 1 / (1 + tolerance) and base - seconds > NOISE_FLOOR:
+                status = "faster"
+            else:
+                status = "ok"
+        rows.append({"benchmark": key, "baseline": base, "seconds": seconds, "ratio": ratio, "status": status})
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> None:
+    width = max(len(row["benchmark"]) for row in rows)
+    print(f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}  status")
+    for row in rows:
+        base = "-" if row["baseline"] is None else f"{row['baseline']:.4f}"
+        change = "-" if row["ratio"] is None else f"{(row['ratio'] - 1) * 100:+.1f}%"
+        flag = row["status"].upper() if row["status"] == "regression" else row["status"]
+        print(f"{row['benchmark']:<{width}}  {base:>10}  {row['seconds']:>10.4f}  {change:>8}  {flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing stages on synthetic messy data")
+    parser.add_argument(
+        "--rows",
+        type=_count,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="Dataset sizes in rows, e.g. 1e4 1e5 1e6 (default: 1e4 1e5).",
+    )
+    parser.add_argument("--columns", type=int, nargs="+", default=[8], help="Dataset widths (default: 8).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark; the best is kept (default: 5).")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Slowdown over the baseline flagged as a regression (default: 0.25 = 25%%).",
+    )
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Where generated datasets are kept.")
+    parser.add_argument("--json", default=None, help="Also write the results and comparison to this file.")
+    args = parser.parse_args()
+    if args.repeat <= 0:
+        parser.error("--repeat must be a positive integer")
+
+    enable_copy_on_write()
+    data_dir = Path(args.data_dir)
+    results: dict[str, float] = {}
+    for columns in args.columns:
+        for rows in args.rows:
+            path = dataset(rows, columns, data_dir)
+            print(f"Benchmarking {path.name}")
+            for name, seconds in bench_dataset(path, args.repeat).items():
+                results[f"{name}[{rows}x{columns}]"] = seconds
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        baseline = stored.get("results", {})
+        if stored.get("environment") != environment():
+            print(f"Note: baseline was recorded on a different environment: {stored.get('environment')}")
+
+    rows = compare(results, baseline, args.tolerance)
+    print_comparison(rows)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "comparison": rows}, f, indent=1)
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to: {baseline_path}")
+        return
+
+    regressions = [row["benchmark"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
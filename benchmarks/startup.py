@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.run import BENCH_DIR, compare, environment, print_comparison
+
+REPO_DIR = BENCH_DIR.parent
+DEFAULT_BASELINE = BENCH_DIR / "startup_baseline.json"
+
+# Fresh-interpreter commands, timed end to end; {output} is a temporary folder
+COMMANDS = {
+    "python": [sys.executable, "-c", "pass"],
+    "import main": [sys.executable, "-c", "import main"],
+    "main.py --help": [sys.executable, "main.py", "--help"],
+    "main.py data.csv": [sys.executable, "main.py", "--input", "data.csv", "--output", "{output}"],
+}
+
+
+def time_command(command: list[str], repeat: int) -> float:
+    """
+    Best wall time of `repeat` runs of `command` in a new process, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as output:
+            args = [arg.replace("{output}", output) for arg in command]
+            start = time.perf_counter()
+            subprocess.run(args, cwd=REPO_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def slowest_imports(module: str, top: int) -> list[tuple[str, float]]:
+    """
+    The `top` imports with the largest cumulative time when importing
+    `module` in a fresh interpreter (python -X importtime).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((parts[2].rstrip(), int(parts[1]) / 1e6))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time interpreter startup and imports of the CLI")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command; the best is kept (default: 5).")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (default: 10).")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Slowdown over the baseline flagged as a regression (default: 0.25 = 25%%).",
+    )
+    args = parser.parse_args()
+    if args.repeat <= 0:
+        parser.error("--repeat must be a positive integer")
+
+    results = {name: time_command(command, args.repeat) for name, command in COMMANDS.items()}
+
+    print("Slowest imports of main (cumulative seconds):")
+    for name, seconds in slowest_imports("main", args.top):
+        print(f"  {seconds:8.4f}  {name}")
+    print()
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    rows = compare(results, baseline, args.tolerance)
+    print_comparison(rows)
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to: {baseline_path}")
+        return
+
+    regressions = [row["benchmark"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
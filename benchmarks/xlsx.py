@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import argparse
+import math
+import re
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate import _count
+from benchmarks.run import DEFAULT_DATA_DIR, dataset
+from src.loader import load_data
+from src.writer import XlsxChunkWriter, save_data
+
+# What XML 1.0 cannot carry, which the writer drops from text
+_UNWRITABLE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+# Sheet size for the rollover check (header included)
+SMALL_SHEET_ROWS = 4
+
+
+def edge_cases() -> pd.DataFrame:
+    """
+    Values that are easy to get wrong in hand-written SpreadsheetML.
+    """
+    text = [
+        "plain",
+        "a\uffffb",
+        "a\ufffeb",
+        "nul\x00 and bell\x07",
+        "line\r\nbreaks\nand\rCR",
+        "tab\there",
+        "<tag> & 'quotes' \"too\"",
+        "_x0041_ stays literal",
+        "  leading and trailing  ",
+        "emoji \U0001f600 and \ud7ff\ue000\ufffd",
+        None,
+    ]
+    rows = len(text)
+    return pd.DataFrame(
+        {
+            "text": pd.Series(text, dtype="str"),
+            "object \ufffe\x01header": pd.Series(
+                ["lone \udc80 surrogate", "\ud83d alone", 1, 2.5, True, "x\uffff"] + [None] * (rows - 6), dtype=object
+            ),
+            "float": [0.1, -0.0, 1e300, 5e-324, np.inf, -np.inf, np.nan, 1 / 3, 2.0**53, -1.5, 123456.789],
+            "int": np.arange(rows, dtype="int64") * 10**15,
+            "bool": [True, False] * (rows // 2) + [True] * (rows % 2),
+            "when": pd.to_datetime(["2024-02-29 13:45:30.250", None] * (rows // 2) + ["1900-03-01"], format="ISO8601"),
+            "category": pd.Categorical(["a\uffff", "b"] * (rows // 2) + [None]),
+        }
+    )
+
+
+def expected_cell(value):
+    """
+    The value openpyxl reads back for one cell the writer was given.
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return str(float(value)) if math.isinf(value) else float(value)
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return _UNWRITABLE.sub("", str(value))
+
+
+def same_cell(expected, actual) -> bool:
+    if isinstance(expected, float) and isinstance(actual, (int, float)) and not isinstance(actual, bool):
+        return expected == actual
+    if isinstance(expected, datetime):  # serial day numbers keep about a millisecond
+        return actual is not None and abs((actual - expected).total_seconds()) < 1e-3
+    return expected == actual
+
+
+def read_back(path: Path) -> tuple[list, list]:
+    """
+    Header and data rows of every sheet, read with openpyxl; pd.read_excel must
+    open the workbook too.
+    """
+    from openpyxl import load_workbook
+
+    pd.read_excel(path, sheet_name=None)
+    workbook = load_workbook(path, read_only=True)
+    headers, rows = [], []
+    for sheet in workbook.worksheets:
+        values = list(sheet.iter_rows(values_only=True))
+        headers.append(list(values[0]))
+        rows += [list(row) for row in values[1:]]
+    workbook.close()
+    return headers, rows
+
+
+def check(name: str, df: pd.DataFrame, path: Path, sheet_rows: int | None = None) -> list[str]:
+    if sheet_rows is None:
+        save_data(df, path, "xlsx")
+    else:
+        writer = XlsxChunkWriter(path, max_rows=sheet_rows)
+        for start in range(0, len(df), 3):
+            writer.write(df.iloc[start : start + 3])
+        writer.close(list(df.columns))
+
+    problems = []
+    try:
+        headers, rows = read_back(path)
+    except Exception as e:
+        problems.append(f"workbook does not open: {type(e).__name__}: {e}")
+    else:
+        header = [expected_cell(col) for col in df.columns]
+        problems += [f"sheet {i + 1} header: {actual!r}" for i, actual in enumerate(headers) if actual != header]
+        per_sheet = (sheet_rows or len(df) + 1) - 1
+        if sheet_rows is not None and len(headers) != max(1, -(-len(df) // per_sheet)):
+            problems.append(f"{len(headers)} sheets for {len(df)} rows of {per_sheet}")
+        if len(rows) != len(df):
+            problems.append(f"{len(rows)} rows read back, {len(df)} written")
+        for i, (row, actual) in enumerate(zip(df.itertuples(index=False, name=None), rows)):
+            for col, value, cell in zip(df.columns, row, actual):
+                if not same_cell(expected_cell(value), cell):
+                    problems.append(f"row {i} {col!r}: wrote {value!r}, read {cell!r}")
+
+    print(f"{'ok  ' if not problems else 'FAIL'} {name}")
+    for problem in problems[:10]:
+        print(f"       {problem}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check that xlsx output opens in openpyxl and pandas and reads back")
+    parser.add_argument("--rows", type=_count, nargs="+", default=[10_000], help="Generated dataset sizes.")
+    parser.add_argument("--columns", type=int, default=12, help="Generated dataset width (default: 12).")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Where generated datasets are kept.")
+    args = parser.parse_args()
+
+    cases = [("edge cases", edge_cases(), None), (f"edge cases, {SMALL_SHEET_ROWS}-row sheets", edge_cases(), SMALL_SHEET_ROWS)]
+    for rows in args.rows:
+        path = dataset(rows, args.columns, Path(args.data_dir))
+        cases.append((path.name, load_data(str(path)), None))
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (name, df, sheet_rows) in enumerate(cases):
+            failures += bool(check(name, df, Path(tmp) / f"{i}.xlsx", sheet_rows))
+
+    if failures:
+        print(f"{failures} xlsx round trip(s) failed")
+        sys.exit(1)
+    print("Every workbook reads back as written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+
+# Standard library only (no pandas): the point of the client is to start fast
+from src.job_protocol import DEFAULT_PORT, MAX_WAIT_S, read_token
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float | None = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def request(
+    method: str,
+    path: str,
+    body: dict | None = None,
+    *,
+    port: int = DEFAULT_PORT,
+    socket_path: str | None = None,
+) -> dict:
+    """
+    One JSON request to the job server; raises ValueError on an error reply.
+    """
+    headers = {"Content-Type": "application/json"}
+    if socket_path is not None:
+        conn = _UnixConnection(socket_path, timeout=MAX_WAIT_S + 30)
+    else:
+        headers["Authorization"] = f"Bearer {read_token(port)}"
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=MAX_WAIT_S + 30)
+    try:
+        payload = None if body is None else json.dumps(body).encode("utf-8")
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        reply = json.loads(response.read() or b"{}")
+    finally:
+        conn.close()
+    if response.status >= 400:
+        raise ValueError(reply.get("error", f"HTTP {response.status}"))
+    return reply
+
+
+def submit(argv: list[str], *, cwd: str | None = None, **server) -> str:
+    """
+    Queue one job (main.py arguments) and return its id. Relative paths in
+    `argv` are resolved against `cwd` (default: this directory).
+    """
+    return request("POST", "/jobs", {"argv": argv, "cwd": cwd or os.getcwd()}, **server)["id"]
+
+
+def wait(job_id: str, **server) -> dict:
+    """
+    Block until the job finishes and return its result.
+    """
+    while True:
+        state = request("GET", f"/jobs/{job_id}?wait={MAX_WAIT_S}", **server)
+        if state["status"] in ("ok", "failed"):
+            return state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run main.py arguments on a warm job server (python main.py --serve) and wait for the result",
+        usage="python client.py [--socket PATH | --port N] [--no-wait] -- <main.py arguments>",
+    )
+    parser.add_argument("--socket", default=None, help="Unix socket of the job server.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Local port of the job server (default: {DEFAULT_PORT}).")
+    parser.add_argument("--no-wait", action="store_true", help="Print the job id and return without waiting.")
+    parser.add_argument("--status", metavar="JOB_ID", default=None, help="Wait for an earlier --no-wait job instead.")
+    args, argv = parser.parse_known_args()
+    if argv and argv[0] == "--":
+        argv = argv[1:]
+    if not argv and args.status is None:
+        parser.error("no main.py arguments given")
+
+    server = {"port": args.port, "socket_path": args.socket}
+    try:
+        job_id = args.status or submit(argv, **server)
+        if args.no_wait:
+            print(job_id)
+            return
+        result = wait(job_id, **server)
+    except (OSError, ValueError) as e:
+        where = args.socket or f"127.0.0.1:{args.port}"
+        print(f"Job server error ({where}): {e}", file=sys.stderr)
+        sys.exit(2)
+
+    sys.stdout.write(result.get("log", ""))
+    if result["status"] != "ok":
+        print(f"Job {job_id} failed: {result.get('error')}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,442 @@
 from __future__ import annotations
 
 import argparse
+import io
+import os
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from functools import partial
 from pathlib import Path
 
+import pandas as pd
+
 from src.loader import load_data
 from src.cleaner import (
     load_config,
+    enable_copy_on_write,
     handle_missing_values,
     handle_duplicates,
     handle_outliers,
     handle_scaling,
+    vectorized,
 )
-from src.reporter import generate_report
+from src.column_stats import ColumnStats
+from src.reporter import generate_report, generate_batch_summary
+from src.writer import CHUNKED_FORMATS, OUTPUT_FORMATS, output_path, save_data
+from src.streaming import run_streaming, apply_artifact
+from src.incremental import STATE_DIR as INCREMENTAL_STATE_DIR, run_incremental
+from src.artifact import build_artifact, frame_schema, load_artifact, save_artifact
 
 from src.type_validator import infer_column_types, print_type_validation_report
 from src.missing_strategy import recommend_missing_strategies, print_missing_strategy_report
 from src.profiler import extended_profile, print_profile_report
+from src.dtype_optimizer import optimize_dtypes, print_dtype_report
+from src.sketches import profile_sketch_settings, quantile_error
+from src.staging import load_staged, staging_settings
+from src.cache import cached, file_fingerprint, open_cache, stage_key
+from src.batch import find_inputs, run_batch
+from src.perf import StageRecorder, save_performance
+from src.engines import execution_engine, run_engine
+from src.job_protocol import DEFAULT_PORT
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Data Preprocessing Agent")
-    parser.add_argument("--input", required=True, help="Path to input dataset (CSV/TXT or Excel).")
+    parser.add_argument(
+        "--input",
+        default=None,
+        help="Path to input dataset (CSV/TXT, Excel, Parquet or Feather), or a glob pattern for batch mode.",
+    )
     parser.add_argument("--config", default="config.yml", help="Path to config.yml (default: config.yml).")
     parser.add_argument("--output", default="outputs", help="Output folder (default: outputs).")
 
     # Client file robustness
     parser.add_argument("--sep", default=None, help="CSV separator, e.g. ',' or ';' (optional).")
     parser.add_argument("--encoding", default=None, help="CSV encoding, e.g. utf-8-sig, cp1256 (optional).")
+    parser.add_argument(
+        "--csv-engine",
+        choices=["c", "pyarrow"],
+        default="c",
+        help="CSV parser: pandas C parser or multi-threaded pyarrow (default: c).",
+    )
+    parser.add_argument(
+        "--sheet",
+        default=None,
+        help="Excel sheet to read, by name or 0-based index (default: first sheet).",
+    )
 
     # Output format
     parser.add_argument(
         "--out-format",
-        choices=["csv", "xlsx"],
+        choices=OUTPUT_FORMATS,
         default="csv",
         help="Output format for cleaned data (default: csv).",
     )
+    parser.add_argument(
+        "--compression",
+        default=None,
+        help="Parquet: snappy|zstd|gzip|brotli|none, Feather: lz4|zstd|none (default: format default).",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=None,
+        help="Rows per Parquet row group / Feather record batch (optional).",
+    )
+
+    # Large files
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Clean CSV or .xlsx input chunk by chunk with bounded memory (csv or xlsx output).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Clean only rows appended to the CSV input since the last --incremental run into the same --output.",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help="Rows per chunk in --streaming mode (default: 100000).",
+    )
+
+    # Fit once, apply many
+    parser.add_argument(
+        "--fit",
+        metavar="ARTIFACT",
+        default=None,
+        help="Also save every learned cleaning parameter to this pipeline artifact (JSON).",
+    )
+    parser.add_argument(
+        "--apply",
+        metavar="ARTIFACT",
+        default=None,
+        help="Clean the input with a fitted pipeline artifact, streaming, without recomputing statistics.",
+    )
+
+    # Profiling
+    parser.add_argument(
+        "--fast-profile",
+        action="store_true",
+        help="Estimate text-column unique counts and top values with fixed-memory sketches (see `profiling`).",
+    )
+
+    # Repeat runs
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the result cache configured under `cache` in config.yml for this run.",
+    )
 
-    return parser.parse_args()
+    # Parallelism
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes for CSV parsing and writing and per-column analysis (default: 1).",
+    )
+
+    # Instrumentation
+    parser.add_argument(
+        "--perf-json",
+        action="store_true",
+        help="Also write per-stage timing and memory metrics to performance.json.",
+    )
+    parser.add_argument(
+        "--profile-stages",
+        action="store_true",
+        help="Run every stage under cProfile and save its stats to profiles/<stage>.prof.",
+    )
+
+    # Batch mode
+    parser.add_argument(
+        "--input-dir",
+        default=None,
+        help="Process every supported file in this folder (or those matching --glob).",
+    )
+    parser.add_argument("--glob", default=None, help="File pattern inside --input-dir, e.g. '*.csv' or '**/*.csv'.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Files processed concurrently in batch mode, or jobs run at once by --serve (default: 1).",
+    )
+
+    # Job server
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep the libraries loaded and run jobs sent with `python client.py` (see --socket, --port, --jobs).",
+    )
+    parser.add_argument("--socket", default=None, help="Unix socket for --serve (default: 127.0.0.1:--port).")
+    parser.add_argument("--port", type=int, default=None, help=f"Local port for --serve (default: {DEFAULT_PORT}).")
+
+    args = parser.parse_args(argv)
+    if args.serve:
+        if args.input is not None or args.input_dir is not None:
+            parser.error("--serve takes no input; submit jobs with python client.py")
+        if args.jobs <= 0:
+            parser.error("--jobs must be a positive integer")
+        return args
+    if (args.input is None) == (args.input_dir is None):
+        parser.error("provide exactly one of --input or --input-dir")
+    if args.glob and not args.input_dir:
+        parser.error("--glob requires --input-dir")
+    if is_batch(args) and args.fit:
+        parser.error("--fit takes a single --input file")
+    if args.jobs <= 0:
+        parser.error("--jobs must be a positive integer")
+    if args.streaming and args.out_format not in CHUNKED_FORMATS:
+        parser.error(f"--streaming only supports --out-format {' or '.join(CHUNKED_FORMATS)}")
+    if args.apply and args.fit:
+        parser.error("--apply and --fit cannot be combined")
+    if args.incremental and (args.streaming or args.apply or args.fit):
+        parser.error("--incremental cannot be combined with --streaming, --apply or --fit")
+    if args.incremental and args.out_format != "csv":
+        parser.error("--incremental appends to csv output only")
+    if args.apply and args.out_format not in CHUNKED_FORMATS:
+        parser.error(f"--apply only supports --out-format {' or '.join(CHUNKED_FORMATS)}")
+    if args.sheet is not None and args.sheet.isdigit():
+        args.sheet = int(args.sheet)
+    if args.row_group_size is not None and args.row_group_size <= 0:
+        parser.error("--row-group-size must be a positive integer")
+    if args.chunksize <= 0:
+        parser.error("--chunksize must be a positive integer")
+    if args.workers <= 0:
+        parser.error("--workers must be a positive integer")
+
+    return args
+
+
+def is_batch(args: argparse.Namespace) -> bool:
+    return args.input_dir is not None or any(ch in args.input for ch in "*?[")
 
 
 def main() -> None:
     args = parse_args()
+    if args.serve:
+        from src.server import serve  # only the server needs http.server
 
-    input_path = Path(args.input)
+        serve(run_job, workers=args.jobs, port=args.port, socket_path=args.socket)
+        return
+    run(args)
+
+
+def run(args: argparse.Namespace) -> None:
     config_path = Path(args.config)
     output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if is_batch(args):
+        run_batch_mode(args, config_path, output_dir)
+        return
 
+    input_path = Path(args.input)
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_path}")
-    if not config_path.exists():
+
+    run_file(args, config_path, input_path, output_dir)
+
+
+def run_job(argv: list[str], cwd: str) -> dict:
+    """
+    Job server side (--serve): one main.py invocation in a warm worker process,
+    with paths relative to `cwd` and console output returned as "log".
+    """
+    start = time.perf_counter()
+    result = {"status": "ok", "error": None}
+    log = io.StringIO()
+    with redirect_stdout(log), redirect_stderr(log):
+        try:
+            os.chdir(cwd)
+            args = parse_args(argv)
+            if args.serve:
+                raise ValueError("--serve cannot be run as a job")
+            run(args)
+        except SystemExit as e:
+            # argparse errors and --help: the message is already in the log
+            if e.code:
+                result.update(status="failed", error=f"invalid arguments (exit code {e.code})")
+        except Exception as e:
+            traceback.print_exc()
+            result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    result["log"] = log.getvalue()
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_file(args: argparse.Namespace, config_path: Path, input_path: Path, output_dir: Path) -> dict:
+    """
+    Clean one input file into `output_dir` and return its report metrics.
+    """
+    perf = StageRecorder(output_dir / "profiles" if args.profile_stages else None)
+
+    if args.apply:
+        metrics = run_apply_mode(args, input_path, output_dir, perf)
+    else:
+        if not config_path.exists():
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        engine = execution_engine(load_config(str(config_path)))
+        if engine != "pandas":
+            if args.streaming or args.incremental:
+                mode = "--streaming" if args.streaming else "--incremental"
+                raise ValueError(f"{mode} uses the pandas engine; execution.engine is {engine}")
+            metrics = run_engine_mode(args, input_path, config_path, engine, output_dir, perf)
+        elif args.incremental:
+            metrics = run_incremental_mode(args, input_path, config_path, output_dir, perf)
+        elif args.streaming:
+            metrics = run_streaming_mode(args, input_path, config_path, output_dir, perf)
+        else:
+            metrics = run_in_memory(args, input_path, config_path, output_dir, perf)
+
+    if args.perf_json:
+        perf_path = save_performance(metrics["performance"], output_dir / "performance.json")
+        print(f"Performance metrics saved to: {perf_path}")
+    return metrics
+
+
+def run_batch_mode(args: argparse.Namespace, config_path: Path, output_dir: Path) -> None:
+    if args.apply is None and not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    output_dir.mkdir(parents=True, exist_ok=True)
+    inputs = find_inputs(args.input_dir, args.glob if args.input_dir else args.input)
+    print(f"Batch: {len(inputs)} file(s), {min(args.jobs, len(inputs))} at a time")
 
-    # Load (robust)
-    df = load_data(str(input_path), encoding=args.encoding, sep=args.sep)
+    results = run_batch(inputs, output_dir, partial(run_file, args, config_path), jobs=args.jobs)
+
+    summary_path = output_dir / "batch_summary.md"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(generate_batch_summary(results))
+
+    failed = sum(result["status"] != "ok" for result in results)
+    print("=== Batch Completed ===")
+    print(f"Files cleaned: {len(results) - failed}, failed: {failed}")
+    print(f"Summary saved to: {summary_path}")
+
+
+def run_in_memory(
+    args: argparse.Namespace, input_path: Path, config_path: Path, output_dir: Path, perf: StageRecorder
+) -> dict:
     config = load_config(str(config_path))
 
+    # Stage results are reused from the cache when their inputs and settings are unchanged
+    cache = open_cache(config, disabled=args.no_cache)
+    input_key = stage_key(file_fingerprint(input_path) if cache is not None else "", "input")
+
+    # Load (robust)
+    load_args = [args.encoding, args.sep, args.csv_engine, args.sheet]
+    load_key = stage_key(input_key, "load", load_args)
+    load = partial(
+        load_data,
+        str(input_path),
+        encoding=args.encoding,
+        sep=args.sep,
+        engine=args.csv_engine,
+        sheet=args.sheet,
+        workers=args.workers,
+    )
+    staging = staging_settings(config, output_dir)
+    with perf.stage("load") as record:
+        if staging is not None:
+            # a memory-mapped Arrow copy of the parsed input replaces the cached load result
+            df, reused = load_staged(input_path, load, load_args, **staging)
+            print(f"Staged input: {'memory-mapped from' if reused else 'parsed and saved to'} {staging['directory']}")
+        else:
+            df = cached(cache, "load", load_key, load)
+        record["rows"] = len(df)
+    load_settings = df.attrs.get("load_settings")
+    print_load_settings(load_settings)
+
+    # Column statistics shared by every stage below
+    stats = ColumnStats(df, workers=args.workers)
+
     # Optional console insights (helpful for you)
-    type_report = infer_column_types(df)
+    type_cfg = config.get("type_inference", {}) or {}
+    fast = profile_sketch_settings(config, args.fast_profile)
+    types_key = stage_key(load_key, "types", [type_cfg, fast])
+    with perf.stage("types", len(df)):
+        type_report = cached(
+            cache,
+            "types",
+            types_key,
+            lambda: infer_column_types(
+                df,
+                stats,
+                sample_size=type_cfg.get("sample_size", 1000),
+                exact=bool(type_cfg.get("exact", False)),
+                fast=fast,
+            ),
+        )
     print_type_validation_report(type_report)
 
-    profile_before = extended_profile(df)
+    # Optional: act on the type report to make every later stage cheaper
+    dtype_report = None
+    frame_key = load_key
+    dtype_cfg = config.get("dtypes", {}) or {}
+    if dtype_cfg.get("optimize", False):
+        frame_key = stage_key(types_key, "dtypes", dtype_cfg)
+        with perf.stage("dtypes", len(df)):
+            df, dtype_report = cached(cache, "dtypes", frame_key, lambda: optimize_dtypes(df, type_report, config))
+            stats.update(df, changed=list(dtype_report["changes"]))
+        print_dtype_report(dtype_report)
+
+    with perf.stage("profile", len(df)):
+        profile_before = cached(
+            cache,
+            "profile",
+            stage_key(frame_key, "profile", [config.get("quantiles"), fast]),
+            lambda: extended_profile(df, sketch_error=quantile_error(config), stats=stats, fast=fast),
+        )
     print_profile_report(profile_before)
 
-    strategy_report = recommend_missing_strategies(df, type_report)
+    with perf.stage("missing strategy", len(df)):
+        strategy_report = recommend_missing_strategies(df, type_report)
     print_missing_strategy_report(strategy_report)
 
     # Preprocessing with metrics
     rows_before = int(df.shape[0])
 
-    df_clean, missing_handled = handle_missing_values(df, config)
-    df_clean, duplicates_removed = handle_duplicates(df_clean, config)
-    df_clean, outliers_removed = handle_outliers(df_clean, config)
-    df_clean, scaling_applied = handle_scaling(df_clean, config)
+    # Stages work in place on the loaded frame (freeing replaced columns as they go)
+    # unless execution.copy asks for defensive copies
+    copy = bool(config.get("execution", {}).get("copy", False))
+    if not copy:
+        enable_copy_on_write()
+
+    # --fit: every stage records the parameters it learned
+    learned = {} if args.fit else None
+    schema = frame_schema(df)
+
+    stage_args = dict(config=config, stats=stats, copy=copy, inplace=not copy, cache=cache, learned=learned, perf=perf)
+    key = stage_key(frame_key, "missing", [config.get("missing"), config.get("quantiles"), vectorized(config)])
+    df_clean, missing_handled = run_stage("missing", handle_missing_values, df, key, **stage_args)
+    # The fill stage consumed the raw frame (or, with execution.copy, copied it).
+    # Rebound rather than deleted: the cached(...) lambdas above still close over `df`
+    df = None
+    key = stage_key(key, "duplicates", config.get("duplicates"))
+    df_clean, duplicates_removed = run_stage("duplicates", handle_duplicates, df_clean, key, **stage_args)
+    key = stage_key(key, "outliers", [config.get("outliers"), config.get("quantiles"), vectorized(config)])
+    df_clean, outliers_removed = run_stage("outliers", handle_outliers, df_clean, key, **stage_args)
+    key = stage_key(key, "scaling", config.get("scaling"))
+    df_clean, scaling_applied = run_stage("scaling", handle_scaling, df_clean, key, **stage_args)
+
+    if learned is not None:
+        save_fitted(learned, schema, config, input_path, Path(args.fit))
 
     rows_after = int(df_clean.shape[0])
 
     # Save cleaned data
-    if args.out_format == "xlsx":
-        cleaned_path = output_dir / "cleaned_data.xlsx"
-        df_clean.to_excel(cleaned_path, index=False)
-    else:
-        cleaned_path = output_dir / "cleaned_data.csv"
-        df_clean.to_csv(cleaned_path, index=False)
+    with perf.stage("save", rows_after):
+        cleaned_path = save_data(
+            df_clean,
+            output_path(output_dir, args.out_format),
+            args.out_format,
+            compression=args.compression,
+            row_group_size=args.row_group_size,
+            workers=args.workers,
+        )
 
     # Generate report
     metrics = {
@@ -93,8 +446,198 @@ def main() -> None:
         "duplicates_removed": int(duplicates_removed),
         "outliers_removed": int(outliers_removed),
         "scaling_applied": str(scaling_applied),
+        "load_settings": load_settings,
+        "output_file": cleaned_path.name,
     }
+    if dtype_report is not None:
+        metrics["memory_before"] = dtype_report["memory_before"]
+        metrics["memory_after"] = dtype_report["memory_after"]
+    if cache is not None:
+        metrics["cache_reused"] = cache.reused
+        metrics["cache_computed"] = cache.computed
+        print(f"Result cache: reused {', '.join(cache.reused) or 'nothing'}; "
+              f"computed {', '.join(cache.computed) or 'nothing'}")
+    metrics["performance"] = perf.summary()
+
+    write_report(metrics, config, input_path, cleaned_path, output_dir)
+    return metrics
+
+
+def run_stage(
+    name: str,
+    stage,
+    df: pd.DataFrame,
+    key: str,
+    *,
+    config: dict,
+    stats: ColumnStats,
+    copy: bool,
+    inplace: bool,
+    cache,
+    learned: dict | None,
+    perf: StageRecorder,
+) -> tuple:
+    """
+    Run one cleaning stage, or reuse its cached output. The parameters the
+    stage learned are cached with it so --fit works on cache hits too.
+    """
+    with perf.stage(name, len(df)):
+        if cache is None:
+            return stage(df, config, stats, copy=copy, inplace=inplace, learned=learned)
+
+        def compute() -> tuple:
+            part: dict = {}
+            result, value = stage(df, config, stats, copy=copy, inplace=inplace, learned=part)
+            return result, value, part
+
+        result, value, part = cached(cache, name, key, compute)
+    if stats.df is not result:
+        stats.update(result)
+    if learned is not None:
+        learned.update(part)
+    return result, value
+
+
+def run_streaming_mode(
+    args: argparse.Namespace, input_path: Path, config_path: Path, output_dir: Path, perf: StageRecorder
+) -> dict:
+    config = load_config(str(config_path))
+    cleaned_path = output_path(output_dir, args.out_format)
+    learned = {} if args.fit else None
+
+    metrics = run_streaming(
+        str(input_path),
+        str(cleaned_path),
+        config,
+        chunksize=args.chunksize,
+        encoding=args.encoding,
+        sep=args.sep,
+        sheet=args.sheet,
+        out_format=args.out_format,
+        learned=learned,
+        perf=perf,
+    )
+    if learned is not None:
+        # streaming statistics always come from quantile sketches
+        fitted_config = {**config, "quantiles": {**(config.get("quantiles") or {}), "method": "sketch"}}
+        save_fitted(learned, learned.pop("schema"), fitted_config, input_path, Path(args.fit))
+    print_load_settings(metrics["load_settings"])
+    metrics["output_file"] = cleaned_path.name
+    metrics["processing_mode"] = f"streaming ({args.chunksize} rows per chunk)"
+    metrics["quantile_method"] = "sketch"
+    metrics["performance"] = perf.summary()
+
+    write_report(metrics, config, input_path, cleaned_path, output_dir)
+    return metrics
+
+
+def run_incremental_mode(
+    args: argparse.Namespace, input_path: Path, config_path: Path, output_dir: Path, perf: StageRecorder
+) -> dict:
+    config = load_config(str(config_path))
+    cleaned_path = output_path(output_dir, "csv")
+
+    metrics = run_incremental(
+        str(input_path),
+        str(cleaned_path),
+        config,
+        state_dir=str(output_dir / INCREMENTAL_STATE_DIR),
+        chunksize=args.chunksize,
+        encoding=args.encoding,
+        sep=args.sep,
+        perf=perf,
+    )
+    print_load_settings(metrics["load_settings"])
+    delta = metrics["incremental"]
+    metrics["output_file"] = cleaned_path.name
+    metrics["processing_mode"] = (
+        f"incremental ({'full run' if delta['full_run'] else 'appended rows only'}, "
+        f"rows {delta['start_row']}..{delta['end_row']}, {args.chunksize} rows per chunk)"
+    )
+    metrics["quantile_method"] = "sketch"
+    metrics["performance"] = perf.summary()
+
+    write_report(metrics, config, input_path, cleaned_path, output_dir)
+    return metrics
+
+
+def run_engine_mode(
+    args: argparse.Namespace, input_path: Path, config_path: Path, engine: str, output_dir: Path, perf: StageRecorder
+) -> dict:
+    config = load_config(str(config_path))
+    cleaned_path = output_path(output_dir, args.out_format)
+    learned = {} if args.fit else None
+
+    metrics = run_engine(
+        engine,
+        str(input_path),
+        str(cleaned_path),
+        config,
+        encoding=args.encoding,
+        sep=args.sep,
+        out_format=args.out_format,
+        learned=learned,
+        perf=perf,
+    )
+    if learned is not None:
+        # lazy engines always compute exact quantiles
+        fitted_config = {**config, "quantiles": {**(config.get("quantiles") or {}), "method": "exact"}}
+        save_fitted(learned, learned.pop("schema"), fitted_config, input_path, Path(args.fit))
+    print_load_settings(metrics["load_settings"])
+    metrics["output_file"] = cleaned_path.name
+    metrics["processing_mode"] = f"{engine} engine (lazy, multi-threaded)"
+    metrics["quantile_method"] = "exact"
+    metrics["performance"] = perf.summary()
+
+    write_report(metrics, config, input_path, cleaned_path, output_dir)
+    return metrics
+
+
+def run_apply_mode(args: argparse.Namespace, input_path: Path, output_dir: Path, perf: StageRecorder) -> dict:
+    artifact_path = Path(args.apply)
+    artifact = load_artifact(artifact_path)
+    cleaned_path = output_path(output_dir, args.out_format)
+
+    metrics = apply_artifact(
+        str(input_path),
+        str(cleaned_path),
+        artifact,
+        chunksize=args.chunksize,
+        encoding=args.encoding,
+        sep=args.sep,
+        sheet=args.sheet,
+        out_format=args.out_format,
+        perf=perf,
+    )
+    print_load_settings(metrics["load_settings"])
+    metrics["output_file"] = cleaned_path.name
+    metrics["processing_mode"] = (
+        f"apply fitted pipeline {artifact_path.name} (fitted on {artifact['fitted_on']}, "
+        f"{args.chunksize} rows per chunk)"
+    )
+    metrics["performance"] = perf.summary()
+
+    # The report describes the configuration the parameters were fitted with
+    write_report(metrics, artifact["config"], input_path, cleaned_path, output_dir)
+    return metrics
+
+
+def save_fitted(learned: dict, schema: dict, config: dict, input_path: Path, artifact_path: Path) -> None:
+    artifact = build_artifact(learned, schema, config, input_path.name)
+    save_artifact(artifact, artifact_path)
+    print(f"Pipeline artifact saved to: {artifact_path}")
+
+
+def print_load_settings(settings: dict | None) -> None:
+    if settings:
+        print(
+            f"Detected CSV settings: encoding={settings['encoding']}, "
+            f"delimiter={settings['sep']!r}, BOM={'yes' if settings['bom'] else 'no'}, "
+            f"engine={settings['engine']}"
+        )
+
 
+def write_report(metrics: dict, config: dict, input_path: Path, cleaned_path: Path, output_dir: Path) -> None:
     report_text = generate_report(metrics, config, str(input_path))
     report_path = output_dir / "report.md"
     with open(report_path, "w", encoding="utf-8") as f:
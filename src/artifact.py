@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ARTIFACT_VERSION = 1
+
+# Config sections whose settings shape the fitted parameters
+_CONFIG_SECTIONS = ("missing", "duplicates", "outliers", "scaling", "quantiles")
+
+_STAGES = ("missing", "duplicates", "outliers", "scaling")
+
+
+def frame_schema(df: pd.DataFrame) -> dict:
+    """
+    Column order plus the dtype of every column the cleaner treated as numeric.
+    Other columns are read back as text when the artifact is applied.
+    """
+    return {
+        "columns": [str(col) for col in df.columns],
+        "numeric": {str(col): str(df[col].dtype) for col in df.columns if pd.api.types.is_numeric_dtype(df[col])},
+    }
+
+
+def build_artifact(learned: dict, schema: dict, config: dict, source: str) -> dict:
+    """
+    Versioned pipeline artifact from the parameters recorded by the cleaning
+    stages (`learned` as filled by handle_* or run_streaming).
+    """
+    missing = [stage for stage in _STAGES if stage not in learned]
+    if missing:
+        raise ValueError(f"Fitted parameters are missing for: {', '.join(missing)}")
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "fitted_on": source,
+        "schema": schema,
+        "config": {section: config.get(section) for section in _CONFIG_SECTIONS if section in config},
+        "missing": {
+            "fill": {str(col): value for col, value in learned["missing"]["fill"].items()},
+            "drop": [str(col) for col in learned["missing"]["drop"]],
+        },
+        "duplicates": learned["duplicates"],
+        "outliers": {
+            "action": learned["outliers"]["action"],
+            "bounds": {str(col): list(bound) for col, bound in learned["outliers"]["bounds"].items()},
+        },
+        "scaling": {
+            "method": learned["scaling"]["method"],
+            "params": {str(col): list(state) for col, state in learned["scaling"]["params"].items()},
+        },
+    }
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return str(value)
+
+
+def save_artifact(artifact: dict, path: Path) -> Path:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, indent=1, default=_json_value)
+    return path
+
+
+def load_artifact(path: Path) -> dict:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Pipeline artifact not found: {path}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            artifact = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid pipeline artifact {path}: {e}")
+
+    version = artifact.get("version") if isinstance(artifact, dict) else None
+    if version != ARTIFACT_VERSION:
+        raise ValueError(
+            f"Unsupported pipeline artifact version {version!r} in {path} (expected {ARTIFACT_VERSION}); "
+            "re-run --fit to regenerate it."
+        )
+    return artifact
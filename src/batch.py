@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import glob
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Callable
+
+from src.loader import SUPPORTED_EXTENSIONS
+
+
+def find_inputs(input_dir: str | None = None, pattern: str | None = None) -> list[Path]:
+    """
+    Files to process in batch mode: `pattern` inside `input_dir`, a glob
+    pattern on its own, or every supported file in `input_dir`.
+    """
+    if input_dir is not None:
+        root = Path(input_dir)
+        if not root.is_dir():
+            raise FileNotFoundError(f"Input directory not found: {input_dir}")
+        if pattern:
+            paths = root.glob(pattern)
+        else:
+            paths = (path for path in root.iterdir() if path.suffix.lower() in SUPPORTED_EXTENSIONS)
+    else:
+        paths = (Path(path) for path in glob.glob(pattern, recursive=True))
+
+    inputs = sorted(path for path in paths if path.is_file())
+    if not inputs:
+        raise FileNotFoundError(f"No input files matched {pattern or '*'} in {input_dir or '.'}")
+    return inputs
+
+
+def batch_output_dirs(inputs: list[Path], output_dir: Path) -> dict[Path, Path]:
+    """
+    One output folder per input, named after the file; names shared by
+    several inputs (e.g. sales.csv and sales.xlsx) keep their extension.
+    """
+    stems: dict[str, int] = {}
+    for path in inputs:
+        stems[path.stem] = stems.get(path.stem, 0) + 1
+
+    dirs: dict[Path, Path] = {}
+    used: set[str] = set()
+    for path in inputs:
+        name = path.stem if stems[path.stem] == 1 else path.name.replace(".", "_")
+        base, n = name, 1
+        while name in used:
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name)
+        dirs[path] = output_dir / name
+    return dirs
+
+
+def _run_isolated(run_file: Callable[[Path, Path], dict], input_path: Path, output_dir: Path) -> dict:
+    # Worker side: one file, console output captured in its own log, errors returned as text
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    result = {"file": str(input_path), "output_dir": str(output_dir), "metrics": None, "error": None}
+
+    with open(output_dir / "log.txt", "w", encoding="utf-8") as log:
+        with redirect_stdout(log), redirect_stderr(log):
+            try:
+                result["metrics"] = run_file(input_path, output_dir)
+                result["status"] = "ok"
+            except Exception as e:
+                traceback.print_exc()
+                result["status"] = "failed"
+                result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(
+    inputs: list[Path],
+    output_dir: Path,
+    run_file: Callable[[Path, Path], dict],
+    jobs: int = 1,
+) -> list[dict]:
+    """
+    Run `run_file(input_path, file_output_dir)` for every input, at most
+    `jobs` at a time on a process pool. A file that raises is recorded as
+    failed and the rest of the batch continues. If a worker process dies
+    (e.g. out of memory), files still queued on the pool are reported failed.
+    Returns one result per input, in input order.
+    """
+    dirs = batch_output_dirs(inputs, output_dir)
+    results: dict[Path, dict] = {}
+
+    def done(path: Path, result: dict) -> None:
+        results[path] = result
+        detail = f"{result['seconds']}s" if result["status"] == "ok" else result["error"]
+        print(f"[{len(results)}/{len(inputs)}] {path.name}: {result['status']} ({detail})")
+
+    if jobs <= 1 or len(inputs) <= 1:
+        for path in inputs:
+            done(path, _run_isolated(run_file, path, dirs[path]))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(inputs))) as pool:
+            futures = {pool.submit(_run_isolated, run_file, path, dirs[path]): path for path in inputs}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # the worker process itself died (e.g. out of memory)
+                    result = {
+                        "file": str(path),
+                        "output_dir": str(dirs[path]),
+                        "status": "failed",
+                        "metrics": None,
+                        "error": f"{type(e).__name__}: {e}",
+                        "seconds": None,
+                    }
+                done(path, result)
+
+    return [results[path] for path in inputs]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Callable
+
+DEFAULT_CACHE_DIR = ".preprocessing_cache"
+DEFAULT_CACHE_MAX_MB = 1024
+
+_HASH_BLOCK = 1 << 20
+_CODE_VERSION: str | None = None
+
+
+def code_version() -> str:
+    """
+    Digest of the pipeline source (src/*.py and main.py), so cached
+    results are never reused across code changes.
+    """
+    global _CODE_VERSION
+    if _CODE_VERSION is None:
+        src_dir = Path(__file__).resolve().parent
+        digest = hashlib.blake2b(digest_size=16)
+        for path in sorted(src_dir.glob("*.py")) + [src_dir.parent / "main.py"]:
+            if path.exists():
+                digest.update(path.name.encode())
+                digest.update(path.read_bytes())
+        _CODE_VERSION = digest.hexdigest()
+    return _CODE_VERSION
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    Content digest of an input file; renaming or touching it keeps the key.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_key(parent: str, stage: str, settings=None) -> str:
+    """
+    Key of a stage result: the key of its input, the stage name, the config
+    slice it depends on and the code version. Changing a stage's settings
+    changes its key and the keys of every stage after it.
+    """
+    payload = json.dumps([parent, stage, settings, code_version()], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Local on-disk store of pickled stage results, one file per key.
+    Reads refresh an entry's mtime; writes evict least recently used
+    entries until the directory fits in `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.reused: list[str] = []
+        self.computed: list[str] = []
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def get(self, key: str) -> tuple[bool, object]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by a concurrent run in the meantime
+        return True, value
+
+    def put(self, key: str, value) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.evict(keep=path)
+
+    def evict(self, keep: Path | None = None) -> None:
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def fetch(self, stage: str, key: str, compute: Callable[[], object]):
+        hit, value = self.get(key)
+        if hit:
+            self.reused.append(stage)
+            return value
+        value = compute()
+        self.put(key, value)
+        self.computed.append(stage)
+        return value
+
+
+def open_cache(config: dict, disabled: bool = False) -> ResultCache | None:
+    """
+    ResultCache from the `cache` config section, or None when caching is off.
+    """
+    cache_cfg = config.get("cache", {}) or {}
+    if disabled or not cache_cfg.get("enabled", False):
+        return None
+
+    max_mb = cache_cfg.get("max_size_mb", DEFAULT_CACHE_MAX_MB)
+    if not isinstance(max_mb, (int, float)) or max_mb <= 0:
+        raise ValueError(f"cache.max_size_mb must be a positive number, got {max_mb!r}")
+    return ResultCache(Path(cache_cfg.get("dir") or DEFAULT_CACHE_DIR), int(max_mb * 1024 * 1024))
+
+
+def cached(cache: ResultCache | None, stage: str, key: str, compute: Callable[[], object]):
+    if cache is None:
+        return compute()
+    return cache.fetch(stage, key, compute)
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 import yaml
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
+
+from src.column_stats import ColumnStats
+from src.sketches import _mix, column_quantiles, quantile_error
 
 
 def load_config(path: str = "config.yml") -> dict:
@@ -17,135 +20,551 @@ def load_config(path: str = "config.yml") -> dict:
     return config or {}
 
 
-def handle_missing_values(df: pd.DataFrame, config: dict) -> tuple[pd.DataFrame, int]:
+def enable_copy_on_write() -> None:
+    """
+    Turn on pandas copy-on-write (already the default from pandas 3.0).
+    With it, stages run with copy=False share column buffers with their
+    input until they write a column, and the caller's frame is never mutated.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def _stage_frame(df: pd.DataFrame, copy: bool, inplace: bool = False) -> pd.DataFrame:
+    # copy=False: shallow frame, columns are only materialized when a stage replaces them
+    # inplace=True: the stage works on `df` itself, so a replaced column frees the input's buffer
+    if copy and inplace:
+        raise ValueError("copy and inplace cannot both be set")
+    if inplace:
+        return df
+    return df.copy() if copy else df.copy(deep=False)
+
+
+def _take_rows(df: pd.DataFrame, keep, inplace: bool) -> pd.DataFrame:
+    """
+    df[keep] for a boolean row mask. With `inplace`, the columns are moved out
+    of `df` one at a time, so each input buffer is freed once its rows are
+    taken (a block of several same-dtype columns goes with its last column)
+    instead of input and output being held in full at once. `df` is left
+    without columns.
+    """
+    # missing entries of a nullable boolean mask drop the row, as in df[keep]
+    keep = keep.to_numpy(dtype=bool, na_value=False) if isinstance(keep, pd.Series) else np.asarray(keep, dtype=bool)
+    if keep.all():
+        return df
+    if not inplace or df.shape[1] == 0 or not df.columns.is_unique:
+        return df[keep]
+    columns, attrs, index = df.columns, df.attrs, df.index[keep]
+    # arrays rather than Series, so the taken index is built once, not per column
+    taken = pd.DataFrame({col: df.pop(col).array[keep] for col in list(columns)}, index=index, copy=False)
+    taken.columns = columns
+    taken.attrs = attrs
+    return taken
+
+
+def _column_hashes(series: pd.Series) -> np.ndarray:
+    """
+    64-bit hash of every value, equal for values duplicated() treats as equal.
+    NumPy numbers and datetimes are hashed from their bits (-0.0 as 0.0, every
+    NaN alike); other dtypes from their factorize codes, which need no
+    per-value hash table for numbers with many distinct values.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biumM":
+        values = series.to_numpy()
+        return _mix((values.view("int64") if dtype.kind in "mM" else values).astype("uint64"))
+    if isinstance(dtype, np.dtype) and dtype.kind == "f":
+        values = series.to_numpy().astype("float64") + 0.0
+        values[np.isnan(values)] = np.nan
+        return _mix(values.view("uint64"))
+    codes, _ = pd.factorize(series)
+    return _mix(codes.astype("uint64"))
+
+
+def _duplicated(df: pd.DataFrame, keep: str) -> pd.Series:
+    """
+    Same result as df.duplicated(keep=keep), from a 64-bit hash of each row
+    (columns folded in one at a time) sorted to find repeats, instead of hash
+    tables over every column's values. Rows with a repeated hash are compared
+    with the row they repeat; a hash collision falls back to df.duplicated().
+    """
+    n = df.shape[0]
+    if df.shape[1] == 0 or n == 0:
+        return df.duplicated(keep=keep)
+
+    hashes = np.zeros(n, dtype="uint64")
+    with np.errstate(over="ignore"):
+        for i in range(df.shape[1]):
+            hashes *= np.uint64(0x100000001B3)
+            hashes += _column_hashes(df.iloc[:, i])
+    order = np.argsort(hashes, kind="stable")
+    if keep == "last":
+        order = order[::-1]  # the last occurrence leads each group of equal hashes
+    hashes = hashes[order]
+    repeat = np.zeros(n, dtype=bool)
+    np.equal(hashes[1:], hashes[:-1], out=repeat[1:])
+    del hashes
+
+    rows = order[repeat]
+    group = np.cumsum(~repeat)[repeat] - 1
+    first = order[np.flatnonzero(~repeat)[group]]
+    del order, group
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        left = pd.Series(column.array.take(rows))
+        right = pd.Series(column.array.take(first))
+        same = left.eq(right).to_numpy(dtype=bool, na_value=False) | (left.isna() & right.isna()).to_numpy()
+        if not same.all():
+            return df.duplicated(keep=keep)
+
+    duplicated = np.zeros(n, dtype=bool)
+    duplicated[rows] = True
+    return pd.Series(duplicated, index=df.index)
+
+
+def vectorized(config: dict) -> bool:
+    """
+    `execution.vectorized` (default true): missing-value drops and fills are
+    applied in bulk, and IQR bounds and outlier masks are computed for all
+    columns at once. false restores the column-by-column behaviour, where
+    each column's IQR bounds are computed on rows left by earlier columns, so
+    results depend on column order. Fill values are the same either way:
+    statistics of the rows left by the drop columns before each column.
+    """
+    return bool((config.get("execution", {}) or {}).get("vectorized", True))
+
+
+def _fillna(series: pd.Series, value) -> pd.Series:
+    # Categorical columns only accept known categories as fill values
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+def _fillna_all(df: pd.DataFrame, fills: dict, inplace: bool = False) -> pd.DataFrame:
+    # One DataFrame.fillna for every column; categoricals first get their new categories.
+    # In place, columns are filled one at a time so each replaced buffer can go at once
+    if inplace:
+        for col, value in fills.items():
+            df[col] = _fillna(df[col], value)
+        return df
+    for col, value in fills.items():
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+            df[col] = series.cat.add_categories([value])
+    return df.fillna(fills) if fills else df
+
+
+def duplicate_subset(dup_cfg: dict, columns) -> list | None:
+    """
+    Key columns from `duplicates.subset`, or None to compare whole rows.
+    """
+    subset = dup_cfg.get("subset")
+    if not subset:
+        return None
+    if isinstance(subset, str):
+        subset = [subset]
+    unknown = [col for col in subset if col not in columns]
+    if unknown:
+        raise ValueError(f"duplicates.subset refers to unknown columns: {unknown}")
+    return list(subset)
+
+
+def _column_stats(stats: ColumnStats | None, cleaned: pd.DataFrame, df: pd.DataFrame) -> ColumnStats | None:
+    # Cached stats describe `df`; they stay valid for a column until rows are dropped.
+    if stats is not None and cleaned.shape[0] == df.shape[0]:
+        return stats
+    return None
+
+
+def _strategy(series: pd.Series, rules: dict) -> str:
+    return rules["num_strategy"] if pd.api.types.is_numeric_dtype(series) else rules["txt_strategy"]
+
+
+def _missing_rule(series: pd.Series, col_stats: ColumnStats | None, rules: dict, sketch_error: float | None):
+    """
+    What the missing config does to one column: ("fill", value), ("drop", None)
+    or (None, None) for no change. `col_stats` must describe `series`'s rows.
+    """
+    col = series.name
+    strategy = _strategy(series, rules)
+    if pd.api.types.is_numeric_dtype(series):
+        if strategy == "median":
+            if col_stats is not None:
+                return "fill", col_stats.quantiles(col, [0.5], sketch_error)[0]
+            if sketch_error is None:
+                return "fill", series.median()
+            return "fill", column_quantiles(series, [0.5], sketch_error)[0]
+        if strategy == "mean":
+            return "fill", col_stats.mean(col) if col_stats is not None else series.mean()
+        if strategy == "zero":
+            return "fill", 0
+        if strategy == "constant" and rules["num_fill_val"] is not None:
+            return "fill", rules["num_fill_val"]
+        if strategy == "drop":
+            return "drop", None
+        return None, None
+
+    if strategy == "mode":
+        if col_stats is not None:
+            mode_val = col_stats.mode(col)
+            return "fill", mode_val if mode_val is not None else rules["txt_fill_val"]
+        mode_vals = series.mode()
+        return "fill", mode_vals.iloc[0] if not mode_vals.empty else rules["txt_fill_val"]
+    if strategy == "Unknown":
+        return "fill", "Unknown"
+    if strategy == "constant":
+        return "fill", rules["txt_fill_val"]
+    if strategy == "drop":
+        return "drop", None
+    return None, None
+
+
+def handle_missing_values(
+    df: pd.DataFrame,
+    config: dict,
+    stats: ColumnStats | None = None,
+    *,
+    copy: bool = True,
+    inplace: bool = False,
+    learned: dict | None = None,
+) -> tuple[pd.DataFrame, int]:
     """
     Fill/drop missing values based on config settings.
+    The median comes from a quantile sketch when `quantiles.method` is "sketch".
+    A shared ColumnStats supplies medians/means/modes and is updated afterwards.
+    copy=False skips the up-front deep copy (see enable_copy_on_write).
+    inplace=True lets every stage consume its input instead: columns are
+    replaced and rows taken in `df` itself, one column at a time, so the
+    input's buffers are freed as the output is built. The caller must not use
+    `df` afterwards (the stages' result replaces it).
+    Pass a dict as `learned` to record the fill values and drop columns used.
     Returns: (cleaned_df, missing_handled_count)
     missing_handled_count = total_missing_before - total_missing_after
     """
-    cleaned = df.copy()
+    if stats is not None:
+        stats.check(df)
+        stats.prefetch()
+    cleaned = _stage_frame(df, copy, inplace)
 
     missing_cfg = config.get("missing", {})
     num_cfg = missing_cfg.get("numeric", {})
     txt_cfg = missing_cfg.get("text", {})
-
-    num_strategy = num_cfg.get("strategy", "median")
-    num_fill_val = num_cfg.get("fill_value", None)
-
-    txt_strategy = txt_cfg.get("strategy", "Unknown")
-    txt_fill_val = txt_cfg.get("fill_value", "Unknown")
-
-    missing_before = int(cleaned.isna().sum().sum())
-
-    for col in list(cleaned.columns):
-        if pd.api.types.is_numeric_dtype(cleaned[col]):
-            if num_strategy == "median":
-                cleaned[col] = cleaned[col].fillna(cleaned[col].median())
-            elif num_strategy == "mean":
-                cleaned[col] = cleaned[col].fillna(cleaned[col].mean())
-            elif num_strategy == "zero":
-                cleaned[col] = cleaned[col].fillna(0)
-            elif num_strategy == "constant" and num_fill_val is not None:
-                cleaned[col] = cleaned[col].fillna(num_fill_val)
-            elif num_strategy == "drop":
-                cleaned = cleaned.dropna(subset=[col])
-        else:
-            if txt_strategy == "mode":
-                mode_vals = cleaned[col].mode()
-                fill_value = mode_vals.iloc[0] if not mode_vals.empty else txt_fill_val
-                cleaned[col] = cleaned[col].fillna(fill_value)
-            elif txt_strategy == "Unknown":
-                cleaned[col] = cleaned[col].fillna("Unknown")
-            elif txt_strategy == "constant":
-                cleaned[col] = cleaned[col].fillna(txt_fill_val)
-            elif txt_strategy == "drop":
-                cleaned = cleaned.dropna(subset=[col])
+    rules = {
+        "num_strategy": num_cfg.get("strategy", "median"),
+        "num_fill_val": num_cfg.get("fill_value", None),
+        "txt_strategy": txt_cfg.get("strategy", "Unknown"),
+        "txt_fill_val": txt_cfg.get("fill_value", "Unknown"),
+    }
+    sketch_error = quantile_error(config)
+
+    missing_before = stats.total_missing() if stats is not None else int(cleaned.isna().sum().sum())
+    filled = []
+    fills: dict = {}
+    drops: list = []
+
+    if vectorized(config):
+        # Each fill value comes from the rows left by the drop columns before
+        # its column, as column by column; rows are then taken once and all
+        # columns filled in one call
+        keep = None
+        partial = False
+        to_fill: dict = {}
+        for col in cleaned.columns:
+            if _strategy(cleaned[col], rules) == "drop":
+                drops.append(col)
+                present = cleaned[col].notna().to_numpy()
+                keep = present if keep is None else keep & present
+                partial = not keep.all()
+                continue
+            col_stats = _column_stats(stats, cleaned, df) if not partial else None
+            series = cleaned[col][keep] if partial else cleaned[col]
+            action, value = _missing_rule(series, col_stats, rules, sketch_error)
+            if action != "fill":
+                continue
+            fills[col] = value
+            if col_stats is None:
+                to_fill[col] = value
+            elif col_stats.missing(col):
+                to_fill[col] = value
+                filled.append(col)
+                # stale once filled: free the entry before the next column's is built
+                col_stats.invalidate([col])
+        if partial:
+            cleaned = _take_rows(cleaned, keep, inplace)
+        cleaned = _fillna_all(cleaned, to_fill, inplace)
+    else:
+        for col in list(cleaned.columns):
+            col_stats = _column_stats(stats, cleaned, df)
+            if col_stats is not None and col_stats.missing(col):
+                filled.append(col)
+
+            action, value = _missing_rule(cleaned[col], col_stats, rules, sketch_error)
+            if action == "fill":
+                cleaned[col] = _fillna(cleaned[col], value)
+                fills[col] = value
+            elif action == "drop":
+                cleaned = _take_rows(cleaned, cleaned[col].notna(), inplace)
+                drops.append(col)
 
     missing_after = int(cleaned.isna().sum().sum())
     missing_handled = max(0, missing_before - missing_after)
 
+    if learned is not None:
+        # fillna(NaN) is a no-op, so an all-missing column has nothing to record
+        learned["missing"] = {
+            "fill": {col: value for col, value in fills.items() if not pd.isna(value)},
+            "drop": drops,
+        }
+
+    if stats is not None:
+        rows_changed = cleaned.shape[0] != df.shape[0]
+        stats.update(cleaned, changed=None if rows_changed else filled)
+
     return cleaned, missing_handled
 
 
-def handle_duplicates(df: pd.DataFrame, config: dict) -> tuple[pd.DataFrame, int]:
+def handle_duplicates(
+    df: pd.DataFrame,
+    config: dict,
+    stats: ColumnStats | None = None,
+    *,
+    copy: bool = True,
+    inplace: bool = False,
+    learned: dict | None = None,
+) -> tuple[pd.DataFrame, int]:
     """
     Handle duplicates based on config strategy.
+    `duplicates.subset` limits the comparison to key columns.
     Returns: (cleaned_df, duplicates_removed)
     """
-    strategy = config.get("duplicates", {}).get("strategy", "remove")
+    if stats is not None:
+        stats.check(df)
+    dup_cfg = config.get("duplicates", {})
+    strategy = dup_cfg.get("strategy", "remove")
+    subset = duplicate_subset(dup_cfg, df.columns)
 
     before = int(df.shape[0])
 
-    if strategy == "remove":
-        cleaned = df.drop_duplicates().copy()
-    elif strategy == "keep_first":
-        cleaned = df.drop_duplicates(keep="first").copy()
-    elif strategy == "keep_last":
-        cleaned = df.drop_duplicates(keep="last").copy()
-    elif strategy == "none":
-        cleaned = df.copy()
+    if strategy in ("remove", "keep_first", "keep_last"):
+        duplicated = _duplicated(df[subset] if subset else df, keep="last" if strategy == "keep_last" else "first")
+        # Only take rows when something is removed; otherwise keep sharing buffers
+        cleaned = _take_rows(df, ~duplicated, inplace)
     else:
-        cleaned = df.copy()
+        cleaned = df
+    cleaned = _stage_frame(cleaned, copy, inplace)
 
     after = int(cleaned.shape[0])
     removed = max(0, before - after)
 
+    if learned is not None:
+        learned["duplicates"] = {"strategy": strategy, "subset": subset}
+
+    if stats is not None:
+        stats.update(cleaned, changed=None if removed else [])
+
     return cleaned, removed
 
 
-def handle_outliers(df: pd.DataFrame, config: dict) -> tuple[pd.DataFrame, int]:
+def _iqr_bounds(
+    df: pd.DataFrame, columns: list, stats: ColumnStats | None, sketch_error: float | None
+) -> dict:
+    """
+    IQR bounds (Q1 - 1.5 IQR, Q3 + 1.5 IQR) of every column in `columns`, all
+    computed on the same rows: from shared stats when given, otherwise with one
+    DataFrame.quantile call for the exact quartiles.
+    """
+    quartiles = {}
+    if stats is not None:
+        quartiles = {col: stats.quantiles(col, [0.25, 0.75], sketch_error) for col in columns}
+    elif sketch_error is None:
+        batched = [col for col in columns if not pd.api.types.is_bool_dtype(df[col])]
+        if batched:
+            table = df[batched].quantile([0.25, 0.75])
+            quartiles = {col: [float(v) for v in table[col]] for col in batched}
+
+    bounds = {}
+    for col in columns:
+        q1, q3 = quartiles[col] if col in quartiles else column_quantiles(df[col], [0.25, 0.75], sketch_error)
+        iqr = q3 - q1
+        bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    return bounds
+
+
+def handle_outliers(
+    df: pd.DataFrame,
+    config: dict,
+    stats: ColumnStats | None = None,
+    *,
+    copy: bool = True,
+    inplace: bool = False,
+    learned: dict | None = None,
+) -> tuple[pd.DataFrame, int]:
     """
     Simple outlier handling based on IQR.
+    Quartiles come from a quantile sketch when `quantiles.method` is "sketch".
+    Bounds of all columns are computed on the same rows and `drop` applies
+    one combined mask, unless `execution.vectorized` is false (see vectorized).
+    Pass a dict as `learned` to record the IQR bounds applied per column.
     Returns: (cleaned_df, outliers_removed_rows)
     If action != drop => removed = 0
     """
-    cleaned = df.copy()
+    if stats is not None:
+        stats.check(df)
+    cleaned = _stage_frame(df, copy, inplace)
     out_cfg = config.get("outliers", {})
     action = out_cfg.get("action", "flag")
     method = out_cfg.get("method", "IQR")
+    sketch_error = quantile_error(config)
 
     before_rows = int(cleaned.shape[0])
+    capped = []
+    bounds: dict = {}
 
-    if method == "IQR":
-        for col in list(cleaned.columns):
-            if pd.api.types.is_numeric_dtype(cleaned[col]):
-                Q1 = cleaned[col].quantile(0.25)
-                Q3 = cleaned[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower = Q1 - 1.5 * IQR
-                upper = Q3 + 1.5 * IQR
-
-                if action == "drop":
-                    cleaned = cleaned[(cleaned[col] >= lower) & (cleaned[col] <= upper)]
-                elif action == "cap":
-                    cleaned[col] = cleaned[col].clip(lower, upper)
-                # flag => no change
+    sequential = not vectorized(config)
+    num_cols = [col for col in cleaned.columns if pd.api.types.is_numeric_dtype(cleaned[col])]
+
+    if stats is not None and method == "IQR" and (sequential or action in ("drop", "cap")):
+        stats.prefetch(num_cols)
+
+    if method == "IQR" and sequential:
+        for col in num_cols:
+            col_stats = _column_stats(stats, cleaned, df)
+            if col_stats is not None:
+                Q1, Q3 = col_stats.quantiles(col, [0.25, 0.75], sketch_error)
+            else:
+                Q1, Q3 = column_quantiles(cleaned[col], [0.25, 0.75], sketch_error)
+            IQR = Q3 - Q1
+            lower = Q1 - 1.5 * IQR
+            upper = Q3 + 1.5 * IQR
+
+            if action == "drop":
+                cleaned = _take_rows(cleaned, (cleaned[col] >= lower) & (cleaned[col] <= upper), inplace)
+                bounds[col] = (lower, upper)
+            elif action == "cap":
+                cleaned[col] = cleaned[col].clip(lower, upper)
+                capped.append(col)
+                bounds[col] = (lower, upper)
+            # flag => no change
+
+    elif method == "IQR" and action in ("drop", "cap") and num_cols:
+        # All bounds from the same rows; drop then applies one combined mask
+        bounds = _iqr_bounds(cleaned, num_cols, stats, sketch_error)
+        if action == "drop":
+            keep = np.ones(before_rows, dtype=bool)
+            for col, (lower, upper) in bounds.items():
+                values = cleaned[col]
+                keep &= ((values >= lower) & (values <= upper)).to_numpy(dtype=bool, na_value=False)
+            cleaned = _take_rows(cleaned, keep, inplace)
+        else:
+            # per-column clip: DataFrame.clip(axis=1) on mixed dtypes is slower.
+            # Capping makes the columns' entries stale: free their sorted values first
+            if stats is not None:
+                stats.invalidate(num_cols)
+            for col, (lower, upper) in bounds.items():
+                cleaned[col] = cleaned[col].clip(lower, upper)
+            capped = num_cols
 
     after_rows = int(cleaned.shape[0])
     removed = max(0, before_rows - after_rows) if action == "drop" else 0
 
+    if learned is not None:
+        learned["outliers"] = {"action": action, "bounds": bounds}
+
+    if stats is not None:
+        stats.update(cleaned, changed=None if after_rows != before_rows else capped)
+
     return cleaned, removed
 
 
-def handle_scaling(df: pd.DataFrame, config: dict) -> tuple[pd.DataFrame, str]:
+def handle_scaling(
+    df: pd.DataFrame,
+    config: dict,
+    stats: ColumnStats | None = None,
+    *,
+    copy: bool = True,
+    inplace: bool = False,
+    learned: dict | None = None,
+) -> tuple[pd.DataFrame, str]:
     """
     Scale numeric columns based on config.
+    Pass a dict as `learned` to record each column's scaler state as
+    (offset, scale), so that scaled = (value - offset) / scale.
     Returns: (cleaned_df, scaling_applied)
     scaling_applied: "standard" | "minmax" | "none"
     """
-    cleaned = df.copy()
+    if stats is not None:
+        stats.check(df)
+    cleaned = _stage_frame(df, copy, inplace)
     method = config.get("scaling", {}).get("numeric", "none")
 
     num_cols = [col for col in cleaned.columns if pd.api.types.is_numeric_dtype(cleaned[col])]
-    scaler = None
-
-    if method == "standard":
-        scaler = StandardScaler()
-    elif method == "minmax":
-        scaler = MinMaxScaler()
 
-    if scaler is not None and num_cols:
-        cleaned[num_cols] = scaler.fit_transform(cleaned[num_cols])
+    if method in ("standard", "minmax") and num_cols:
+        if config.get("scaling", {}).get("implementation", "numpy") == "sklearn":
+            params = _sklearn_scale(cleaned, num_cols, method)
+        else:
+            params = _numpy_scale(cleaned, num_cols, method)
+        if stats is not None:
+            stats.update(cleaned, changed=num_cols)
+        if learned is not None:
+            learned["scaling"] = {"method": method, "params": params}
         return cleaned, method
 
+    if stats is not None:
+        stats.update(cleaned, changed=[])
+    if learned is not None:
+        learned["scaling"] = {"method": "none", "params": {}}
     return cleaned, "none"
+
+
+def _fit_scale(values: np.ndarray, method: str) -> tuple[float, float]:
+    # (offset, scale) of one float column, NaNs ignored. Constant columns get scale 1,
+    # with the same float tolerance as sklearn's StandardScaler / MinMaxScaler.
+    nan = np.isnan(values)
+    present = values[~nan] if nan.any() else values
+    if present.size == 0:
+        return float("nan"), float("nan")
+    eps = np.finfo(np.float64).eps
+    if method == "standard":
+        offset = float(present.mean())
+        var = float(present.var())
+        n = present.size
+        constant = var <= n * eps * var + (n * offset * eps) ** 2
+        return offset, 1.0 if constant else var**0.5
+    offset = float(present.min())
+    data_range = float(present.max()) - offset
+    return offset, 1.0 if data_range < 10 * eps else data_range
+
+
+def _numpy_scale(cleaned: pd.DataFrame, columns: list, method: str) -> dict:
+    """
+    Scale `columns` of `cleaned` to (value - offset) / scale, one float64
+    column at a time: a single copy per column (the output), updated in place.
+    Returns {col: (offset, scale)}.
+    """
+    params = {}
+    for col in columns:
+        values = cleaned[col].to_numpy(dtype="float64", na_value=np.nan, copy=True)
+        if np.isinf(values).any():
+            raise ValueError(f"Cannot scale column {col!r}: it contains infinite values")
+        offset, scale = _fit_scale(values, method)
+        values -= offset
+        values /= scale
+        cleaned[col] = values
+        params[col] = (offset, scale)
+    return params
+
+
+def _sklearn_scale(cleaned: pd.DataFrame, columns: list, method: str) -> dict:
+    # scaling.implementation: "sklearn"; imported here so other runs skip its import cost
+    from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+    scaler = StandardScaler() if method == "standard" else MinMaxScaler()
+    cleaned[columns] = scaler.fit_transform(cleaned[columns])
+    # Both scalers reduce to (value - offset) / scale; zero scales are already replaced by 1
+    if method == "standard":
+        offsets, scales = scaler.mean_, scaler.scale_
+    else:
+        offsets, scales = scaler.data_min_, 1 / scaler.scale_
+    return {col: (float(offset), float(scale)) for col, offset, scale in zip(columns, offsets, scales)}
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.parallel import map_columns, sort_numeric_columns
+from src.sketches import HyperLogLog, MisraGries, hash_values, sketch_series
+
+# Rows hashed per batch when sketching a column (bounds the temporary hash arrays)
+SKETCH_BATCH_ROWS = 1 << 17
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _numeric_entry(rows: int, present: np.ndarray) -> dict:
+    # `present`: sorted non-NaN values of the column
+    return {
+        "rows": rows,
+        "numeric": True,
+        "sorted": present,
+        "count": int(present.size),
+        "missing": rows - int(present.size),
+        "nunique": int(np.count_nonzero(np.diff(present)) + 1) if present.size else 0,
+    }
+
+
+def _other_entry(series: pd.Series) -> dict:
+    counts = series.value_counts()
+    return {
+        "rows": int(series.shape[0]),
+        "numeric": False,
+        "counts": counts,
+        "count": int(counts.sum()),
+        "missing": int(series.isna().sum()),
+        # categorical value_counts() also lists unused categories
+        "nunique": int(np.count_nonzero(counts.to_numpy())),
+    }
+
+
+class ColumnStats:
+    """
+    Per-column statistics computed once and shared by the validator,
+    profiler and cleaner.
+
+    Numeric columns are sorted once; count, missing, unique count, min/max,
+    mean/std and every quantile come from that single pass. Other columns
+    run value_counts() once; unique count, mode and top values come from it.
+    Stages that change the data call update() so stale entries are dropped.
+
+    With workers > 1, prefetch() computes missing entries for many columns
+    at once on a process pool; numeric columns are sorted in shared memory
+    and Arrow-backed text columns reach the workers through it too.
+    The entries are identical to the ones computed lazily in-process.
+
+    sketch() summarizes a text column in fixed memory instead (HyperLogLog
+    distinct count, Misra-Gries top values) for --fast-profile.
+    """
+
+    def __init__(self, df: pd.DataFrame, workers: int = 1):
+        self.df = df
+        self.workers = workers
+        self._cache: dict = {}
+        self._parsed: dict = {}
+        self._sketched: dict = {}
+
+    def check(self, df: pd.DataFrame) -> None:
+        if df is not self.df:
+            raise ValueError("ColumnStats is bound to a different DataFrame; call update() after each stage.")
+
+    def update(self, df: pd.DataFrame, changed: list | None = None) -> None:
+        """
+        Rebind to the frame a stage returned.
+        changed=None means rows changed, so every column is invalidated.
+        """
+        self.df = df
+        self.invalidate(changed)
+
+    def invalidate(self, columns: list | None = None) -> None:
+        if columns is None:
+            self._cache.clear()
+            self._parsed.clear()
+            self._sketched.clear()
+            return
+        for col in columns:
+            self._cache.pop(col, None)
+            self._sketched.pop(col, None)
+            for key in [key for key in self._parsed if key[0] == col]:
+                del self._parsed[key]
+
+    def prefetch(self, columns: list | None = None) -> None:
+        """
+        Compute entries for `columns` (default: all) on the process pool.
+        A no-op with a single worker; entries are then computed on first use.
+        """
+        if self.workers <= 1:
+            return
+
+        columns = self.pending(columns)
+        numeric = {col: self.df[col] for col in columns if _is_numeric(self.df[col])}
+        other = {col: (self.df[col],) for col in columns if col not in numeric}
+
+        # Series, not float64 copies: each column is converted only when its task is submitted
+        for col, present in sort_numeric_columns(numeric, self.workers).items():
+            self._cache[col] = _numeric_entry(int(numeric[col].shape[0]), present)
+
+        for col, entry in map_columns(_other_entry, other, self.workers).items():
+            self._cache[col] = entry
+
+    def pending(self, columns: list | None = None) -> list:
+        """
+        Columns of `columns` (default: all) without a computed entry.
+        """
+        return [col for col in (self.df.columns if columns is None else columns) if col not in self._cache]
+
+    def entries(self, columns: list) -> dict:
+        """
+        {column: entry}, computed where missing; adopt() takes them into a
+        ColumnStats bound to the same data, e.g. from a pool worker.
+        """
+        return {col: self._entry(col) for col in columns}
+
+    def adopt(self, entries: dict) -> None:
+        self._cache.update(entries)
+
+    def _entry(self, col) -> dict:
+        entry = self._cache.get(col)
+        if entry is None:
+            entry = self._compute(self.df[col])
+            self._cache[col] = entry
+        return entry
+
+    @staticmethod
+    def _compute(series: pd.Series) -> dict:
+        if _is_numeric(series):
+            # sort with NaN last, exactly like the shared-memory workers do
+            ordered = np.sort(series.to_numpy(dtype="float64", na_value=np.nan))
+            present = ordered[: int(np.count_nonzero(~np.isnan(ordered)))]
+            return _numeric_entry(int(series.shape[0]), present)
+        return _other_entry(series)
+
+    # --- shared by every column ---
+
+    def missing(self, col) -> int:
+        return self._entry(col)["missing"]
+
+    def total_missing(self) -> int:
+        # columns without an entry are counted directly instead of building one just for this
+        return sum(
+            self._cache[col]["missing"] if col in self._cache else int(self.df[col].isna().sum())
+            for col in self.df.columns
+        )
+
+    def nunique(self, col) -> int:
+        return self._entry(col)["nunique"]
+
+    # --- numeric columns ---
+
+    def quantiles(self, col, qs: list[float], error: float | None = None) -> list[float]:
+        """
+        Linear-interpolated quantiles like Series.quantile(), or KLL sketch
+        quantiles when `error` is given.
+        """
+        entry = self._entry(col)
+        if error is not None:
+            key = ("sketch", error)
+            if key not in entry:
+                entry[key] = sketch_series(self.df[col], error)
+            return entry[key].quantiles(qs)
+        if not entry["numeric"]:
+            return [float(v) for v in self.df[col].quantile(qs)]
+
+        present = entry["sorted"]
+        if present.size == 0:
+            return [float("nan") for _ in qs]
+
+        result = []
+        for q in qs:
+            pos = q * (present.size - 1)
+            lo = int(np.floor(pos))
+            hi = min(lo + 1, present.size - 1)
+            result.append(float(present[lo] + (present[hi] - present[lo]) * (pos - lo)))
+        return result
+
+    def median(self, col) -> float:
+        return self.quantiles(col, [0.5])[0]
+
+    def mean(self, col) -> float:
+        entry = self._entry(col)
+        if not entry["numeric"]:
+            return self.df[col].mean()
+        if "mean" not in entry:
+            # Summed in row order like Series.mean/std: the sorted values round differently
+            series = self.df[col]
+            entry["mean"] = float(series.mean())
+            entry["std"] = float(series.std())
+        return entry["mean"]
+
+    def describe(self, col, error: float | None = None) -> dict:
+        """
+        Same keys as Series.describe() on a numeric column.
+        """
+        entry = self._entry(col)
+        if not entry["numeric"]:
+            return self.df[col].describe().to_dict()
+
+        present = entry["sorted"]
+        Q1, median, Q3 = self.quantiles(col, [0.25, 0.5, 0.75], error)
+        mean = self.mean(col)
+        return {
+            "count": float(entry["count"]),
+            "mean": mean,
+            "std": entry["std"],
+            "min": float(present[0]) if present.size else float("nan"),
+            "25%": Q1,
+            "50%": median,
+            "75%": Q3,
+            "max": float(present[-1]) if present.size else float("nan"),
+        }
+
+    # --- text / other columns ---
+
+    def mode(self, col):
+        """
+        First value of Series.mode() (smallest of the most frequent), or None.
+        """
+        counts = self._entry(col)["counts"]
+        if counts.empty:
+            return None
+        tied = counts[counts == counts.iloc[0]].index.tolist()
+        try:
+            return sorted(tied)[0]
+        except TypeError:
+            return tied[0]
+
+    def top_values(self, col, n: int = 3) -> dict:
+        """
+        Same as value_counts(normalize=True).head(n).
+        """
+        counts = self._entry(col)["counts"]
+        if counts.empty:
+            return {}
+        return (counts.head(n) / counts.sum()).to_dict()
+
+    def sketch(self, col, precision: int, top_k: int) -> dict:
+        """
+        Fixed-memory summary of a text column, read in batches:
+        {"missing": exact count, "nunique": estimate, "distinct": HyperLogLog,
+        "frequent": MisraGries}.
+        Memory is bounded by the batch size, not the column's cardinality; the
+        sketches merge with those of other chunks.
+        """
+        key = (precision, top_k)
+        entry = self._sketched.get(col)
+        if entry is None or entry["settings"] != key:
+            series = self.df[col]
+            distinct, frequent = HyperLogLog(precision), MisraGries(top_k)
+            for start in range(0, len(series), SKETCH_BATCH_ROWS):
+                # a batch's counts are at most SKETCH_BATCH_ROWS entries; only its distinct values are hashed
+                counts = series.iloc[start : start + SKETCH_BATCH_ROWS].value_counts(sort=False)
+                counts = counts[counts > 0]  # categorical value_counts() also lists unused categories
+                distinct.update_hashes(hash_values(counts.index.to_series()))
+                frequent.update_counts(counts)
+            missing = int(series.isna().sum())
+            entry = {
+                "settings": key,
+                "missing": missing,
+                # the estimate can overshoot a column of all-distinct values
+                "nunique": min(distinct.count(), len(series) - missing),
+                "distinct": distinct,
+                "frequent": frequent,
+            }
+            self._sketched[col] = entry
+        return entry
+
+    # --- parse checks used by type inference ---
+
+    def parsable_count(self, col, kind: str, fmt: str | None = None) -> int:
+        """
+        Number of values that parse as `kind` ("numeric" | "datetime").
+        A datetime `fmt` uses the fixed-format parser instead of format guessing.
+        """
+        key = (col, kind, fmt)
+        if key not in self._parsed:
+            series = self.df[col]
+            if kind == "numeric":
+                converted = pd.to_numeric(series, errors="coerce")
+            elif fmt is not None:
+                converted = pd.to_datetime(series, format=fmt, errors="coerce")
+            else:
+                converted = pd.to_datetime(series, errors="coerce")
+            self._parsed[key] = int(converted.notna().sum())
+        return self._parsed[key]
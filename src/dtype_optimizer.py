@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from src.type_validator import parse_datetime
+
+DEFAULT_CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def format_bytes(size: int) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.2f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def _memory(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def _lossless(converted: pd.Series, original: pd.Series) -> pd.Series | None:
+    # Accept a conversion only if every non-missing value survived it
+    return converted if int(converted.notna().sum()) == int(original.notna().sum()) else None
+
+
+def _downcast_numeric(series: pd.Series) -> pd.Series:
+    # Floats stay float64: fill values, caps and scaled values written into them later need its precision
+    if pd.api.types.is_integer_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    return series
+
+
+def optimize_dtypes(df: pd.DataFrame, type_report: dict, config: dict | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    Shrink a frame using what infer_column_types found:
+    - integers downcast to the smallest width that keeps every value
+    - text detected as datetime parsed with its cached format
+    - low-cardinality text (uniqueness <= `dtypes.category_max_unique_ratio`) to category
+    Conversions that would turn any value into NaN/NaT are skipped. Floats
+    and numbers stored as text keep their type, so the cleaning stages
+    compute and write the same values as without this stage.
+    Returns: (optimized_df, {"memory_before", "memory_after", "changes"})
+    """
+    dtype_cfg = (config or {}).get("dtypes", {}) or {}
+    max_unique_ratio = float(dtype_cfg.get("category_max_unique_ratio", DEFAULT_CATEGORY_MAX_UNIQUE_RATIO))
+
+    memory_before = _memory(df)
+    optimized = df.copy(deep=False)
+    changes = {}
+
+    for col in df.columns:
+        series = df[col]
+        info = type_report.get(col, {})
+        converted = None
+
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_numeric_dtype(series):
+            converted = _downcast_numeric(series)
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            detected = info.get("detected_type")
+            if detected == "datetime":
+                converted = _lossless(parse_datetime(series, info.get("datetime_format")), series)
+
+            if converted is None and info.get("uniqueness_%", 100) <= max_unique_ratio * 100:
+                converted = series.astype("category")
+
+        if converted is not None and converted.dtype != series.dtype:
+            optimized[col] = converted
+            changes[col] = (str(series.dtype), str(converted.dtype))
+
+    report = {
+        "memory_before": memory_before,
+        "memory_after": _memory(optimized),
+        "changes": changes,
+    }
+    return optimized, report
+
+
+def print_dtype_report(dtype_report: dict) -> None:
+    """
+    Print the dtype changes and memory saved.
+    """
+    print("\n=== Dtype Optimization Report ===\n")
+
+    before = dtype_report["memory_before"]
+    after = dtype_report["memory_after"]
+    saved = (1 - after / before) * 100 if before else 0.0
+    print(f"Memory before: {format_bytes(before)}")
+    print(f"Memory after: {format_bytes(after)} ({saved:.1f}% saved)")
+
+    if not dtype_report["changes"]:
+        print("No dtype changes.")
+    for col, (old, new) in dtype_report["changes"].items():
+        print(f"  - {col}: {old} -> {new}")
+    print()
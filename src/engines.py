@@ -0,0 +1,599 @@
+from __future__ import annotations
+
+import importlib
+import math
+from pathlib import Path
+
+from src.cleaner import duplicate_subset, vectorized
+from src.loader import sniff_csv
+from src.perf import StageRecorder
+
+ENGINES = ["pandas", "polars", "duckdb"]
+
+# Formats the lazy engines scan and sink without going through pandas
+ENGINE_INPUT_EXTENSIONS = [".csv", ".txt", ".parquet", ".pq"]
+ENGINE_OUTPUT_FORMATS = ["csv", "parquet"]
+
+# pandas.read_csv's default missing-value markers, so every engine reads the same cells as missing
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+_DEDUPE_KEEP = {"remove": "first", "keep_first": "first", "keep_last": "last"}
+
+
+def execution_engine(config: dict) -> str:
+    """
+    `execution.engine` from the config: pandas (default, the reference
+    implementation), polars or duckdb.
+    """
+    engine = (config.get("execution", {}) or {}).get("engine") or "pandas"
+    if engine not in ENGINES:
+        raise ValueError(f"execution.engine must be one of {', '.join(ENGINES)}, got {engine!r}")
+    return engine
+
+
+def _require(module: str, engine: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ValueError(f"execution.engine '{engine}' requires the {module} package (pip install {module}): {e}")
+
+
+def _present(value) -> bool:
+    return value is not None and not (isinstance(value, float) and math.isnan(value))
+
+
+def _earlier_drops(columns: list, drops: list) -> dict:
+    # Per column, the drop columns before it: fill statistics leave out the rows they drop
+    earlier, seen = {}, []
+    for col in columns:
+        earlier[col] = list(seen)
+        if col in drops:
+            seen.append(col)
+    return earlier
+
+
+class _PolarsPlan:
+    """
+    Cleaning stages as a Polars LazyFrame over the input file. Statistics
+    are separate lazy aggregations; the cleaned output is sunk to disk by the
+    streaming engine without collecting the frame.
+    """
+
+    def __init__(self, path: Path, settings: dict | None):
+        pl = self.pl = _require("polars", "polars")
+        if settings is None:
+            self.source = pl.scan_parquet(path)
+        else:
+            self.source = pl.scan_csv(
+                path,
+                separator=settings["sep"],
+                null_values=NA_VALUES,
+                infer_schema_length=None,
+                encoding="utf8",
+            )
+        schema = self.source.collect_schema()
+        self.columns = list(schema.names())
+        self.numeric = [col for col, dtype in schema.items() if dtype.is_numeric()]
+        self.integer = {col for col, dtype in schema.items() if dtype.is_integer()}
+
+    def frame(self, params: dict):
+        pl = self.pl
+        lf = self.source
+
+        missing = params.get("missing")
+        if missing:
+            # pandas reads integer columns with gaps as float64
+            floats = [col for col in missing["nulls"] if col in self.integer]
+            if floats:
+                lf = lf.with_columns([pl.col(col).cast(pl.Float64) for col in floats])
+            if missing["drop"]:
+                lf = lf.drop_nulls(subset=missing["drop"])
+            fills = {col: value for col, value in missing["fill"].items() if col in missing["nulls"]}
+            if fills:
+                lf = lf.with_columns([pl.col(col).fill_null(value) for col, value in fills.items()])
+
+        duplicates = params.get("duplicates")
+        if duplicates and duplicates["strategy"] in _DEDUPE_KEEP:
+            lf = lf.unique(subset=duplicates["subset"], keep=_DEDUPE_KEEP[duplicates["strategy"]], maintain_order=True)
+
+        outliers = params.get("outliers")
+        if outliers and outliers["bounds"]:
+            bounds = outliers["bounds"]
+            if outliers["action"] == "drop":
+                lf = lf.filter(pl.all_horizontal([pl.col(col).is_between(lo, hi) for col, (lo, hi) in bounds.items()]))
+            elif outliers["action"] == "cap":
+                integer = outliers["integer"]
+                lf = lf.with_columns(
+                    [pl.col(col).clip(*integer[col]) for col in bounds if col in integer]
+                    + [pl.col(col).cast(pl.Float64).clip(lo, hi) for col, (lo, hi) in bounds.items() if col not in integer]
+                )
+
+        scaling = params.get("scaling")
+        if scaling and scaling["params"]:
+            lf = lf.with_columns(
+                [(pl.col(col).cast(pl.Float64) - offset) / scale for col, (offset, scale) in scaling["params"].items()]
+            )
+        return lf
+
+    def scan_missing(self, drops: list, stats: dict, modes: list) -> dict:
+        pl = self.pl
+        keep = pl.all_horizontal([pl.col(col).is_not_null() for col in drops]) if drops else pl.lit(True)
+
+        exprs = [pl.len().alias("rows"), (keep.sum() if drops else pl.len()).alias("kept")]
+        for i, col in enumerate(self.columns):
+            exprs.append(pl.col(col).null_count().alias(f"null_{i}"))
+            exprs.append(pl.col(col).filter(keep).null_count().alias(f"kept_null_{i}"))
+        earlier = _earlier_drops(self.columns, drops)
+        for i, col in enumerate(self.columns):
+            prior = earlier[col]
+            rows = pl.all_horizontal([pl.col(d).is_not_null() for d in prior]) if prior else pl.lit(True)
+            kept = pl.col(col).filter(rows)
+            if col in stats:
+                exprs.append((kept.median() if stats[col] == "median" else kept.mean()).alias(f"stat_{i}"))
+            if col in modes:
+                # most frequent value, smallest first on ties (like ColumnStats.mode)
+                exprs.append(kept.drop_nulls().mode().min().alias(f"mode_{i}"))
+
+        row = self.source.select(exprs).collect().row(0, named=True)
+        return {
+            "rows": row["rows"],
+            "kept": row["kept"],
+            "nulls": {col: row[f"null_{i}"] for i, col in enumerate(self.columns)},
+            "kept_nulls": {col: row[f"kept_null_{i}"] for i, col in enumerate(self.columns)},
+            "values": {col: row[f"stat_{i}"] for i, col in enumerate(self.columns) if col in stats},
+            "modes": {col: row[f"mode_{i}"] for i, col in enumerate(self.columns) if col in modes},
+        }
+
+    def scan_quartiles(self, params: dict, columns: list) -> dict:
+        pl = self.pl
+        exprs = [pl.len().alias("rows")]
+        for i, col in enumerate(columns):
+            exprs.append(pl.col(col).quantile(0.25, interpolation="linear").alias(f"q1_{i}"))
+            exprs.append(pl.col(col).quantile(0.75, interpolation="linear").alias(f"q3_{i}"))
+        row = self.frame(params).select(exprs).collect().row(0, named=True)
+        return {"rows": row["rows"], "quartiles": {col: (row[f"q1_{i}"], row[f"q3_{i}"]) for i, col in enumerate(columns)}}
+
+    def scan_outside(self, params: dict, limits: dict) -> dict:
+        pl = self.pl
+        exprs = []
+        for i, (col, (lo, hi)) in enumerate(limits.items()):
+            below = pl.col(col) < lo if lo is not None else pl.lit(False)
+            above = pl.col(col) > hi if hi is not None else pl.lit(False)
+            exprs.append((below | above).any().alias(f"out_{i}"))
+        row = self.frame(params).select(exprs).collect().row(0, named=True)
+        return {col: bool(row[f"out_{i}"]) for i, col in enumerate(limits)}
+
+    def scan_scaling(self, params: dict, columns: list, method: str) -> dict:
+        pl = self.pl
+        exprs = [pl.len().alias("rows")]
+        for i, col in enumerate(columns):
+            values = pl.col(col).cast(pl.Float64)
+            if method == "standard":
+                exprs += [values.mean().alias(f"a_{i}"), values.std(ddof=0).alias(f"b_{i}")]
+            else:
+                exprs += [values.min().alias(f"a_{i}"), values.max().alias(f"b_{i}")]
+        row = self.frame(params).select(exprs).collect().row(0, named=True)
+        return {"rows": row["rows"], "stats": {col: (row[f"a_{i}"], row[f"b_{i}"]) for i, col in enumerate(columns)}}
+
+    def write(self, params: dict, output_path: Path, out_format: str) -> None:
+        lf = self.frame(params)
+        if out_format == "parquet":
+            lf.sink_parquet(output_path)
+        else:
+            lf.sink_csv(output_path)
+
+
+def _sql_name(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_value(value) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "'NaN'::DOUBLE"
+        if math.isinf(value):
+            return "'Infinity'::DOUBLE" if value > 0 else "'-Infinity'::DOUBLE"
+        return f"CAST({value!r} AS DOUBLE)"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+_DUCKDB_NUMERIC = {
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT", "FLOAT", "DOUBLE",
+}
+
+
+class _DuckDBPlan:
+    """
+    Cleaning stages as nested DuckDB SQL over the input file. DuckDB runs
+    every query on all cores and streams the final COPY to the output file,
+    spilling to disk when a stage (e.g. duplicate removal) exceeds memory.
+    Rows keep their input order through a row number column.
+    """
+
+    _ROW = "__row"
+
+    def __init__(self, path: Path, settings: dict | None):
+        duckdb = _require("duckdb", "duckdb")
+        self.con = duckdb.connect()
+        try:
+            # this rewrite of the duplicate-removal QUALIFY fails with an internal error under
+            # some outlier filters (DuckDB 1.5); the plain window plan is correct and streams
+            self.con.execute("SET disabled_optimizers = 'top_n_window_elimination'")
+        except duckdb.Error:
+            pass  # older DuckDB without this optimizer
+        if settings is None:
+            scan = f"read_parquet({_sql_value(str(path))})"
+        else:
+            na_values = ", ".join(_sql_value(value) for value in NA_VALUES)
+            scan = (
+                f"read_csv({_sql_value(str(path))}, header = true, delim = {_sql_value(settings['sep'])}, "
+                f"nullstr = [{na_values}], sample_size = -1, "
+                # pandas leaves dates as text and has no DECIMAL or TIME types
+                "auto_type_candidates = ['BOOLEAN', 'BIGINT', 'DOUBLE', 'VARCHAR'])"
+            )
+
+        relation = self.con.sql(f"SELECT * FROM {scan} LIMIT 0")
+        self.columns = list(relation.columns)
+        types = [str(dtype) for dtype in relation.types]
+        self.numeric = [
+            col for col, dtype in zip(self.columns, types) if dtype in _DUCKDB_NUMERIC or dtype.startswith("DECIMAL")
+        ]
+        self.integer = {col for col, dtype in zip(self.columns, types) if "INT" in dtype}
+        self.source = f"SELECT row_number() OVER () AS {self._ROW}, * FROM {scan}"
+
+    def frame(self, params: dict) -> str:
+        sql = self.source
+
+        missing = params.get("missing")
+        if missing:
+            # pandas reads integer columns with gaps as float64
+            floats = [col for col in missing["nulls"] if col in self.integer]
+            if floats:
+                cast = ", ".join(f"CAST({_sql_name(col)} AS DOUBLE) AS {_sql_name(col)}" for col in floats)
+                sql = f"SELECT * REPLACE ({cast}) FROM ({sql})"
+            if missing["drop"]:
+                kept = " AND ".join(f"{_sql_name(col)} IS NOT NULL" for col in missing["drop"])
+                sql = f"SELECT * FROM ({sql}) WHERE {kept}"
+            fills = {col: value for col, value in missing["fill"].items() if col in missing["nulls"]}
+            if fills:
+                filled = ", ".join(
+                    f"coalesce({_sql_name(col)}, {_sql_value(value)}) AS {_sql_name(col)}"
+                    for col, value in fills.items()
+                )
+                sql = f"SELECT * REPLACE ({filled}) FROM ({sql})"
+
+        duplicates = params.get("duplicates")
+        if duplicates and duplicates["strategy"] in _DEDUPE_KEEP:
+            keys = ", ".join(_sql_name(col) for col in (duplicates["subset"] or self.columns))
+            order = "DESC" if _DEDUPE_KEEP[duplicates["strategy"]] == "last" else "ASC"
+            sql = f"SELECT * FROM ({sql}) QUALIFY row_number() OVER (PARTITION BY {keys} ORDER BY {self._ROW} {order}) = 1"
+
+        outliers = params.get("outliers")
+        if outliers and outliers["bounds"]:
+            bounds = outliers["bounds"]
+            if outliers["action"] == "drop":
+                kept = " AND ".join(
+                    f"{_sql_name(col)} BETWEEN {_sql_value(lo)} AND {_sql_value(hi)}" for col, (lo, hi) in bounds.items()
+                )
+                sql = f"SELECT * FROM ({sql}) WHERE {kept}"
+            elif outliers["action"] == "cap":
+                # CASE rather than least/greatest, which skip NULLs
+                capped = []
+                for col, (lo, hi) in bounds.items():
+                    name = _sql_name(col)
+                    if col in outliers["integer"]:
+                        lo, hi = outliers["integer"][col]
+                        cases = [f"WHEN {name} < {lo} THEN {lo}"] if lo is not None else []
+                        cases += [f"WHEN {name} > {hi} THEN {hi}"] if hi is not None else []
+                        if cases:
+                            capped.append(f"CASE {' '.join(cases)} ELSE {name} END AS {name}")
+                        continue
+                    capped.append(
+                        f"CASE WHEN {name} < {_sql_value(lo)} THEN {_sql_value(lo)} "
+                        f"WHEN {name} > {_sql_value(hi)} THEN {_sql_value(hi)} "
+                        f"ELSE CAST({name} AS DOUBLE) END AS {name}"
+                    )
+                if capped:
+                    sql = f"SELECT * REPLACE ({', '.join(capped)}) FROM ({sql})"
+
+        scaling = params.get("scaling")
+        if scaling and scaling["params"]:
+            scaled = ", ".join(
+                f"(CAST({_sql_name(col)} AS DOUBLE) - {_sql_value(offset)}) / {_sql_value(scale)} AS {_sql_name(col)}"
+                for col, (offset, scale) in scaling["params"].items()
+            )
+            sql = f"SELECT * REPLACE ({scaled}) FROM ({sql})"
+        return sql
+
+    def _row(self, sql: str) -> tuple:
+        return self.con.sql(sql).fetchone()
+
+    def scan_missing(self, drops: list, stats: dict, modes: list) -> dict:
+        keep = " AND ".join(f"{_sql_name(col)} IS NOT NULL" for col in drops) or "TRUE"
+        exprs = ["count(*)", f"count(*) FILTER (WHERE {keep})"]
+        for col in self.columns:
+            name = _sql_name(col)
+            exprs.append(f"count(*) - count({name})")
+            exprs.append(f"count(*) FILTER (WHERE {keep}) - count({name}) FILTER (WHERE {keep})")
+        earlier = {
+            col: " AND ".join(f"{_sql_name(d)} IS NOT NULL" for d in prior) or "TRUE"
+            for col, prior in _earlier_drops(self.columns, drops).items()
+        }
+        stat_cols = [col for col in self.columns if col in stats]
+        for col in stat_cols:
+            agg = "quantile_cont" if stats[col] == "median" else "avg"
+            arg = f"{_sql_name(col)}, 0.5" if stats[col] == "median" else _sql_name(col)
+            exprs.append(f"{agg}({arg}) FILTER (WHERE {earlier[col]})")
+
+        for col in modes:
+            name = _sql_name(col)
+            # most frequent value, smallest first on ties (like ColumnStats.mode)
+            exprs.append(
+                f"(SELECT {name} FROM source WHERE {earlier[col]} AND {name} IS NOT NULL "
+                f"GROUP BY {name} ORDER BY count(*) DESC, {name} LIMIT 1)"
+            )
+
+        # Mode subqueries read the input once through a materialized CTE instead of once per column
+        source = f"WITH source AS {'MATERIALIZED ' if modes else ''}({self.source})"
+        row = self._row(f"{source} SELECT {', '.join(exprs)} FROM source")
+        n = len(self.columns)
+        return {
+            "rows": row[0],
+            "kept": row[1],
+            "nulls": {col: row[2 + 2 * i] for i, col in enumerate(self.columns)},
+            "kept_nulls": {col: row[3 + 2 * i] for i, col in enumerate(self.columns)},
+            "values": {col: row[2 + 2 * n + i] for i, col in enumerate(stat_cols)},
+            "modes": {col: row[2 + 2 * n + len(stat_cols) + i] for i, col in enumerate(modes)},
+        }
+
+    def scan_quartiles(self, params: dict, columns: list) -> dict:
+        exprs = ["count(*)"]
+        for col in columns:
+            exprs.append(f"quantile_cont({_sql_name(col)}, 0.25)")
+            exprs.append(f"quantile_cont({_sql_name(col)}, 0.75)")
+        row = self._row(f"SELECT {', '.join(exprs)} FROM ({self.frame(params)})")
+        return {"rows": row[0], "quartiles": {col: (row[1 + 2 * i], row[2 + 2 * i]) for i, col in enumerate(columns)}}
+
+    def scan_outside(self, params: dict, limits: dict) -> dict:
+        exprs = []
+        for col, (lo, hi) in limits.items():
+            outside = [f"{_sql_name(col)} < {_sql_value(lo)}"] if lo is not None else []
+            outside += [f"{_sql_name(col)} > {_sql_value(hi)}"] if hi is not None else []
+            exprs.append(f"coalesce(bool_or({' OR '.join(outside)}), FALSE)")
+        row = self._row(f"SELECT {', '.join(exprs)} FROM ({self.frame(params)})")
+        return {col: bool(row[i]) for i, col in enumerate(limits)}
+
+    def scan_scaling(self, params: dict, columns: list, method: str) -> dict:
+        exprs = ["count(*)"]
+        for col in columns:
+            values = f"CAST({_sql_name(col)} AS DOUBLE)"
+            if method == "standard":
+                exprs += [f"avg({values})", f"stddev_pop({values})"]
+            else:
+                exprs += [f"min({values})", f"max({values})"]
+        row = self._row(f"SELECT {', '.join(exprs)} FROM ({self.frame(params)})")
+        return {"rows": row[0], "stats": {col: (row[1 + 2 * i], row[2 + 2 * i]) for i, col in enumerate(columns)}}
+
+    def write(self, params: dict, output_path: Path, out_format: str) -> None:
+        options = "FORMAT PARQUET" if out_format == "parquet" else "HEADER, DELIMITER ','"
+        self.con.execute(
+            f"COPY (SELECT * EXCLUDE ({self._ROW}) FROM ({self.frame(params)}) ORDER BY {self._ROW}) "
+            f"TO {_sql_value(str(output_path))} ({options})"
+        )
+
+
+_PLANS = {"polars": _PolarsPlan, "duckdb": _DuckDBPlan}
+
+
+def _fill_plan(plan, scan: dict, drops: list, rules: dict) -> dict:
+    """
+    Fill values per column from the missing-value scan, same rules as
+    handle_missing_values: statistics of the rows left by the drop columns
+    before each column. Only the columns listed in "nulls" (missing cells in
+    the input) are filled, so the others keep their type.
+    """
+    fill: dict = {}
+    for col in plan.columns:
+        if col in drops:
+            continue
+        if col in plan.numeric:
+            strategy = rules["num_strategy"]
+            if strategy in ("median", "mean"):
+                value = scan["values"][col]
+            elif strategy == "zero":
+                value = 0
+            elif strategy == "constant":
+                value = rules["num_fill_val"]
+            else:
+                value = None
+            if _present(value):
+                fill[col] = value
+        else:
+            strategy = rules["txt_strategy"]
+            if strategy == "mode":
+                mode_val = scan["modes"][col]
+                fill[col] = mode_val if mode_val is not None else rules["txt_fill_val"]
+            elif strategy == "Unknown":
+                fill[col] = "Unknown"
+            elif strategy == "constant":
+                fill[col] = rules["txt_fill_val"]
+    nulls = [col for col in plan.columns if scan["nulls"][col]]
+    return {"fill": fill, "drop": drops, "nulls": nulls}
+
+
+def _integral(value) -> bool:
+    return not _present(value) or float(value).is_integer()
+
+
+def _integer_bound(value, rounding) -> int | None:
+    # No integer lies strictly between a fractional bound and its rounding towards the values
+    return int(rounding(value)) if _present(value) else None
+
+
+def _scaler_params(stats: dict, method: str) -> dict:
+    # Same (offset, scale) state as handle_scaling: scaled = (value - offset) / scale
+    params = {}
+    for col, (a, b) in stats.items():
+        if not (_present(a) and _present(b)):
+            continue
+        scale = b if method == "standard" else b - a
+        params[col] = (float(a), float(scale) if scale != 0 else 1.0)
+    return params
+
+
+def run_engine(
+    engine: str,
+    input_path: str,
+    output_path: str,
+    config: dict,
+    *,
+    encoding: str | None = None,
+    sep: str | None = None,
+    out_format: str = "csv",
+    learned: dict | None = None,
+    perf: StageRecorder | None = None,
+) -> dict:
+    """
+    Clean a CSV or Parquet file with the polars or duckdb engine: the same
+    missing, duplicate, outlier and scaling semantics as the pandas stages
+    (with `execution.vectorized: true` and exact quantiles), run as lazy,
+    multi-threaded queries that read the input file and write the output file
+    without loading the data into pandas.
+    Statistics are gathered in stage order by aggregate queries; the final
+    query cleans and writes. Pass a dict as `learned` to record the fitted
+    parameters (see src/artifact.py). Returns the same metrics dict as the
+    in-memory pipeline.
+    """
+    if engine not in _PLANS:
+        raise ValueError(f"No lazy execution engine named {engine!r}; choose one of {', '.join(_PLANS)}")
+    if not vectorized(config):
+        raise ValueError(f"execution.vectorized: false is only supported by the pandas engine, not {engine}")
+    if out_format not in ENGINE_OUTPUT_FORMATS:
+        raise ValueError(f"The {engine} engine writes {' or '.join(ENGINE_OUTPUT_FORMATS)}, not {out_format}")
+
+    path = Path(input_path)
+    ext = path.suffix.lower()
+    if ext not in ENGINE_INPUT_EXTENSIONS:
+        raise ValueError(f"The {engine} engine reads CSV/TXT or Parquet files, not {ext}; use execution.engine: pandas")
+
+    settings = None
+    if ext in (".csv", ".txt"):
+        settings = sniff_csv(str(path), encoding=encoding, sep=sep)
+        if settings["encoding"] not in ("utf-8", "utf-8-sig"):
+            raise ValueError(
+                f"The {engine} engine reads UTF-8 CSV only, this file is {settings['encoding']}; "
+                "use execution.engine: pandas"
+            )
+        settings = {**settings, "engine": engine}
+
+    perf = perf if perf is not None else StageRecorder()
+    plan = _PLANS[engine](path, settings)
+
+    missing_cfg = config.get("missing", {})
+    rules = {
+        "num_strategy": missing_cfg.get("numeric", {}).get("strategy", "median"),
+        "num_fill_val": missing_cfg.get("numeric", {}).get("fill_value", None),
+        "txt_strategy": missing_cfg.get("text", {}).get("strategy", "Unknown"),
+        "txt_fill_val": missing_cfg.get("text", {}).get("fill_value", "Unknown"),
+    }
+    dup_cfg = config.get("duplicates", {}) or {}
+    dup_strategy = dup_cfg.get("strategy", "remove")
+    subset = duplicate_subset(dup_cfg, plan.columns)
+    out_cfg = config.get("outliers", {})
+    action = out_cfg.get("action", "flag")
+    use_outliers = out_cfg.get("method", "IQR") == "IQR" and action in ("drop", "cap")
+    scaling = config.get("scaling", {}).get("numeric", "none")
+    use_scaling = scaling in ("standard", "minmax") and bool(plan.numeric)
+
+    # Pass 1: missing counts and fill statistics on rows left by earlier drop columns
+    drops = [
+        col
+        for col in plan.columns
+        if (rules["num_strategy"] if col in plan.numeric else rules["txt_strategy"]) == "drop"
+    ]
+    stats = {col: rules["num_strategy"] for col in plan.numeric if rules["num_strategy"] in ("median", "mean")}
+    modes = [col for col in plan.columns if col not in plan.numeric] if rules["txt_strategy"] == "mode" else []
+    print(f"{engine} engine: missing-value statistics")
+    with perf.stage("missing statistics") as record:
+        scan = plan.scan_missing(drops, stats, modes)
+        record["rows"] = scan["rows"]
+
+    params = {
+        "missing": _fill_plan(plan, scan, drops, rules),
+        "duplicates": {"strategy": dup_strategy, "subset": subset},
+    }
+    missing_after = sum(scan["kept_nulls"][col] for col in plan.columns if col not in params["missing"]["fill"])
+
+    # Pass 2: rows left after duplicate removal, and IQR quartiles of those rows
+    print(f"{engine} engine: duplicate / outlier statistics")
+    with perf.stage("duplicate / outlier statistics", scan["rows"]):
+        counted = plan.scan_quartiles(params, plan.numeric if use_outliers else [])
+    bounds = {}
+    for col, (q1, q3) in counted["quartiles"].items():
+        if q1 is None or q3 is None:
+            q1 = q3 = float("nan")
+        iqr = q3 - q1
+        bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    integer = {}
+    if action == "cap":
+        # pandas keeps an integer column's type unless a value is capped to a fraction
+        columns = [col for col in bounds if col in plan.integer and not scan["nulls"][col]]
+        limits = {
+            col: tuple(None if _integral(bound) else bound for bound in bounds[col])
+            for col in columns
+            if not all(_integral(bound) for bound in bounds[col])
+        }
+        outside = {}
+        if limits:
+            with perf.stage("outlier capping statistics", scan["rows"]):
+                outside = plan.scan_outside(params, limits)
+        integer = {
+            col: (_integer_bound(bounds[col][0], math.ceil), _integer_bound(bounds[col][1], math.floor))
+            for col in columns
+            if not outside.get(col)
+        }
+    params["outliers"] = {"action": action, "bounds": bounds, "integer": integer}
+    params["scaling"] = {"method": "none", "params": {}}
+    rows_deduped = rows_after = counted["rows"]
+
+    # Pass 3: scaler statistics (and the row count) after outlier handling
+    if use_scaling or (action == "drop" and bounds):
+        print(f"{engine} engine: scaling statistics")
+        with perf.stage("scaling statistics", scan["rows"]):
+            scaled = plan.scan_scaling(params, plan.numeric if use_scaling else [], scaling)
+        rows_after = scaled["rows"]
+        if use_scaling:
+            params["scaling"] = {"method": scaling, "params": _scaler_params(scaled["stats"], scaling)}
+
+    print(f"{engine} engine: cleaning and writing")
+    with perf.stage("clean and write", scan["rows"]):
+        plan.write(params, Path(output_path), out_format)
+
+    if learned is not None:
+        learned.update(params)
+        learned["schema"] = {
+            "columns": [str(col) for col in plan.columns],
+            # pandas reads integer columns with gaps as float64
+            "numeric": {
+                str(col): "int64" if col in plan.integer and not scan["nulls"][col] else "float64"
+                for col in plan.numeric
+            },
+        }
+
+    return {
+        "rows_before": scan["rows"],
+        "rows_after": rows_after,
+        "missing_handled": max(0, sum(scan["nulls"].values()) - missing_after),
+        "duplicates_removed": scan["kept"] - rows_deduped,
+        "outliers_removed": rows_deduped - rows_after if action == "drop" else 0,
+        "scaling_applied": params["scaling"]["method"],
+        "load_settings": settings,
+    }
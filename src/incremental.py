@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import pickle
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.cleaner import duplicate_subset, vectorized
+from src.loader import sniff_csv
+from src.perf import StageRecorder
+from src.sketches import KLLSketch, quantile_settings
+from src.streaming import (
+    _DropPositions,
+    _Moments,
+    _apply_missing,
+    _apply_outliers,
+    _clean_pass,
+    _conform,
+    _fill_plan,
+    _numeric_values,
+    _row_hashes,
+    _scaler_params,
+    _scan_missing_stats,
+)
+from src.writer import CsvChunkWriter
+
+# Folder under --output holding the watermark, running statistics and key index
+STATE_DIR = "incremental"
+STATE_VERSION = 1
+
+# Bytes at the start and just before the watermark that must be unchanged for the file to count as appended to
+_CHECK_BYTES = 1 << 16
+
+_BLOCK = 1 << 20
+
+# Config sections whose settings shape the running statistics
+_CONFIG_SECTIONS = ("missing", "duplicates", "outliers", "scaling", "quantiles")
+
+_EMPTY_KEYS = np.empty(0, dtype="uint64")
+
+
+class _ByteRange(io.RawIOBase):
+    """
+    Read-only view of bytes [start, end) of a binary file.
+    """
+
+    def __init__(self, f, start: int, end: int):
+        self.f = f
+        self.remaining = end - start
+        f.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer)[: self.remaining]
+        n = self.f.readinto(view)
+        self.remaining -= n
+        return n
+
+
+def _complete_end(path: Path, start: int) -> int:
+    # Offset just past the last newline at or after `start`: a last line still being written is left for later
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > start:
+            lo = max(start, pos - _BLOCK)
+            f.seek(lo)
+            block = f.read(pos - lo)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                return lo + newline + 1
+            pos = lo
+    return start
+
+
+def _digest(path: Path, start: int, end: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        f.seek(start)
+        digest.update(f.read(end - start))
+    return digest.hexdigest()
+
+
+def _edge_digests(path: Path, end: int) -> list[str]:
+    # The first and last _CHECK_BYTES before `end`: a rewritten or truncated file changes
+    # them (or its header); rereading the whole history every run would defeat the purpose
+    return [_digest(path, 0, min(end, _CHECK_BYTES)), _digest(path, max(0, end - _CHECK_BYTES), end)]
+
+
+def _write_atomic(path: Path, write: Callable[[object], None], mode: str = "wb") -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            write(f)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _key_hashes(keys: pd.DataFrame, numeric_cols: list) -> np.ndarray:
+    # numbers hash as float64, so 5 in an int64 chunk matches 5.0 in a chunk that also has NaN
+    numeric = [col for col in keys.columns if col in numeric_cols]
+    return _row_hashes(keys.astype({col: "float64" for col in numeric}) if numeric else keys)
+
+
+def _new_keys(hashes: np.ndarray, seen: list[np.ndarray]) -> np.ndarray:
+    # Mask of first occurrences of hashes in none of the sorted arrays in `seen`
+    new = ~pd.Series(hashes).duplicated().to_numpy()
+    for keys in seen:
+        if keys.size:
+            at = np.minimum(np.searchsorted(keys, hashes), keys.size - 1)
+            new &= keys[at] != hashes
+    return new
+
+
+class IncrementalState:
+    """
+    Everything an incremental run needs from earlier runs, in `directory`:
+    state.json (watermark, schema, settings, cumulative metrics),
+    stats.pkl (mergeable running statistics) and keys.npy (sorted 64-bit
+    hashes of the duplicate keys of every row kept so far).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.meta: dict | None = None
+        self.stats: dict = {}
+
+    @property
+    def keys_path(self) -> Path:
+        return self.directory / "keys.npy"
+
+    def load(self) -> bool:
+        try:
+            with open(self.directory / "state.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self.directory / "stats.pkl", "rb") as f:
+                stats = pickle.load(f)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return False
+        if meta.get("version") != STATE_VERSION:
+            return False
+        self.meta, self.stats = meta, stats
+        return True
+
+    def keys(self) -> np.ndarray:
+        if self.meta is None or not self.keys_path.exists():
+            return _EMPTY_KEYS
+        # memory-mapped: lookups touch only the pages they need
+        return np.load(self.keys_path, mmap_mode="r")
+
+    def save(self, meta: dict, stats: dict, new_keys: np.ndarray | None) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if new_keys is not None:
+            keys = np.union1d(self.keys(), new_keys).astype("uint64")
+            _write_atomic(self.keys_path, lambda f: np.save(f, keys))
+        _write_atomic(self.directory / "stats.pkl", lambda f: pickle.dump(stats, f, protocol=pickle.HIGHEST_PROTOCOL))
+        # state.json last: it names the watermark the other two files belong to
+        _write_atomic(self.directory / "state.json", lambda f: json.dump(meta, f, indent=1, default=str), "w")
+        self.meta, self.stats = meta, stats
+
+
+def _merge_scan(stats: dict, scan: dict) -> None:
+    # Fold one run's missing-value statistics into the running ones
+    for col, sketch in scan["sketches"].items():
+        if col in stats["sketches"]:
+            stats["sketches"][col].merge(sketch)
+        else:
+            stats["sketches"][col] = sketch
+    for col, moments in scan["moments"].items():
+        stats["moments"].setdefault(col, _Moments()).merge(moments)
+    for col, counts in scan["counts"].items():
+        stats["counts"].setdefault(col, Counter()).update(counts)
+
+
+def run_incremental(
+    input_path: str,
+    output_path: str,
+    config: dict,
+    *,
+    state_dir: str,
+    chunksize: int = 100_000,
+    encoding: str | None = None,
+    sep: str | None = None,
+    perf: StageRecorder | None = None,
+) -> dict:
+    """
+    Clean only the rows appended to a CSV file since the last run and append
+    them to the cleaned CSV at `output_path`.
+
+    The state in `state_dir` holds the byte offset and row count already
+    processed (the watermark), the running statistics behind median/mean
+    fills, mode counts, IQR bounds and scaler parameters (KLL sketches,
+    moments and counters, merged with the new rows' before they are cleaned)
+    and the duplicate keys of every row kept so far. New rows that repeat a
+    kept key, compared on their raw values, are dropped. Rows written by
+    earlier runs keep the parameters they were cleaned with.
+
+    The first run, or a run whose input no longer starts with the bytes it had
+    at the watermark or whose cleaning settings changed, cleans the whole file
+    and rewrites the output.
+    Returns the metrics of the new rows, with watermarks and cumulative
+    totals under "incremental".
+    """
+    path = Path(input_path)
+    if path.suffix.lower() not in (".csv", ".txt"):
+        raise ValueError("Incremental mode reads appended rows of CSV/TXT files only.")
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {input_path}")
+    dup_cfg = config.get("duplicates", {}) or {}
+    dup_strategy = dup_cfg.get("strategy", "remove")
+    if dup_strategy == "keep_last":
+        raise ValueError("Incremental mode cannot use duplicates.strategy keep_last: rows already written are kept.")
+
+    perf = perf if perf is not None else StageRecorder()
+    _, sketch_error = quantile_settings(config)
+    settings_slice = {section: config.get(section) for section in _CONFIG_SECTIONS}
+    settings_slice["vectorized"] = vectorized(config)
+    settings_slice["csv"] = [encoding, sep]
+    settings_slice = json.loads(json.dumps(settings_slice, default=str))
+
+    out_cfg = config.get("outliers", {})
+    action = out_cfg.get("action", "flag")
+    use_outliers = out_cfg.get("method", "IQR") == "IQR" and action in ("drop", "cap")
+    scaling = config.get("scaling", {}).get("numeric", "none")
+    use_scaling = scaling in ("standard", "minmax")
+    output = Path(output_path)
+
+    # Resume from the watermark when the state still describes this file, settings and output
+    state = IncrementalState(Path(state_dir))
+    meta = state.meta if state.load() else None
+    reason = None
+    if meta is None:
+        reason = "no earlier run"
+    elif meta["watermark"]["rows"] == 0:
+        reason = "no rows yet to take column types from"
+    elif meta["settings"] != settings_slice:
+        reason = "cleaning settings changed"
+    elif meta["output"] != output.name or not output.exists() or output.stat().st_size < meta["output_bytes"]:
+        reason = "cleaned output missing or shorter than recorded"
+    else:
+        if path.stat().st_size < meta["watermark"]["bytes"] or _edge_digests(path, meta["watermark"]["bytes"]) != meta["check"]:
+            reason = "input changed before the watermark (not append-only)"
+    if reason is not None:
+        print(f"Incremental: full run ({reason})")
+        meta = state.meta = None
+
+    if meta is None:
+        csv_settings = {**sniff_csv(str(path), encoding=encoding, sep=sep), "engine": "c"}
+        start, rows_done = 0, 0
+        stats = {"sketches": {}, "moments": {}, "counts": {}, "outlier_sketches": {}, "scale_moments": {}}
+        totals = None
+    else:
+        csv_settings = meta["csv"]
+        start, rows_done = meta["watermark"]["bytes"], meta["watermark"]["rows"]
+        stats = state.stats
+        totals = meta["totals"]
+        # roll back rows a crashed run appended after its last saved state
+        with open(output, "r+b") as f:
+            f.truncate(meta["output_bytes"])
+    end = _complete_end(path, start)
+
+    schema = meta["schema"] if meta is not None else None
+
+    def chunks(dtype: dict | None = None) -> Iterator[pd.DataFrame]:
+        with open(path, "rb") as f:
+            handle = io.TextIOWrapper(
+                io.BufferedReader(_ByteRange(f, start, end)), encoding=csv_settings["encoding"], newline=""
+            )
+            if start == 0:
+                # a full run: the header names the columns and dtypes come from the first pass
+                reader = pd.read_csv(handle, sep=csv_settings["sep"], chunksize=chunksize, dtype=dtype)
+            else:
+                text = {col: str for col in schema["columns"] if col not in schema["numeric"]}
+                reader = pd.read_csv(
+                    handle, sep=csv_settings["sep"], chunksize=chunksize, header=None, names=schema["columns"], dtype=text
+                )
+            with reader:
+                for chunk in reader:
+                    yield chunk if start == 0 else _conform(chunk, schema)
+
+    # Pass 1: missing-value statistics of the new rows, merged into the running ones
+    dtypes = None
+    print(f"Incremental pass: missing-value statistics (bytes {start}..{end})")
+    with perf.stage("missing statistics") as record:
+        scan = _scan_missing_stats(chunks(), config, sketch_error) if end > start else None
+        record["rows"] = scan["rows"] if scan else 0
+    if scan is not None and scan["rows"] and schema is None:
+        if not scan["consistent"]:
+            with perf.stage("missing statistics rescan", scan["rows"]):
+                scan = _scan_missing_stats(chunks(scan["dtypes"]), config, sketch_error)
+        dtypes = scan["dtypes"] or None
+        schema = {
+            "columns": [str(col) for col in scan["columns"]],
+            "numeric": {str(col): scan["numeric_dtypes"][col] for col in scan["numeric_cols"]},
+        }
+    if schema is None or not schema["columns"]:
+        # a header (or nothing) so far
+        with open(path, "rb") as f:
+            header = pd.read_csv(
+                io.TextIOWrapper(io.BufferedReader(_ByteRange(f, 0, end)), encoding=csv_settings["encoding"], newline=""),
+                sep=csv_settings["sep"],
+                nrows=0,
+            ) if end else pd.DataFrame()
+        schema = {"columns": [str(col) for col in header.columns], "numeric": {}}
+
+    rows = scan["rows"] if scan else 0
+    numeric_cols = list(schema["numeric"])
+    if scan is not None:
+        _merge_scan(stats, scan)
+    plan = _fill_plan(config, {**stats, "columns": schema["columns"], "numeric_cols": numeric_cols})
+
+    def filled() -> Iterator[pd.DataFrame]:
+        for chunk in chunks(dtypes):
+            chunk, _ = _apply_missing(chunk, plan)
+            yield chunk
+
+    def prepared() -> Iterator[pd.DataFrame]:
+        return map(_DropPositions(dropped), filled())
+
+    # Pass 2: new rows whose raw duplicate key was already kept, now or in an earlier run
+    dropped, new_keys = None, None
+    if dup_strategy in ("remove", "keep_first") and rows:
+        print("Incremental pass: duplicate keys")
+        subset = duplicate_subset(dup_cfg, schema["columns"])
+        kept_keys = state.keys() if meta is not None else _EMPTY_KEYS
+        positions, added = [], []
+        offset = 0
+        with perf.stage("duplicate keys", rows):
+            for chunk in chunks(dtypes):
+                hashes = pd.Series(_key_hashes(chunk[subset] if subset else chunk, numeric_cols), index=chunk.index)
+                chunk, _ = _apply_missing(chunk, plan)
+                hashes = hashes[chunk.index].to_numpy()
+                new = _new_keys(hashes, [kept_keys] + added)
+                positions.append(offset + np.flatnonzero(~new))
+                added.append(np.unique(hashes[new]))
+                offset += len(chunk)
+        dropped = np.concatenate(positions)
+        new_keys = np.concatenate(added)
+
+    # Pass 3 / 4: IQR bounds, then scaler state, over every kept row so far
+    bounds: dict = {}
+    scaler_params: dict = {}
+    if (use_outliers or use_scaling) and numeric_cols:
+        print("Incremental pass: outlier / scaling statistics")
+        sketches = stats["outlier_sketches"]
+        moments = {col: _Moments() for col in numeric_cols} if use_scaling and not use_outliers else {}
+        with perf.stage("outlier / scaling statistics", rows):
+            for chunk in prepared() if rows else []:
+                for col in numeric_cols:
+                    values = _numeric_values(chunk[col])
+                    if use_outliers:
+                        sketches.setdefault(col, KLLSketch(sketch_error)).update(values)
+                    if col in moments:
+                        moments[col].update(values)
+        for col, sketch in sketches.items():
+            if sketch.n:
+                q1, q3 = sketch.quantiles([0.25, 0.75])
+                iqr = q3 - q1
+                bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+
+        if use_scaling and use_outliers:
+            print("Incremental pass: scaling statistics")
+            moments = {col: _Moments() for col in numeric_cols}
+            with perf.stage("scaling statistics", rows):
+                for chunk in prepared() if rows else []:
+                    chunk = _apply_outliers(chunk, bounds, action)
+                    for col in numeric_cols:
+                        moments[col].update(_numeric_values(chunk[col]))
+        if use_scaling:
+            for col, m in moments.items():
+                stats["scale_moments"].setdefault(col, _Moments()).merge(m)
+            scaler_params = _scaler_params(stats["scale_moments"], scaling)
+
+    params = {
+        "missing": plan,
+        "outliers": {"action": action, "bounds": bounds},
+        "scaling": {"method": scaling if use_scaling and numeric_cols else "none", "params": scaler_params},
+    }
+
+    # Final pass: clean the new rows and append them
+    print("Incremental pass: cleaning and appending")
+    with perf.stage("clean and append", rows):
+        writer = CsvChunkWriter(output, append=meta is not None)
+        metrics = _clean_pass(chunks(dtypes) if rows else iter(()), params, writer, schema["columns"], dropped)
+
+    previous = totals or {key: 0 for key in ("rows_before", "rows_after", "missing_handled", "duplicates_removed", "outliers_removed")}
+    totals = {key: previous[key] + metrics[key] for key in previous}
+    watermark = {"bytes": end, "rows": rows_done + rows}
+    state.save(
+        {
+            "version": STATE_VERSION,
+            "source": path.name,
+            "settings": settings_slice,
+            "csv": csv_settings,
+            "schema": schema,
+            "watermark": watermark,
+            "check": _edge_digests(path, end),
+            "output": output.name,
+            "output_bytes": output.stat().st_size,
+            "totals": totals,
+        },
+        stats,
+        new_keys,
+    )
+
+    metrics["load_settings"] = csv_settings
+    metrics["incremental"] = {
+        "full_run": reason is not None,
+        "start_bytes": start,
+        "end_bytes": end,
+        "start_row": rows_done,
+        "end_row": watermark["rows"],
+        "totals": totals,
+    }
+    return metrics
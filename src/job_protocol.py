@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+# What the job server and its client share. Standard library only, so the
+# client and main.py's argument parsing can import it without the server.
+
+DEFAULT_PORT = 8765
+
+# Longest single wait a client may request; clients poll again after it
+MAX_WAIT_S = 60.0
+
+# TCP clients authenticate with a per-server token kept here, readable by this user only
+TOKEN_DIR = Path.home() / ".preprocessing-agent"
+
+
+def token_path(port: int) -> Path:
+    return TOKEN_DIR / f"server-{port}.token"
+
+
+def read_token(port: int) -> str:
+    """
+    The token of the job server on 127.0.0.1:`port`, written when it started.
+    """
+    path = token_path(port)
+    try:
+        return path.read_text(encoding="ascii").strip()
+    except OSError:
+        raise ValueError(f"No job server token at {path}; is a server running on port {port} as this user?")
@@ -1,10 +1,115 @@
 from __future__ import annotations
 
+import codecs
+import csv
 from pathlib import Path
+from typing import Iterator
 import pandas as pd
 
+from src.parallel_csv import read_csv_parallel
 
-def load_data(file_path: str, *, encoding: str | None = None, sep: str | None = None) -> pd.DataFrame:
+# common encodings for clients (including Arabic Windows encoding)
+CSV_ENCODINGS = ["utf-8", "utf-8-sig", "cp1256", "cp1252"]
+CSV_DELIMITERS = ",;\t|"
+
+# Every input format load_data() reads
+SUPPORTED_EXTENSIONS = [".csv", ".txt", ".xlsx", ".xls", ".parquet", ".pq", ".feather", ".arrow", ".ipc"]
+
+# Bytes / lines inspected when sniffing a CSV file
+SNIFF_BYTES = 64 * 1024
+SNIFF_LINES = 50
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def _decode_prefix(raw: bytes, encoding: str) -> str | None:
+    # Incremental decode so a multi-byte character cut at the end is not an error
+    try:
+        return codecs.getincrementaldecoder(encoding)().decode(raw, final=False)
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+
+def _sniff_delimiter(text: str) -> str:
+    lines = text.splitlines()[:SNIFF_LINES]
+    if not lines:
+        return ","
+    try:
+        return csv.Sniffer().sniff("\n".join(lines), delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        return ","
+
+
+def _has_undecoded_bytes(df: pd.DataFrame) -> bool:
+    for col in df.columns:
+        if df[col].dtype == object:
+            first = df[col].dropna().head(1)
+            if not first.empty and isinstance(first.iloc[0], bytes):
+                return True
+    return False
+
+
+def sniff_csv(
+    file_path: str,
+    *,
+    encoding: str | None = None,
+    sep: str | None = None,
+    sample_bytes: int = SNIFF_BYTES,
+) -> dict:
+    """
+    Detect BOM, encoding and delimiter from the first `sample_bytes` of a CSV
+    file, without parsing it. User-provided values always win.
+    Returns: {"encoding", "sep", "bom"}
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read(sample_bytes)
+
+    bom = next((name for mark, name in _BOMS if raw.startswith(mark)), None)
+
+    if encoding:
+        enc = encoding
+    elif bom:
+        enc = bom
+    else:
+        enc = next((e for e in CSV_ENCODINGS if _decode_prefix(raw, e) is not None), None)
+        if enc is None:
+            raise ValueError("Failed to detect CSV encoding. Try providing --encoding.")
+
+    if sep:
+        delimiter = sep
+    else:
+        text = _decode_prefix(raw, enc) or ""
+        if len(raw) == sample_bytes and "\n" in text:
+            # drop the last, probably truncated, line
+            text = text[: text.rfind("\n")]
+        delimiter = _sniff_delimiter(text.lstrip("\ufeff"))
+
+    return {"encoding": enc, "sep": delimiter, "bom": bom is not None}
+
+
+def load_data(
+    file_path: str,
+    *,
+    encoding: str | None = None,
+    sep: str | None = None,
+    engine: str | None = None,
+    sheet: str | int | None = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Load CSV/TXT, Excel, Parquet or Feather/Arrow IPC into a DataFrame.
+    CSV encoding and delimiter are sniffed from a byte prefix, then the file is
+    parsed once (another encoding is only tried if decoding fails later on).
+    engine="pyarrow" uses the multi-threaded pyarrow CSV parser; with the C
+    engine, `workers` > 1 parses large files in byte ranges on that many
+    processes (same result as one parse).
+    The settings used are stored in df.attrs["load_settings"].
+    `sheet` selects an Excel sheet by name or 0-based index (default: first).
+    """
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
@@ -12,17 +117,35 @@ def load_data(file_path: str, *, encoding: str | None = None, sep: str | None =
     ext = path.suffix.lower()
 
     if ext in [".csv", ".txt"]:
-        # If user provided encoding, try it first
-        encodings_to_try = [encoding] if encoding else []
-        # common encodings for clients (including Arabic Windows encoding)
-        encodings_to_try += ["utf-8", "utf-8-sig", "cp1256", "cp1252"]
+        settings = sniff_csv(str(path), encoding=encoding, sep=sep)
+        engine = engine or "c"
+
+        # If the prefix decoded but a later byte does not, fall back like before
+        encodings_to_try = [settings["encoding"]]
+        encodings_to_try += [e for e in CSV_ENCODINGS if e != settings["encoding"]]
 
         last_error: Exception | None = None
         for enc in encodings_to_try:
             try:
-                return pd.read_csv(path, encoding=enc, sep=sep if sep else ",")
+                df = None
+                if workers > 1 and engine == "c":
+                    df = read_csv_parallel(path, encoding=enc, sep=settings["sep"], workers=workers)
+                if df is None:
+                    df = pd.read_csv(path, encoding=enc, sep=settings["sep"], engine=engine)
+                if _has_undecoded_bytes(df):
+                    # pyarrow keeps undecodable columns as binary instead of failing
+                    raise UnicodeDecodeError(enc, b"", 0, 1, "binary column in CSV")
+            except ImportError as e:
+                raise ValueError(f"CSV engine '{engine}' is not available: {e}")
+            except UnicodeDecodeError as e:
+                last_error = e
+                continue
             except Exception as e:
                 last_error = e
+                break
+
+            df.attrs["load_settings"] = {**settings, "encoding": enc, "engine": engine}
+            return df
 
         raise ValueError(
             "Failed to read CSV. Try providing --encoding and/or --sep. "
@@ -31,8 +154,149 @@ def load_data(file_path: str, *, encoding: str | None = None, sep: str | None =
 
     if ext in [".xlsx", ".xls"]:
         try:
-            return pd.read_excel(path)
+            return pd.read_excel(path, sheet_name=0 if sheet is None else sheet)
         except Exception as e:
             raise ValueError(f"Failed to read Excel file: {e}")
 
-    raise ValueError("Unsupported file format. Please use CSV or Excel.")
+    if ext in [".parquet", ".pq"]:
+        try:
+            return pd.read_parquet(path)
+        except ImportError as e:
+            raise ValueError(f"Reading Parquet requires pyarrow: {e}")
+        except Exception as e:
+            raise ValueError(f"Failed to read Parquet file: {e}")
+
+    if ext in [".feather", ".arrow", ".ipc"]:
+        try:
+            return pd.read_feather(path)
+        except ImportError as e:
+            raise ValueError(f"Reading Feather/Arrow IPC requires pyarrow: {e}")
+        except Exception as e:
+            raise ValueError(f"Failed to read Feather/Arrow IPC file: {e}")
+
+    raise ValueError("Unsupported file format. Please use CSV, Excel, Parquet or Feather.")
+
+
+def iter_csv_chunks(
+    file_path: str,
+    *,
+    chunksize: int,
+    encoding: str,
+    sep: str | None = None,
+    dtype: dict | None = None,
+    usecols: list | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield a CSV file as DataFrames of at most `chunksize` rows.
+    `encoding` and `sep` should come from sniff_csv().
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    if path.suffix.lower() not in [".csv", ".txt"]:
+        raise ValueError("Chunked reading only supports CSV/TXT files.")
+
+    reader = pd.read_csv(
+        path,
+        encoding=encoding,
+        sep=sep if sep else ",",
+        chunksize=chunksize,
+        dtype=dtype,
+        usecols=usecols,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _excel_header(row: tuple) -> list:
+    # Same column names as read_excel: blanks become "Unnamed: i", repeats get ".1", ".2", ...
+    names: list = []
+    seen: dict = {}
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _excel_frame(rows: list, header: list, dtype: dict | None) -> pd.DataFrame:
+    width = len(header)
+    chunk = pd.DataFrame([row[:width] + (None,) * (width - len(row)) for row in rows], columns=header)
+    for col, col_dtype in (dtype or {}).items():
+        if col in chunk.columns:
+            series = chunk[col]
+            chunk[col] = series.astype(col_dtype).where(series.notna())
+    return chunk
+
+
+def iter_excel_chunks(
+    file_path: str,
+    *,
+    chunksize: int,
+    sheet: str | int | None = None,
+    dtype: dict | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield one sheet of an .xlsx workbook as DataFrames of at most `chunksize`
+    rows, reading it row by row in openpyxl's read-only mode so memory does
+    not grow with the workbook. `sheet` is a name or 0-based index (default:
+    first). The first row is the header; trailing empty rows are skipped.
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    if path.suffix.lower() != ".xlsx":
+        raise ValueError("Chunked Excel reading only supports .xlsx files.")
+
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Reading Excel files requires openpyxl (pip install openpyxl).")
+
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Failed to read Excel file: {e}")
+
+    try:
+        if sheet is None or isinstance(sheet, int):
+            index = sheet or 0
+            if index >= len(workbook.worksheets):
+                raise ValueError(f"Excel sheet index {index} out of range ({len(workbook.worksheets)} sheets).")
+            worksheet = workbook.worksheets[index]
+        elif sheet in workbook.sheetnames:
+            worksheet = workbook[sheet]
+        else:
+            raise ValueError(f"Excel sheet {sheet!r} not found. Available: {workbook.sheetnames}")
+
+        rows = worksheet.iter_rows(values_only=True)
+        header = None
+        for row in rows:
+            if any(value is not None for value in row):
+                header = _excel_header(row)
+                break
+        if header is None:
+            return
+
+        buffer: list = []
+        blank: list = []
+        for row in rows:
+            if all(value is None for value in row):
+                # only kept if a non-empty row follows
+                blank.append(row)
+                continue
+            buffer.extend(blank)
+            blank = []
+            buffer.append(row)
+            if len(buffer) >= chunksize:
+                yield _excel_frame(buffer[:chunksize], header, dtype)
+                buffer = buffer[chunksize:]
+        if buffer:
+            yield _excel_frame(buffer, header, dtype)
+    finally:
+        workbook.close()
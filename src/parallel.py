@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import atexit
+import gc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pandas.arrays import ArrowStringArray
+
+_POOLS: dict[int, ProcessPoolExecutor] = {}
+
+# Tasks queued ahead per worker: enough to keep every worker busy, without
+# copying every column's arguments into the call queue at once
+IN_FLIGHT_PER_WORKER = 2
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool shared by every per-column stage of a run.
+    Pools are created on first use and shut down at interpreter exit.
+    """
+    pool = _POOLS.get(workers)
+    if pool is None:
+        # workers must share this process's shared-memory tracker: one they start
+        # themselves reports blocks this process already unlinked as leaked
+        resource_tracker.ensure_running()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        _POOLS[workers] = pool
+    return pool
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    for pool in _POOLS.values():
+        pool.shutdown(cancel_futures=True)
+    _POOLS.clear()
+
+
+class SharedStrings:
+    """
+    An Arrow-backed string Series placed in shared memory as an Arrow IPC
+    stream, so a pool task receives a block name instead of the pickled values.
+    The worker maps the block and rebuilds the Series on its buffers without
+    copying them. Created and unlinked by the parent process.
+    """
+
+    def __init__(self, series: pd.Series):
+        import pyarrow as pa
+
+        table = pa.table({"values": series.array._pa_array})
+        sizer = pa.MockOutputStream()
+        with pa.ipc.new_stream(sizer, table.schema) as writer:
+            writer.write_table(table)
+
+        self.name = series.name
+        self.dtype = series.dtype
+        self._shm = SharedMemory(create=True, size=max(1, sizer.size()))
+        self.shm_name = self._shm.name
+        with pa.ipc.new_stream(pa.FixedSizeBufferWriter(pa.py_buffer(self._shm.buf)), table.schema) as writer:
+            writer.write_table(table)
+
+    def __getstate__(self) -> dict:
+        return {"name": self.name, "dtype": self.dtype, "shm_name": self.shm_name, "_shm": None}
+
+    def open(self) -> pd.Series:
+        # Worker side
+        import pyarrow as pa
+
+        self._shm = SharedMemory(name=self.shm_name)
+        table = pa.ipc.open_stream(pa.py_buffer(self._shm.buf)).read_all()
+        return pd.Series(ArrowStringArray(table.column(0), dtype=self.dtype), name=self.name, copy=False)
+
+    def close(self) -> None:
+        try:
+            self._shm.close()
+        except BufferError:
+            gc.collect()  # a reference cycle still holds the rebuilt Series
+            self._shm.close()
+
+    def unlink(self) -> None:
+        self.close()
+        self._shm.unlink()
+
+
+def _shareable(arg) -> bool:
+    return isinstance(arg, pd.Series) and isinstance(arg.array, ArrowStringArray)
+
+
+def _run_shared(fn: Callable, args: tuple):
+    # Worker side of map_columns: rebuild shared columns, run fn, release the blocks
+    shared = [arg for arg in args if isinstance(arg, SharedStrings)]
+    try:
+        return fn(*[arg.open() if isinstance(arg, SharedStrings) else arg for arg in args])
+    finally:
+        for arg in shared:
+            arg.close()
+
+
+def map_columns(fn: Callable, tasks: dict, workers: int) -> dict:
+    """
+    Run fn(*args) for every {column: args} entry, on a process pool when
+    workers > 1. Results come back keyed by column, in task order.
+    At most IN_FLIGHT_PER_WORKER tasks per worker are queued at once, so only
+    their arguments are copied at any time. Arrow-backed string Series among
+    the arguments go through shared memory (SharedStrings); anything else,
+    such as object or categorical columns, is pickled.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        return {col: fn(*args) for col, args in tasks.items()}
+
+    pool = get_pool(workers)
+    results = {}
+    pending: dict = {}
+    try:
+        for col, args in tasks.items():
+            args = tuple(SharedStrings(arg) if _shareable(arg) else arg for arg in args)
+            pending[col] = (pool.submit(_run_shared, fn, args), args)
+            if len(pending) >= IN_FLIGHT_PER_WORKER * workers:
+                _collect(pending, results)
+        while pending:
+            _collect(pending, results)
+        return results
+    finally:
+        for _, args in pending.values():
+            _unlink_shared(args)
+
+
+def _collect(pending: dict, results: dict) -> None:
+    # Wait for the oldest pending task, so results keep task order
+    col = next(iter(pending))
+    future, args = pending.pop(col)
+    try:
+        results[col] = future.result()
+    finally:
+        _unlink_shared(args)
+
+
+def _unlink_shared(args: tuple) -> None:
+    for arg in args:
+        if isinstance(arg, SharedStrings):
+            arg.unlink()
+
+
+def _sort_shared(name: str, size: int) -> int:
+    # Worker side: sort the shared float64 buffer in place (NaN sorts last)
+    shm = SharedMemory(name=name)
+    try:
+        values = np.ndarray((size,), dtype="float64", buffer=shm.buf)
+        values.sort()
+        count = int(np.count_nonzero(~np.isnan(values)))
+        del values
+        return count
+    finally:
+        shm.close()
+
+
+def sort_numeric_columns(columns: dict, workers: int) -> dict:
+    """
+    Sort numeric columns ({column: Series}) on the pool without pickling
+    them: each column is converted to float64 and copied into shared memory
+    only when its task is submitted, sorted there by a worker, and its
+    non-NaN prefix copied back. Like map_columns, at most IN_FLIGHT_PER_WORKER
+    columns per worker are in shared memory at once.
+    Returns {column: sorted values without NaN}.
+    """
+    if workers <= 1 or len(columns) <= 1:
+        result = {}
+        for col, series in columns.items():
+            ordered = np.sort(series.to_numpy(dtype="float64", na_value=np.nan))
+            result[col] = ordered[: int(np.count_nonzero(~np.isnan(ordered)))]
+        return result
+
+    pool = get_pool(workers)
+    result = {}
+    pending: dict = {}
+    try:
+        for col, series in columns.items():
+            values = series.to_numpy(dtype="float64", na_value=np.nan)
+            shm = SharedMemory(create=True, size=max(1, values.nbytes))
+            np.ndarray(values.shape, dtype="float64", buffer=shm.buf)[:] = values
+            pending[col] = (pool.submit(_sort_shared, shm.name, values.size), shm)
+            del values
+            if len(pending) >= IN_FLIGHT_PER_WORKER * workers:
+                _collect_sorted(pending, result)
+        while pending:
+            _collect_sorted(pending, result)
+        return result
+    finally:
+        for _, shm in pending.values():
+            shm.close()
+            shm.unlink()
+
+
+def _collect_sorted(pending: dict, result: dict) -> None:
+    # Copy out the oldest sorted column and free its block
+    col = next(iter(pending))
+    future, shm = pending.pop(col)
+    try:
+        count = future.result()
+        result[col] = np.ndarray((count,), dtype="float64", buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
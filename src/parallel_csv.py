@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import io
+import mmap
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.parallel import get_pool
+
+# Smallest byte range worth parsing on its own worker
+PARALLEL_READ_MIN_BYTES = 16 * 1024 * 1024
+
+# Smallest frame worth formatting in shards
+PARALLEL_WRITE_MIN_ROWS = 200_000
+
+# Cells per block in DataFrame.to_csv (pandas' default chunksize is this
+# many cells). Datetime and timedelta columns are formatted per block (date-only
+# or not, sub-second digits), so shards start on block boundaries
+_CSV_CHUNK_CELLS = 100_000
+
+# Bytes compared per step when scanning for quotes
+_SCAN_BLOCK = 16 * 1024 * 1024
+
+_QUOTE = ord('"')
+
+
+def csv_chunk_rows(df: pd.DataFrame) -> int:
+    """
+    Rows per formatting block of df.to_csv() (pandas' default chunksize).
+    """
+    return max(1, _CSV_CHUNK_CELLS // max(1, len(df.columns)))
+
+
+def _ascii_compatible(encoding: str, sep: str) -> bool:
+    # Newlines, quotes and the separator must be the same single bytes as in ASCII
+    # (after the BOM some encodings put first)
+    probe = f'\n"{sep}'
+    try:
+        return len(sep) == 1 and probe.encode(encoding)[len("".encode(encoding)) :] == probe.encode("ascii")
+    except (UnicodeError, LookupError):
+        return False
+
+
+def _quote_counts(data: np.ndarray, sep: int, first: int) -> np.ndarray | None:
+    """
+    Running count of quote bytes at the start of each _SCAN_BLOCK, or None when
+    a quote is not where RFC 4180 puts one. Quoted fields open at the start of a
+    field and close before a separator, a line end or a doubled quote; only then
+    does a newline after an even number of quotes end a record, as it does for
+    the C parser.
+    """
+    size = data.size
+    counts = [0]
+    for start in range(0, size, _SCAN_BLOCK):
+        positions = np.flatnonzero(data[start : start + _SCAN_BLOCK] == _QUOTE) + start
+        closing = (np.arange(positions.size) + counts[-1]) % 2 == 1
+
+        opens = positions[~closing]
+        opens = opens[opens > first]
+        before = data[opens - 1]
+        if not np.isin(before, [sep, ord("\n"), ord("\r"), _QUOTE]).all():
+            return None
+
+        closes = positions[closing]
+        closes = closes[closes < size - 1]
+        after = data[closes + 1]
+        if not np.isin(after, [sep, ord("\n"), ord("\r"), _QUOTE]).all():
+            return None
+
+        counts.append(counts[-1] + positions.size)
+    if counts[-1] % 2:
+        return None  # a quoted field is never closed
+    return np.asarray(counts)
+
+
+def csv_ranges(path: Path, parts: int, *, encoding: str, sep: str) -> list[tuple[int, int]] | None:
+    """
+    Split a CSV file into at most `parts` byte ranges, each made of whole
+    records: every cut is just after a newline outside quoted fields, so
+    quoted values spanning lines stay in one range.
+    Returns [(start, end), ...] covering the file, or None when the file
+    cannot be split safely (quotes outside RFC 4180, non-ASCII-compatible
+    encoding or separator).
+    """
+    if not _ascii_compatible(encoding, sep):
+        return None
+    size = path.stat().st_size
+    if parts < 2 or size == 0:
+        return [(0, size)]
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype="uint8")
+        try:
+            first = 3 if mm[:3] == b"\xef\xbb\xbf" else 0
+            counts = _quote_counts(data, ord(sep), first)
+            if counts is None:
+                return None
+
+            cuts = [0]
+            for i in range(1, parts):
+                pos = max(size * i // parts, cuts[-1])
+                block = pos // _SCAN_BLOCK
+                quotes = int(counts[block]) + int(np.count_nonzero(data[block * _SCAN_BLOCK : pos] == _QUOTE))
+                while True:
+                    newline = mm.find(b"\n", pos)
+                    if newline < 0:
+                        break
+                    quotes += int(np.count_nonzero(data[pos:newline] == _QUOTE))
+                    pos = newline + 1
+                    if quotes % 2 == 0:
+                        break
+                if newline < 0 or pos >= size:
+                    break
+                if pos > cuts[-1]:
+                    cuts.append(pos)
+        finally:
+            del data  # the map cannot close while a view is exported
+
+    cuts.append(size)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _parse_range(path: str, start: int, end: int, encoding: str, sep: str, columns: list | None) -> pd.DataFrame:
+    # Worker side: the first range carries the header, later ones get its column names
+    with open(path, "rb") as f:
+        f.seek(start)
+        raw = io.BytesIO(f.read(end - start))
+    if columns is None:
+        return pd.read_csv(raw, encoding=encoding, sep=sep)
+    try:
+        return pd.read_csv(raw, encoding=encoding, sep=sep, header=None, names=columns)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=columns)
+
+
+def _common_dtypes(parts: list[pd.DataFrame]) -> dict | None:
+    """
+    The dtype a single read_csv gives each column, when it follows from the
+    ranges' dtypes: all equal, or int64 and float64 (float64). Ranges where a
+    column is entirely empty do not vote. Returns None for any other mix.
+    """
+    dtypes = {}
+    for col in parts[0].columns:
+        voting = {part[col].dtype for part in parts if part[col].notna().any()}
+        silent = any(not part[col].notna().any() for part in parts)
+        if not voting:
+            dtypes[col] = parts[0][col].dtype
+            continue
+        if voting == {np.dtype("int64"), np.dtype("float64")}:
+            voting = {np.dtype("float64")}
+        if len(voting) > 1 or voting == {np.dtype(object)}:
+            return None  # mixed values: depend on the parser's internal chunks
+        dtype = voting.pop()
+        if silent and dtype == np.dtype("int64"):
+            dtype = np.dtype("float64")  # the empty cells are NaN
+        elif silent and not (pd.api.types.is_float_dtype(dtype) or pd.api.types.is_string_dtype(dtype)):
+            return None  # e.g. booleans with missing values become object
+        dtypes[col] = dtype
+    return dtypes
+
+
+def read_csv_parallel(path: Path, *, encoding: str, sep: str, workers: int) -> pd.DataFrame | None:
+    """
+    pd.read_csv() with the C engine, parsed in byte ranges on `workers`
+    processes and concatenated in file order.
+    Returns the same frame as a single read_csv (rows, values, dtypes,
+    RangeIndex), or None when that cannot be guaranteed: the file is too
+    small to split, cannot be split safely, or the ranges infer dtypes a
+    single parse would not. Callers then parse it serially.
+    """
+    parts = min(workers, path.stat().st_size // PARALLEL_READ_MIN_BYTES)
+    if parts < 2:
+        return None
+    ranges = csv_ranges(path, parts, encoding=encoding, sep=sep)
+    if ranges is None or len(ranges) < 2:
+        return None
+
+    columns = list(pd.read_csv(path, encoding=encoding, sep=sep, nrows=0).columns)
+    pool = get_pool(workers)
+    futures = [
+        pool.submit(_parse_range, str(path), start, end, encoding, sep, None if i == 0 else columns)
+        for i, (start, end) in enumerate(ranges)
+    ]
+    try:
+        frames = [future.result() for future in futures]
+    except UnicodeDecodeError:
+        raise  # the whole file would not decode either
+    except ValueError:
+        return None  # parser errors: let the serial parse report them
+
+    for frame in frames:
+        if list(frame.columns) != columns or not isinstance(frame.index, pd.RangeIndex):
+            return None  # e.g. rows wider than the header become the index
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+
+    dtypes = _common_dtypes(frames)
+    if dtypes is None:
+        return None
+    for frame in frames:
+        for col, dtype in dtypes.items():
+            if frame[col].dtype != dtype:
+                frame[col] = frame[col].astype(dtype)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _format_shard(shard: pd.DataFrame, header: bool, chunk_rows: int) -> bytes:
+    # Worker side
+    return shard.to_csv(index=False, header=header, chunksize=chunk_rows).encode("utf-8")
+
+
+def write_csv_parallel(df: pd.DataFrame, path: Path, workers: int) -> None:
+    """
+    df.to_csv(path, index=False), with the text formatted in row shards on
+    `workers` processes and written in order. Shards start on to_csv's own
+    block boundaries, so the file is byte for byte the serial one.
+    """
+    chunk_rows = csv_chunk_rows(df)
+    # about four shards per worker keeps them busy and the bytes in flight bounded
+    per_shard = -(-len(df) // (chunk_rows * workers * 4))
+    shard_rows = chunk_rows * max(1, per_shard)
+    starts = range(0, len(df), shard_rows)
+
+    pool = get_pool(workers)
+    pending = []
+    with open(path, "wb") as f:
+        for i, start in enumerate(starts):
+            pending.append(pool.submit(_format_shard, df.iloc[start : start + shard_rows], i == 0, chunk_rows))
+            if len(pending) > 2 * workers:
+                f.write(pending.pop(0).result())
+        for future in pending:
+            f.write(future.result())
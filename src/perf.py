@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _proc_peak() -> int | None:
+    # Linux: VmHWM, which reset_peak_rss() can restart (ru_maxrss may keep older peaks)
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Restart this process's high-water RSS from its current RSS (Linux 4.0+),
+    so a later peak_rss() covers only what ran since. Returns False where the
+    platform cannot do this.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return _proc_peak() is not None
+
+
+def peak_rss() -> int | None:
+    """
+    High-water resident set size of this process in bytes (since the last
+    reset_peak_rss()), or None where the platform does not report it.
+    """
+    peak = _proc_peak()
+    if peak is not None:
+        return peak
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageRecorder:
+    """
+    Wall time, CPU time, peak RSS growth and throughput of each pipeline stage.
+
+    CPU time covers this process only: work sent to the --workers pool shows
+    up in wall time but not in CPU time. Peak RSS is the process high-water
+    mark, so a stage's delta is how far it raised the peak of the whole run
+    (0 when an earlier stage already needed more memory).
+
+    With `profile_dir`, every stage also runs under cProfile and its stats
+    are written to `<profile_dir>/<stage>.prof`. Stages must not be nested.
+    """
+
+    def __init__(self, profile_dir: Path | None = None):
+        self.stages: list[dict] = []
+        self.profile_dir = None if profile_dir is None else Path(profile_dir)
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.peak_since = "run" if reset_peak_rss() else "process"
+        # right after a reset the high-water mark is the resident size the run starts from
+        self._start_rss = peak_rss() if self.peak_since == "run" else None
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None) -> Iterator[dict]:
+        """
+        Measure the body of the `with` block as stage `name`. `rows` is the
+        number of input rows the stage processed; it can also be set on the
+        yielded record once known.
+        """
+        record = {"stage": name, "rows": rows}
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        rss = peak_rss()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            record["peak_rss"] = peak_rss()
+            record["peak_rss_delta"] = None if rss is None else record["peak_rss"] - rss
+            if profiler is not None:
+                path = self.profile_dir / f"{name.replace(' ', '_')}.prof"
+                profiler.dump_stats(path)
+                record["profile"] = str(path)
+            self.stages.append(record)
+
+    def summary(self) -> dict:
+        """
+        JSON-ready performance metrics: one entry per stage plus run totals.
+        """
+        stages = []
+        for record in self.stages:
+            rows, wall = record["rows"], record["wall_s"]
+            entry = {
+                "stage": record["stage"],
+                "rows": rows,
+                "wall_s": round(wall, 4),
+                "cpu_s": round(record["cpu_s"], 4),
+                "peak_rss": record["peak_rss"],
+                "peak_rss_delta": record["peak_rss_delta"],
+                "rows_per_s": round(rows / wall) if rows and wall > 0 else None,
+            }
+            if "profile" in record:
+                entry["profile"] = record["profile"]
+            stages.append(entry)
+
+        peak = peak_rss()
+        return {
+            "stages": stages,
+            "total": {
+                "wall_s": round(time.perf_counter() - self._wall, 4),
+                "cpu_s": round(time.process_time() - self._cpu, 4),
+                "peak_rss": peak,
+                "peak_rss_since": self.peak_since,
+                "start_rss": self._start_rss,
+                "peak_rss_increase": None if self._start_rss is None else peak - self._start_rss,
+            },
+        }
+
+
+def save_performance(performance: dict, path: Path) -> Path:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(performance, f, indent=1)
+    return path
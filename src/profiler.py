@@ -1,33 +1,72 @@
 from __future__ import annotations
 import pandas as pd
 
+from src.column_stats import ColumnStats
+from src.sketches import HyperLogLog
 
-def basic_profile(df: pd.DataFrame) -> dict:
+
+def _sketched_columns(df: pd.DataFrame, fast: dict | None) -> list:
+    # --fast-profile sketches the text columns; numeric columns keep their exact sorted stats
+    if fast is None:
+        return []
+    return [col for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])]
+
+
+def basic_profile(df: pd.DataFrame, stats: ColumnStats | None = None, fast: dict | None = None) -> dict:
     """
     A basic data profile summary.
+    With `fast` (profile_sketch_settings()), text-column unique counts are
+    HyperLogLog estimates; "distinct_error" is their relative standard error.
     """
+    if stats is None:
+        stats = ColumnStats(df)
+    stats.check(df)
+    sketched = _sketched_columns(df, fast)
+    stats.prefetch([col for col in df.columns if col not in sketched])
+
+    missing, unique_counts = {}, {}
+    for col in df.columns:
+        if col in sketched:
+            sketch = stats.sketch(col, fast["precision"], fast["top_k"])
+            missing[col] = sketch["missing"]
+            unique_counts[col] = sketch["nunique"]
+        else:
+            missing[col] = stats.missing(col)
+            unique_counts[col] = stats.nunique(col)
+
     return {
         "rows": df.shape[0],
         "columns": df.shape[1],
         "types": df.dtypes.astype(str).to_dict(),
-        "missing": df.isnull().sum().to_dict(),
-        "unique_counts": df.nunique().to_dict(),
+        "missing": missing,
+        "unique_counts": unique_counts,
+        "estimated_unique": sketched,
+        "distinct_error": HyperLogLog(fast["precision"]).error if sketched else None,
     }
 
 
-def extended_profile(df: pd.DataFrame) -> dict:
+def extended_profile(
+    df: pd.DataFrame,
+    sketch_error: float | None = None,
+    stats: ColumnStats | None = None,
+    fast: dict | None = None,
+) -> dict:
     """
     Extended profile including simple stats and top values.
+    With `sketch_error`, quartiles come from a KLL sketch with that rank error.
+    With `fast`, text-column top values come from a Misra-Gries sketch;
+    "top_values_error" holds how far each share may undercount.
     """
-    profile = basic_profile(df)
+    if stats is None:
+        stats = ColumnStats(df)
+    profile = basic_profile(df, stats, fast)
     extended = {}
+    top_values_error = {}
 
     for col in df.columns:
         if pd.api.types.is_numeric_dtype(df[col]):
-            desc = df[col].describe().to_dict()
-
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
+            desc = stats.describe(col, sketch_error)
+            Q1, Q3 = stats.quantiles(col, [0.25, 0.75], sketch_error)
             IQR = Q3 - Q1
 
             extended[col] = {
@@ -37,13 +76,20 @@ def extended_profile(df: pd.DataFrame) -> dict:
                     float(Q3 + 1.5 * IQR),
                 ),
             }
+        elif fast is not None:
+            frequent = stats.sketch(col, fast["precision"], fast["top_k"])["frequent"]
+            extended[col] = {
+                "top_values": frequent.top(3)
+            }
+            top_values_error[col] = frequent.error / frequent.n if frequent.n else 0.0
         else:
-            top = df[col].value_counts(normalize=True).head(3)
             extended[col] = {
-                "top_values": top.to_dict()
+                "top_values": stats.top_values(col, 3)
             }
 
     profile["extended"] = extended
+    profile["quantile_error"] = sketch_error
+    profile["top_values_error"] = top_values_error
     return profile
 
 
@@ -69,8 +115,11 @@ def print_profile_report(profile: dict) -> None:
 
     # Unique counts
     print("🔢 Unique Values Count:")
+    estimated = profile.get("estimated_unique") or []
+    if estimated:
+        print(f"  (≈ estimated, relative standard error ±{profile['distinct_error'] * 100:.2g}%)")
     for col, cnt in profile["unique_counts"].items():
-        print(f"  - {col}: {cnt}")
+        print(f"  - {col}: {'≈' if col in estimated else ''}{cnt}")
     print()
 
     # Types
@@ -81,6 +130,8 @@ def print_profile_report(profile: dict) -> None:
 
     # Numeric column stats
     print("📈 Numeric Column Statistics:")
+    if profile.get("quantile_error") is not None:
+        print(f"  (quartiles approximate, rank error ≤ ±{profile['quantile_error'] * 100:g}%)")
     for col, details in profile["extended"].items():
         if "numeric_stats" in details:
             stats = details["numeric_stats"]
@@ -91,7 +142,11 @@ def print_profile_report(profile: dict) -> None:
     print("🏷️ Top Categories for Text Columns:")
     for col, details in profile["extended"].items():
         if "top_values" in details:
-            print(f"  - {col}:")
+            error = (profile.get("top_values_error") or {}).get(col)
+            if error is None:
+                print(f"  - {col}:")
+            else:
+                print(f"  - {col} (estimated; shares at most {error * 100:.2g}% low):")
             for value, pct in details["top_values"].items():
                 seen_pct = round(pct * 100, 2)
                 print(f"      {value} — {seen_pct}%")
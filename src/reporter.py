@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from src.dtype_optimizer import format_bytes
+
 
 def generate_report(metrics: dict, config: dict, input_file: str) -> str:
     """
@@ -12,27 +14,161 @@ def generate_report(metrics: dict, config: dict, input_file: str) -> str:
     out_cfg = config.get("outliers", {})
     out_action = out_cfg.get("action", "flag")
     out_method = out_cfg.get("method", "IQR")
+    q_cfg = config.get("quantiles", {}) or {}
+    q_method = metrics.get("quantile_method", q_cfg.get("method", "exact"))
+    q_error = q_cfg.get("error", 0.01)
 
     lines = []
     lines.append("# Data Preprocessing Report\n")
     lines.append(f"**Input file:** {input_file}\n")
 
+    settings = metrics.get("load_settings")
+    if settings:
+        lines.append(
+            f"**CSV settings:** encoding `{settings['encoding']}`, delimiter `{settings['sep']!r}`, "
+            f"BOM {'yes' if settings['bom'] else 'no'}, engine `{settings['engine']}`\n"
+        )
+
     lines.append("## Summary\n")
     lines.append(f"- Rows before: **{metrics['rows_before']}**")
     lines.append(f"- Rows after: **{metrics['rows_after']}**")
     lines.append(f"- Missing handled (cells reduced): **{metrics['missing_handled']}**")
     lines.append(f"- Duplicates removed (rows): **{metrics['duplicates_removed']}**")
     lines.append(f"- Outliers removed (rows): **{metrics['outliers_removed']}**")
-    lines.append(f"- Scaling applied: **{metrics['scaling_applied']}**\n")
+    lines.append(f"- Scaling applied: **{metrics['scaling_applied']}**")
+    if metrics.get("processing_mode"):
+        lines.append(f"- Processing mode: **{metrics['processing_mode']}**")
+    if "cache_reused" in metrics:
+        reused = ", ".join(metrics["cache_reused"]) or "nothing"
+        computed = ", ".join(metrics["cache_computed"]) or "nothing"
+        lines.append(f"- Result cache: reused **{reused}**, computed **{computed}**")
+    lines.append("")
+
+    if metrics.get("incremental"):
+        lines.extend(_incremental_lines(metrics["incremental"]))
+
+    if "memory_before" in metrics:
+        lines.append("## Memory\n")
+        lines.append(f"- In-memory size before dtype optimization: **{format_bytes(metrics['memory_before'])}**")
+        lines.append(f"- In-memory size after dtype optimization: **{format_bytes(metrics['memory_after'])}**\n")
+
+    if metrics.get("performance"):
+        lines.extend(_performance_lines(metrics["performance"], metrics.get("cache_reused", [])))
 
     lines.append("## Configuration Used\n")
     lines.append(f"- Missing numeric strategy: **{num_missing}**")
     lines.append(f"- Missing text strategy: **{txt_missing}**")
     lines.append(f"- Duplicates strategy: **{dup_strategy}**")
-    lines.append(f"- Outliers: **{out_method}** / action: **{out_action}**\n")
+    lines.append(f"- Outliers: **{out_method}** / action: **{out_action}**")
+    if q_method == "sketch":
+        lines.append(f"- Quantiles (median, IQR): **KLL sketch**, rank error ≤ ±{float(q_error) * 100:g}%\n")
+    else:
+        lines.append("- Quantiles (median, IQR): **exact**\n")
 
     lines.append("## Delivered Files\n")
-    lines.append("- `cleaned_data.csv`")
+    lines.append(f"- `{metrics.get('output_file', 'cleaned_data.csv')}`")
     lines.append("- `report.md`\n")
 
     return "\n".join(lines)
+
+
+def _incremental_lines(delta: dict) -> list[str]:
+    totals = delta["totals"]
+    lines = ["## Incremental Run\n"]
+    if delta["full_run"]:
+        lines.append("The whole input was cleaned (first run, changed settings or rewritten input); the output was rewritten.\n")
+    else:
+        lines.append("Only rows appended since the previous run were read; the Summary above counts those rows.\n")
+    if delta["end_row"] > delta["start_row"]:
+        lines.append(f"- Rows read this run: **{delta['end_row'] - delta['start_row']}** "
+                     f"(rows {delta['start_row'] + 1}..{delta['end_row']}, bytes {delta['start_bytes']}..{delta['end_bytes']})")
+    else:
+        lines.append("- Rows read this run: **0** (no complete new lines)")
+    lines.append(f"- Watermark: **{delta['end_row']}** rows / **{delta['end_bytes']}** bytes")
+    lines.append(f"- All runs: **{totals['rows_before']}** rows read, **{totals['rows_after']}** rows in the cleaned output")
+    lines.append(f"- All runs: **{totals['missing_handled']}** missing cells handled, "
+                 f"**{totals['duplicates_removed']}** duplicates and **{totals['outliers_removed']}** outliers removed\n")
+    return lines
+
+
+def _bytes_or_na(value) -> str:
+    return "n/a" if value is None else format_bytes(value)
+
+
+def _performance_lines(performance: dict, cached_stages: list) -> list[str]:
+    total = performance["total"]
+    lines = ["## Performance\n"]
+    peak = f"peak RSS **{_bytes_or_na(total['peak_rss'])}**"
+    if total.get("peak_rss_increase") is not None:
+        peak += (
+            f" (**+{format_bytes(total['peak_rss_increase'])}** over the "
+            f"{format_bytes(total['start_rss'])} resident when the run started)"
+        )
+    lines.append(f"- Total: **{total['wall_s']:.2f}s** wall, **{total['cpu_s']:.2f}s** CPU, {peak}\n")
+    lines.append("| Stage | Rows | Wall (s) | CPU (s) | Rows/s | Peak RSS | Peak RSS increase |")
+    lines.append("|---|---|---|---|---|---|---|")
+    for stage in performance["stages"]:
+        name = stage["stage"] + (" (cached)" if stage["stage"] in cached_stages else "")
+        rows = "" if stage["rows"] is None else stage["rows"]
+        rate = "" if stage["rows_per_s"] is None else f"{stage['rows_per_s']:,}"
+        lines.append(
+            f"| {name} | {rows} | {stage['wall_s']:.3f} | {stage['cpu_s']:.3f} | {rate} "
+            f"| {_bytes_or_na(stage['peak_rss'])} | {_bytes_or_na(stage['peak_rss_delta'])} |"
+        )
+    lines.append("")
+    lines.append("CPU time counts this process only; work on `--workers` processes adds to wall time.")
+    if total.get("peak_rss_since") == "run":
+        lines.append(
+            "Peak RSS counts from the start of this run; memory earlier runs in the same process "
+            "(`--serve`, batch mode) still hold is part of the starting size.\n"
+        )
+    else:
+        lines.append(
+            "Peak RSS is the process's high-water mark since it started: under `--serve` or in batch "
+            "mode it can include earlier jobs run by the same worker.\n"
+        )
+    return lines
+
+
+def generate_batch_summary(results: list[dict]) -> str:
+    """
+    Markdown summary of a batch run: one row of metrics per input file.
+    """
+    ok = [result for result in results if result["status"] == "ok"]
+    failed = [result for result in results if result["status"] != "ok"]
+
+    lines = []
+    lines.append("# Batch Preprocessing Summary\n")
+    lines.append(f"- Files processed: **{len(results)}**")
+    lines.append(f"- Cleaned: **{len(ok)}**")
+    lines.append(f"- Failed: **{len(failed)}**")
+    lines.append(f"- Rows before (all cleaned files): **{sum(r['metrics']['rows_before'] for r in ok)}**")
+    lines.append(f"- Rows after (all cleaned files): **{sum(r['metrics']['rows_after'] for r in ok)}**\n")
+
+    lines.append("## Per-File Metrics\n")
+    lines.append(
+        "| File | Status | Rows before | Rows after | Missing handled | Duplicates removed "
+        "| Outliers removed | Scaling | Seconds | Output |"
+    )
+    lines.append("|---|---|---|---|---|---|---|---|---|---|")
+    for result in results:
+        name = result["file"]
+        seconds = "" if result.get("seconds") is None else result["seconds"]
+        m = result["metrics"]
+        if m is None:
+            lines.append(f"| {name} | failed | | | | | | | {seconds} | {result['output_dir']} |")
+            continue
+        lines.append(
+            f"| {name} | ok | {m['rows_before']} | {m['rows_after']} | {m['missing_handled']} "
+            f"| {m['duplicates_removed']} | {m['outliers_removed']} | {m['scaling_applied']} "
+            f"| {seconds} | {result['output_dir']} |"
+        )
+    lines.append("")
+
+    if failed:
+        lines.append("## Failed Files\n")
+        for result in failed:
+            lines.append(f"- `{result['file']}`: {result['error']} (log: `{result['output_dir']}/log.txt`)")
+        lines.append("")
+
+    return "\n".join(lines)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import hmac
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait as wait_for
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Callable
+from urllib.parse import parse_qs, urlparse
+
+from src.job_protocol import DEFAULT_PORT, MAX_WAIT_S, token_path
+
+# Finished jobs remembered for clients that ask late; older ones are forgotten first
+MAX_FINISHED_JOBS = 1000
+
+
+def _write_token(path: Path) -> str:
+    token = secrets.token_urlsafe(32)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, 0o600)  # an existing file keeps its old mode otherwise
+        os.write(fd, token.encode("ascii"))
+    finally:
+        os.close(fd)
+    return token
+
+
+def _worker_ready(_: int) -> int:
+    return os.getpid()
+
+
+class JobQueue:
+    """
+    Preprocessing jobs run on a pool of long-lived worker processes that
+    keep pandas, the pipeline modules and anything a job imported on demand
+    (e.g. scikit-learn) loaded, so a job costs only its own work. `run_job(argv, cwd)` runs one job in a worker
+    and returns a JSON-ready dict with at least "status".
+
+    If a worker process dies (e.g. out of memory), its jobs are reported
+    failed and a fresh pool takes the next submissions.
+    """
+
+    def __init__(self, run_job: Callable[[list[str], str], dict], workers: int = 1):
+        self.run_job = run_job
+        self.workers = workers
+        self.jobs: dict[str, dict] = {}
+        self.lock = threading.Lock()
+        self.pool = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Start every worker now (before any server thread exists) so no job waits for process startup
+        list(pool.map(_worker_ready, range(self.workers)))
+        return pool
+
+    def submit(self, argv: list[str], cwd: str) -> dict:
+        job = {"id": uuid.uuid4().hex[:12], "argv": argv, "cwd": cwd, "submitted": time.time()}
+        with self.lock:
+            try:
+                job["future"] = self.pool.submit(self.run_job, argv, cwd)
+            except BrokenProcessPool:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._start_pool()
+                job["future"] = self.pool.submit(self.run_job, argv, cwd)
+            self.jobs[job["id"]] = job
+            self._forget_finished()
+        print(f"Job {job['id']} queued: {' '.join(argv)}")
+        job["future"].add_done_callback(lambda _: print(f"Job {job['id']} {self.status(job['id'])['status']}"))
+        return self.status(job["id"])
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job["future"].done()]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def status(self, job_id: str, wait: float | None = None) -> dict | None:
+        """
+        The job's state: queued, running, ok or failed, with the job's result
+        once finished. `wait` blocks up to that many seconds for it to finish.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+
+        future = job["future"]
+        if wait:
+            wait_for([future], timeout=wait)
+
+        state = {"id": job["id"], "argv": job["argv"], "cwd": job["cwd"]}
+        if not future.done():
+            state["status"] = "running" if future.running() else "queued"
+            return state
+        try:
+            state.update(future.result())
+        except Exception as e:
+            # the worker process itself died
+            state.update({"status": "failed", "error": f"{type(e).__name__}: {e}", "log": ""})
+        return state
+
+    def summary(self) -> dict:
+        with self.lock:
+            futures = [job["future"] for job in self.jobs.values()]
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "workers": self.workers,
+            "jobs_active": sum(not future.done() for future in futures),
+            "jobs_known": len(futures),
+        }
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # POST /jobs {"argv": [...], "cwd": "..."}, GET /jobs/<id>?wait=<s>, GET /health
+    # Every request sends Content-Type: application/json (and, over TCP, the server token)
+
+    def _send(self, code: int, body: dict) -> None:
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _refused(self) -> bool:
+        # Browsers add Origin to cross-site requests and cannot send a JSON
+        # body cross-site without a preflight this server never answers
+        if "Origin" in self.headers:
+            self._send(403, {"error": "Requests from web pages are not accepted"})
+        elif self.headers.get_content_type() != "application/json":
+            self._send(415, {"error": "Content-Type must be application/json"})
+        elif self.server.token is not None and not hmac.compare_digest(
+            self.headers.get("Authorization", "").encode(), f"Bearer {self.server.token}".encode()
+        ):
+            self._send(401, {"error": "Missing or wrong job server token"})
+        else:
+            return False
+        return True
+
+    def do_GET(self) -> None:
+        if self._refused():
+            return
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send(200, self.server.queue.summary())
+            return
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._send(404, {"error": f"Unknown path: {url.path}"})
+            return
+        try:
+            wait = min(float(parse_qs(url.query).get("wait", ["0"])[0]), MAX_WAIT_S)
+        except ValueError:
+            self._send(400, {"error": "wait must be a number of seconds"})
+            return
+        state = self.server.queue.status(parts[1], wait=wait)
+        if state is None:
+            self._send(404, {"error": f"Unknown job: {parts[1]}"})
+        else:
+            self._send(200, state)
+
+    def do_POST(self) -> None:
+        if self._refused():
+            return
+        if urlparse(self.path).path != "/jobs":
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            argv, cwd = body["argv"], body.get("cwd") or os.getcwd()
+            if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+                raise ValueError("argv must be a list of strings")
+            if not Path(cwd).is_dir():
+                raise ValueError(f"cwd is not a directory: {cwd}")
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": f"Invalid job: {e}"})
+            return
+        self._send(202, self.server.queue.submit(argv, cwd))
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # the queue prints one line per job instead of one per request
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request, ("local", 0)
+
+
+def serve(
+    run_job: Callable[[list[str], str], dict],
+    *,
+    workers: int = 1,
+    port: int | None = None,
+    socket_path: str | None = None,
+) -> None:
+    """
+    Accept jobs over HTTP on a Unix socket (`socket_path`, readable by this
+    user only) or on 127.0.0.1:`port` (default DEFAULT_PORT), and run up to `workers` of them at once.
+    Over TCP, every request must carry the token written to token_path(port)
+    (readable by this user only). Runs until interrupted.
+    """
+    queue = JobQueue(run_job, workers)
+    token_file = None
+
+    if socket_path is not None:
+        path = Path(socket_path)
+        if path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(path))
+            except OSError:
+                path.unlink()  # left behind by a server that did not shut down
+            else:
+                raise ValueError(f"A job server is already listening on {path}")
+            finally:
+                probe.close()
+        umask = os.umask(0o177)  # socket created rw for this user only
+        try:
+            server = _UnixHTTPServer(str(path), _Handler)
+        finally:
+            os.umask(umask)
+        server.token = None  # the socket's permissions already restrict it to this user
+        where = f"unix socket {path}"
+    else:
+        port = port or DEFAULT_PORT
+        server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        server.daemon_threads = True
+        token_file = token_path(port)
+        server.token = _write_token(token_file)
+        where = f"http://127.0.0.1:{port} (token in {token_file})"
+    server.queue = queue
+
+    print(f"Job server listening on {where} with {workers} worker(s); Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping job server")
+    finally:
+        server.server_close()
+        queue.shutdown()
+        if socket_path is not None:
+            Path(socket_path).unlink(missing_ok=True)
+        if token_file is not None:
+            token_file.unlink(missing_ok=True)
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUANTILE_ERROR = 0.01
+DEFAULT_DISTINCT_PRECISION = 14
+DEFAULT_HEAVY_HITTERS = 64
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (KLL compactors).
+
+    `error` is the target normalized rank error: a reported q-quantile has a
+    true rank within q ± error (with high probability). Memory is O(1 / error)
+    values, independent of how many values were added.
+    While fewer values than the top compactor holds were added, quantiles are
+    exact and interpolate like Series.quantile().
+    """
+
+    _C = 2.0 / 3.0
+
+    def __init__(self, error: float = DEFAULT_QUANTILE_ERROR, seed: int = 0):
+        if not 0 < error < 1:
+            raise ValueError(f"Quantile sketch error must be between 0 and 1, got {error}")
+        self.error = error
+        self.k = max(8, math.ceil(2.5 / error))
+        self.n = 0
+        self.levels: list[np.ndarray] = [np.empty(0, dtype="float64")]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * self._C ** depth))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size <= self._capacity(level):
+                level += 1
+                continue
+
+            items = np.sort(items)
+            if items.size % 2:
+                # keep one item at this level so an even count is compacted
+                keep, items = items[-1:], items[:-1]
+            else:
+                keep = items[:0]
+
+            promoted = items[self._rng.integers(0, 2)::2]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype="float64"))
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # capacities shrink when a level is added, so restart from the bottom
+            level = 0
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += int(values.size)
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype="float64"))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def quantiles(self, qs) -> list[float]:
+        if self.n == 0:
+            return [float("nan") for _ in qs]
+        if self.is_exact:
+            return [float(v) for v in np.quantile(self.levels[0], list(qs))]
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(items.size, 2 ** level, dtype="int64") for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+
+        result = []
+        for q in qs:
+            idx = int(np.searchsorted(cumulative, q * cumulative[-1], side="left"))
+            result.append(float(values[min(idx, values.size - 1)]))
+        return result
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer: spreads every input bit over all 64 output bits
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def _arrow_string_hashes(chunk) -> np.ndarray:
+    # Polynomial hash of each string's UTF-8 bytes, computed on the Arrow buffers
+    # in a few vectorized passes instead of one Python-level hash per value
+    import pyarrow as pa
+
+    chunk = chunk.drop_null().cast(pa.large_string())
+    offsets = np.frombuffer(chunk.buffers()[1], dtype="int64")[chunk.offset : chunk.offset + len(chunk) + 1]
+    data = chunk.buffers()[2]
+    first = int(offsets[0])
+    data = np.frombuffer(data, dtype="uint8")[first : int(offsets[-1])] if data is not None else np.zeros(0, "uint8")
+    lengths = np.diff(offsets)
+    starts = offsets[:-1] - first
+    position = np.arange(data.size, dtype="int64") - np.repeat(starts, lengths)
+
+    with np.errstate(over="ignore"):
+        powers = np.ones(int(lengths.max(initial=0)) + 1, dtype="uint64")
+        for i in range(1, powers.size):
+            powers[i] = powers[i - 1] * np.uint64(0x100000001B3)
+        hashes = np.zeros(lengths.size, dtype="uint64")
+        filled = lengths > 0
+        if filled.any():
+            terms = (data.astype("uint64") + np.uint64(1)) * powers[position]
+            hashes[filled] = np.add.reduceat(terms, starts[filled])
+        hashes ^= lengths.astype("uint64") * np.uint64(0x9E3779B97F4A7C15)
+        return _mix(hashes)
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """
+    64-bit hashes of the non-null values: equal values of the same dtype get
+    equal hashes. Arrow-backed strings (the pandas 3 default) are hashed from
+    their buffers; other dtypes use pandas' hash_pandas_object().
+    """
+    chunked = getattr(values.array, "_pa_array", None)
+    if chunked is not None and pd.api.types.is_string_dtype(values.dtype):
+        hashes = [_arrow_string_hashes(chunk) for chunk in chunked.chunks]
+        return np.concatenate(hashes) if hashes else np.zeros(0, dtype="uint64")
+    values = values.dropna()
+    return pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy()
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch (HyperLogLog with linear counting for
+    small cardinalities).
+
+    Keeps 2 ** precision one-byte registers whatever the number of values;
+    the estimate has a relative standard error of 1.04 / sqrt(2 ** precision)
+    (0.8% at the default precision 14).
+    """
+
+    def __init__(self, precision: int = DEFAULT_DISTINCT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Distinct-count sketch precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype="uint8")
+
+    @property
+    def error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def update(self, values: pd.Series) -> None:
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if hashes.size == 0:
+            return
+        index = (hashes & np.uint64(self.m - 1)).astype("int64")
+        # rank of the first 1-bit in the remaining bits, read through the float exponent
+        # (at most 53 bits, so the conversion is exact)
+        bits = 64 - max(self.precision, 11)
+        rest = (hashes >> np.uint64(64 - bits)).astype("float64")
+        _, exponent = np.frexp(rest)
+        rank = (bits - exponent + 1).astype("uint8")
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge distinct-count sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype("int64"))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class MisraGries:
+    """
+    Mergeable heavy-hitter sketch (Misra-Gries summary) with `k` counters.
+
+    Every value seen more than n / (k + 1) times is kept. A kept value's count
+    is at most `error` below its true count, and `error` <= n / (k + 1).
+    Values are added in batches; each batch's counts are merged into the
+    summary, so memory stays O(k + batch size).
+    """
+
+    def __init__(self, k: int = DEFAULT_HEAVY_HITTERS):
+        if k < 1:
+            raise ValueError(f"Heavy-hitter sketch needs at least 1 counter, got {k}")
+        self.k = k
+        self.n = 0
+        self.error = 0
+        self.counts = pd.Series(dtype="int64")
+
+    def _merge_counts(self, counts: pd.Series, n: int, error: int) -> None:
+        floor = 0
+        if len(counts) > self.k:
+            # values new to the summary at or below the batch's (k + 1)-th largest count
+            # cannot outlast the cut below, which is at least that count
+            floor = int(counts.nlargest(self.k + 1).iloc[-1])
+            counts = counts[(counts > floor).to_numpy() | counts.index.isin(self.counts.index)]
+        combined = self.counts.add(counts, fill_value=0).astype("int64")
+        self.n += n
+        self.error += error
+        if len(combined) > self.k or floor:
+            # subtracting the (k + 1)-th largest count leaves at most k positive counters
+            cut = max(floor, int(combined.nlargest(self.k + 1).iloc[-1]) if len(combined) > self.k else 0)
+            combined = combined[combined > cut] - cut
+            self.error += cut
+        self.counts = combined
+
+    def update(self, values: pd.Series) -> None:
+        """
+        Add a batch of values (missing values are skipped).
+        """
+        self.update_counts(values.value_counts(sort=False))
+
+    def update_counts(self, counts: pd.Series) -> None:
+        """
+        Add a batch already counted: value -> number of occurrences.
+        """
+        if not counts.empty:
+            self._merge_counts(counts, int(counts.sum()), 0)
+
+    def merge(self, other: "MisraGries") -> "MisraGries":
+        self._merge_counts(other.counts, other.n, other.error)
+        return self
+
+    def top(self, n: int) -> dict:
+        """
+        The `n` most frequent values with their estimated share of all values
+        (true share within [share, share + error / n_values]).
+        """
+        if self.n == 0:
+            return {}
+        shares = self.counts.sort_values(ascending=False, kind="stable").head(n) / self.n
+        return {key: float(share) for key, share in shares.items()}
+
+
+def profile_sketch_settings(config: dict, fast: bool = False) -> dict | None:
+    """
+    Read the `profiling` config section.
+    Returns the sketch sizes for fast profiling ({"precision", "top_k"}) when
+    `fast` (--fast-profile) or profiling.fast is set, else None (exact counts).
+    """
+    p_cfg = config.get("profiling", {}) or {}
+    if not (fast or p_cfg.get("fast", False)):
+        return None
+    return {
+        "precision": int(p_cfg.get("distinct_precision", DEFAULT_DISTINCT_PRECISION)),
+        "top_k": int(p_cfg.get("heavy_hitters", DEFAULT_HEAVY_HITTERS)),
+    }
+
+
+def quantile_settings(config: dict) -> tuple[str, float]:
+    """
+    Read the `quantiles` config section.
+    Returns: (method, error) where method is "exact" | "sketch"
+    """
+    q_cfg = config.get("quantiles", {}) or {}
+    method = q_cfg.get("method", "exact")
+    error = q_cfg.get("error", DEFAULT_QUANTILE_ERROR)
+
+    if method not in ("exact", "sketch"):
+        raise ValueError(f"Unsupported quantiles method: {method}. Use 'exact' or 'sketch'.")
+
+    return method, float(error)
+
+
+def quantile_error(config: dict) -> float | None:
+    """
+    Rank error to use for quantiles, or None when they should be exact.
+    """
+    method, error = quantile_settings(config)
+    return error if method == "sketch" else None
+
+
+def sketch_series(series: pd.Series, error: float = DEFAULT_QUANTILE_ERROR) -> KLLSketch:
+    sketch = KLLSketch(error)
+    sketch.update(pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan))
+    return sketch
+
+
+def column_quantiles(series: pd.Series, qs: list[float], error: float | None = None) -> list[float]:
+    """
+    Quantiles of a numeric column: exact when `error` is None,
+    otherwise from a KLL sketch with that rank error.
+    """
+    if error is None:
+        return [float(v) for v in series.quantile(qs)]
+    return sketch_series(series, error).quantiles(qs)
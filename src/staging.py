@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from src.cache import file_fingerprint
+
+# Folder under --output where staged inputs are kept unless staging.dir is set
+DEFAULT_STAGING_DIR = "staged"
+
+# Bumped when the staged file layout changes, so older files are restaged
+_STAGING_VERSION = 1
+
+
+def staging_settings(config: dict, output_dir: Path) -> dict | None:
+    """
+    Read the `staging` config section.
+    Returns load_staged() keyword arguments ({"directory", "verify_hash"}),
+    or None when staging is off.
+    """
+    s_cfg = config.get("staging", {}) or {}
+    if not s_cfg.get("enabled", False):
+        return None
+    return {
+        "directory": Path(s_cfg.get("dir") or Path(output_dir) / DEFAULT_STAGING_DIR),
+        "verify_hash": bool(s_cfg.get("verify_hash", False)),
+    }
+
+
+def _source_state(path: Path) -> dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _staged_paths(directory: Path, input_path: Path, settings) -> tuple[Path, Path]:
+    # one staged file per source path and load settings
+    payload = json.dumps([str(input_path.resolve()), settings], default=str)
+    name = f"{input_path.stem}-{hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()}"
+    return directory / f"{name}.arrow", directory / f"{name}.json"
+
+
+def _read_meta(path: Path) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def load_staged(
+    input_path: Path,
+    load: Callable[[], pd.DataFrame],
+    settings=None,
+    *,
+    directory: Path,
+    verify_hash: bool = False,
+) -> tuple[pd.DataFrame, bool]:
+    """
+    The parsed input, memory-mapped from a staged Arrow IPC file when one
+    matches the source, else `load()` once and stage the result.
+    Returns: (df, reused)
+
+    A staged file is used only when the source's size and mtime (and, with
+    `verify_hash`, its content digest) and the load `settings` are the ones it
+    was staged from. Its columns are read-only views of the mapped file, so
+    several runs on the same input share pages through the OS page cache;
+    pipeline stages that change a column write a new one.
+    """
+    import pyarrow as pa
+
+    arrow_path, meta_path = _staged_paths(directory, input_path, settings)
+    state = _source_state(input_path)
+    meta = _read_meta(meta_path)
+
+    if (
+        meta is not None
+        and meta.get("version") == _STAGING_VERSION
+        and meta.get("source") == state
+        and meta.get("settings") == json.loads(json.dumps(settings, default=str))
+        and (not verify_hash or meta.get("hash") == file_fingerprint(input_path))
+    ):
+        try:
+            table = pa.ipc.open_file(pa.memory_map(str(arrow_path))).read_all()
+        except (OSError, pa.ArrowInvalid):
+            pass  # removed or replaced under us: stage again
+        else:
+            df = table.to_pandas(split_blocks=True)
+            df.attrs.update(meta.get("attrs") or {})
+            return df, True
+
+    df = load()
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        # e.g. a column mixing numbers and text read from Excel
+        print(f"Input not staged (no Arrow equivalent): {e}")
+        return df, False
+
+    directory.mkdir(parents=True, exist_ok=True)
+
+    def write_table(path: Path) -> None:
+        # uncompressed, so later runs map the buffers instead of decoding them
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    def write_meta(path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": _STAGING_VERSION,
+                    "source": state,
+                    "hash": file_fingerprint(input_path),
+                    "settings": settings,
+                    "attrs": df.attrs,
+                },
+                f,
+                default=str,
+            )
+
+    # the data file first: a metadata file always describes a complete staged file
+    _write_atomic(arrow_path, write_table)
+    _write_atomic(meta_path, write_meta)
+    return df, False
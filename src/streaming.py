@@ -0,0 +1,666 @@
+from __future__ import annotations
+
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.cleaner import duplicate_subset
+from src.loader import iter_csv_chunks, iter_excel_chunks, sniff_csv
+from src.perf import StageRecorder
+from src.sketches import KLLSketch, quantile_settings
+from src.writer import open_chunk_writer
+
+
+class _Moments:
+    """
+    Running count / mean / variance / min / max, merged chunk by chunk.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("nan")
+        self.max = float("nan")
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        n = values.size
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+        self.min = float(values.min()) if np.isnan(self.min) else min(self.min, float(values.min()))
+        self.max = float(values.max()) if np.isnan(self.max) else max(self.max, float(values.max()))
+
+    def merge(self, other: "_Moments") -> "_Moments":
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = other.min if np.isnan(self.min) else min(self.min, other.min)
+        self.max = other.max if np.isnan(self.max) else max(self.max, other.max)
+        return self
+
+    @property
+    def std(self) -> float:
+        # population std, like sklearn's StandardScaler
+        return (self.m2 / self.count) ** 0.5 if self.count else float("nan")
+
+
+DEFAULT_DEDUPE_MEMORY_ROWS = 5_000_000
+
+_DEDUPE_STRATEGIES = ("remove", "keep_first", "keep_last")
+
+
+class _DuplicateIndex:
+    """
+    128-bit row keys (of `subset` columns, or whole rows: two 64-bit hashes
+    with different keys) with their row positions. Rows are duplicates only
+    when both hashes match, so distinct rows never collide in practice. Up
+    to `memory_rows` records (24 bytes each) stay in memory; beyond that they
+    are spilled to hash-partitioned files, so resolving needs one partition
+    in memory at a time.
+    """
+
+    _PARTITION_BITS = 6
+    _RECORD = np.dtype([("hash", "<u8"), ("check", "<u8"), ("pos", "<i8")])
+    # SipHash key of the second hash (pandas' default key gives the first)
+    _CHECK_KEY = "dedupe-check-key"
+
+    def __init__(self, subset: list | None = None, memory_rows: int = DEFAULT_DEDUPE_MEMORY_ROWS):
+        self.subset = subset
+        self.memory_rows = memory_rows
+        self.buffer: list[np.ndarray] = []
+        self.buffered = 0
+        self.offset = 0
+        self.spill_dir: tempfile.TemporaryDirectory | None = None
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        keys = chunk[self.subset] if self.subset else chunk
+        records = np.empty(len(chunk), dtype=self._RECORD)
+        records["hash"] = _row_hashes(keys)
+        records["check"] = _row_hashes(keys, self._CHECK_KEY)
+        records["pos"] = np.arange(self.offset, self.offset + len(chunk))
+        self.offset += len(chunk)
+
+        self.buffer.append(records)
+        self.buffered += len(records)
+        if self.buffered > self.memory_rows:
+            self._spill()
+
+    def _partition_path(self, part: int) -> Path:
+        return Path(self.spill_dir.name) / f"part_{part:03d}.bin"
+
+    def _spill(self) -> None:
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.TemporaryDirectory(prefix="dedupe_")
+        records = np.concatenate(self.buffer)
+        self.buffer, self.buffered = [], 0
+
+        parts = records["hash"] >> np.uint64(64 - self._PARTITION_BITS)
+        order = np.argsort(parts, kind="stable")
+        records, parts = records[order], parts[order]
+        edges = np.searchsorted(parts, np.arange((1 << self._PARTITION_BITS) + 1, dtype=np.uint64))
+        for part, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+            if hi > lo:
+                with open(self._partition_path(part), "ab") as f:
+                    records[lo:hi].tofile(f)
+
+    def resolve(self, keep: str) -> np.ndarray:
+        """
+        Sorted positions of the rows to drop, keeping the "first" or "last"
+        occurrence of each key.
+        """
+        if self.spill_dir is None:
+            groups = [np.concatenate(self.buffer)] if self.buffer else []
+        else:
+            if self.buffer:
+                self._spill()
+            groups = (
+                np.fromfile(self._partition_path(part), dtype=self._RECORD)
+                for part in range(1 << self._PARTITION_BITS)
+                if self._partition_path(part).exists()
+            )
+
+        try:
+            dropped = [_dropped_positions(records, keep) for records in groups]
+        finally:
+            if self.spill_dir is not None:
+                self.spill_dir.cleanup()
+                self.spill_dir = None
+            self.buffer, self.buffered = [], 0
+
+        return np.sort(np.concatenate(dropped)) if dropped else np.empty(0, dtype="int64")
+
+
+def _row_hashes(keys: pd.DataFrame, hash_key: str | None = None) -> np.ndarray:
+    # -0.0 == 0.0 for drop_duplicates, but their hashes differ; adding 0.0 turns -0.0 into 0.0
+    floats = [col for col in keys.columns if pd.api.types.is_float_dtype(keys[col])]
+    if floats:
+        keys = keys.copy(deep=False)
+        for col in floats:
+            keys[col] = keys[col] + 0.0
+    if hash_key is None:
+        return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return pd.util.hash_pandas_object(keys, index=False, hash_key=hash_key).to_numpy()
+
+
+def _dropped_positions(records: np.ndarray, keep: str) -> np.ndarray:
+    order = np.lexsort((records["pos"], records["check"], records["hash"]))
+    records = records[order]
+    hashes, checks, positions = records["hash"], records["check"], records["pos"]
+    same = (hashes[1:] == hashes[:-1]) & (checks[1:] == checks[:-1])
+    return positions[1:][same] if keep == "first" else positions[:-1][same]
+
+
+class _DropPositions:
+    """
+    Drops rows by global position (sorted `dropped`) from consecutive chunks.
+    """
+
+    def __init__(self, dropped: np.ndarray | None):
+        self.dropped = dropped if dropped is not None else np.empty(0, dtype="int64")
+        self.offset = 0
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        lo, hi = self.offset, self.offset + len(chunk)
+        self.offset = hi
+        start, stop = np.searchsorted(self.dropped, [lo, hi])
+        if start == stop:
+            return chunk
+        keep = np.ones(len(chunk), dtype=bool)
+        keep[self.dropped[start:stop] - lo] = False
+        return chunk[keep]
+
+
+def _duplicate_positions(
+    filled_chunks: Iterator[pd.DataFrame], dup_cfg: dict, memory_rows: int | None = None
+) -> np.ndarray | None:
+    """
+    Streaming pass over missing-value-filled chunks: positions of duplicate
+    rows to drop under `duplicates.strategy`, or None when duplicates are kept.
+    """
+    strategy = dup_cfg.get("strategy", "remove")
+    if strategy not in _DEDUPE_STRATEGIES:
+        return None
+
+    memory_rows = memory_rows or dup_cfg.get("max_memory_rows") or DEFAULT_DEDUPE_MEMORY_ROWS
+    index = None
+    for chunk in filled_chunks:
+        if index is None:
+            index = _DuplicateIndex(duplicate_subset(dup_cfg, chunk.columns), memory_rows)
+        index.add(chunk)
+    if index is None:
+        return None
+    return index.resolve("last" if strategy == "keep_last" else "first")
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _mode(counts: Counter):
+    if not counts:
+        return None
+    top = max(counts.values())
+    tied = [value for value, count in counts.items() if count == top]
+    try:
+        # Series.mode() returns sorted values; the cleaner takes the first
+        return sorted(tied)[0]
+    except TypeError:
+        return tied[0]
+
+
+def _scan_missing_stats(chunks: Iterator[pd.DataFrame], config: dict, sketch_error: float) -> dict:
+    """
+    First pass: column kinds plus the statistics behind median/mean/mode fills.
+    Mirrors handle_missing_values: statistics come from the rows left by the
+    `drop` columns before each column.
+    """
+    missing_cfg = config.get("missing", {})
+    num_strategy = missing_cfg.get("numeric", {}).get("strategy", "median")
+    txt_strategy = missing_cfg.get("text", {}).get("strategy", "Unknown")
+
+    columns: list = []
+    dtypes: dict = {}
+    numeric_flags: dict = {}
+    sketches: dict = {}
+    moments: dict = {}
+    counts: dict = {}
+    rows = 0
+
+    for chunk in chunks:
+        if not columns:
+            columns = list(chunk.columns)
+        rows += len(chunk)
+        keep = np.ones(len(chunk), dtype=bool)
+        for col in columns:
+            series = chunk[col]
+            is_numeric = pd.api.types.is_numeric_dtype(series)
+            dtypes.setdefault(col, set()).add(str(series.dtype))
+            numeric_flags.setdefault(col, set()).add(is_numeric)
+            present = series[keep]
+
+            if is_numeric:
+                if num_strategy == "median":
+                    sketches.setdefault(col, KLLSketch(sketch_error)).update(_numeric_values(present))
+                elif num_strategy == "mean":
+                    moments.setdefault(col, _Moments()).update(_numeric_values(present))
+                elif num_strategy == "drop":
+                    keep &= series.notna().to_numpy()
+            else:
+                if txt_strategy == "mode":
+                    counts.setdefault(col, Counter()).update(present.dropna().value_counts().to_dict())
+                elif txt_strategy == "drop":
+                    keep &= series.notna().to_numpy()
+
+    numeric_cols = []
+    numeric_dtypes = {}
+    pinned_dtypes = {}
+    consistent = True
+    for col in columns:
+        flags = numeric_flags.get(col, set())
+        if flags == {True}:
+            numeric_cols.append(col)
+            numeric_dtypes[col] = next(iter(dtypes[col]))
+            if len(dtypes[col]) > 1:
+                # e.g. int64 in some chunks, float64 (with NaN) in others
+                pinned_dtypes[col] = "float64"
+                numeric_dtypes[col] = "float64"
+        elif len(dtypes[col]) == 1 and next(iter(dtypes[col])).startswith("datetime64"):
+            # Excel date cells arrive as datetimes in every chunk; keep them
+            continue
+        else:
+            pinned_dtypes[col] = str
+            if True in flags:
+                # some chunks of a text column parsed as numbers
+                consistent = False
+
+    return {
+        "columns": columns,
+        "numeric_cols": numeric_cols,
+        "numeric_dtypes": numeric_dtypes,
+        "dtypes": pinned_dtypes,
+        "consistent": consistent,
+        "rows": rows,
+        "sketches": sketches,
+        "moments": moments,
+        "counts": counts,
+    }
+
+
+def _fill_plan(config: dict, scan: dict) -> dict:
+    """
+    Per-column fill values and drop columns, same rules as handle_missing_values.
+    """
+    missing_cfg = config.get("missing", {})
+    num_cfg = missing_cfg.get("numeric", {})
+    txt_cfg = missing_cfg.get("text", {})
+
+    num_strategy = num_cfg.get("strategy", "median")
+    num_fill_val = num_cfg.get("fill_value", None)
+    txt_strategy = txt_cfg.get("strategy", "Unknown")
+    txt_fill_val = txt_cfg.get("fill_value", "Unknown")
+
+    fill: dict = {}
+    drop: list = []
+
+    for col in scan["columns"]:
+        if col in scan["numeric_cols"]:
+            value = None
+            if num_strategy == "median" and col in scan["sketches"]:
+                value = scan["sketches"][col].quantile(0.5)
+            elif num_strategy == "mean" and col in scan["moments"]:
+                value = scan["moments"][col].mean if scan["moments"][col].count else None
+            elif num_strategy == "zero":
+                value = 0
+            elif num_strategy == "constant" and num_fill_val is not None:
+                value = num_fill_val
+            elif num_strategy == "drop":
+                drop.append(col)
+            if value is not None and not pd.isna(value):
+                fill[col] = value
+        else:
+            if txt_strategy == "mode":
+                mode_val = _mode(scan["counts"].get(col, Counter()))
+                fill[col] = mode_val if mode_val is not None else txt_fill_val
+            elif txt_strategy == "Unknown":
+                fill[col] = "Unknown"
+            elif txt_strategy == "constant":
+                fill[col] = txt_fill_val
+            elif txt_strategy == "drop":
+                drop.append(col)
+
+    return {"fill": fill, "drop": drop}
+
+
+def _apply_missing(chunk: pd.DataFrame, plan: dict) -> tuple[pd.DataFrame, int]:
+    missing_before = int(chunk.isna().sum().sum())
+
+    if plan["drop"]:
+        chunk = chunk.dropna(subset=plan["drop"])
+    for col, value in plan["fill"].items():
+        chunk[col] = chunk[col].fillna(value)
+
+    missing_after = int(chunk.isna().sum().sum())
+    return chunk, max(0, missing_before - missing_after)
+
+
+def _apply_outliers(chunk: pd.DataFrame, bounds: dict, action: str) -> pd.DataFrame:
+    if action == "drop":
+        mask = np.ones(len(chunk), dtype=bool)
+        for col, (lower, upper) in bounds.items():
+            mask &= ((chunk[col] >= lower) & (chunk[col] <= upper)).to_numpy()
+        return chunk[mask]
+    if action == "cap":
+        for col, (lower, upper) in bounds.items():
+            chunk[col] = chunk[col].clip(lower, upper)
+    return chunk
+
+
+def _apply_scaling(chunk: pd.DataFrame, params: dict) -> pd.DataFrame:
+    for col, (offset, scale) in params.items():
+        chunk[col] = (chunk[col] - offset) / scale
+    return chunk
+
+
+def _scaler_params(moments: dict, method: str) -> dict:
+    params = {}
+    for col, m in moments.items():
+        if method == "standard":
+            scale = m.std
+            params[col] = (m.mean, scale if scale else 1.0)
+        elif method == "minmax":
+            data_range = m.max - m.min
+            params[col] = (m.min, data_range if data_range else 1.0)
+    return params
+
+
+def _chunk_source(
+    input_path: str,
+    *,
+    chunksize: int,
+    encoding: str | None,
+    sep: str | None,
+    sheet: str | int | None,
+) -> tuple[dict | None, Callable[..., Iterator[pd.DataFrame]]]:
+    """
+    (CSV load settings or None, chunks(dtype=None) factory) for a CSV or .xlsx input.
+    """
+    if Path(input_path).suffix.lower() == ".xlsx":
+        def excel_chunks(dtype: dict | None = None) -> Iterator[pd.DataFrame]:
+            return iter_excel_chunks(input_path, chunksize=chunksize, sheet=sheet, dtype=dtype)
+
+        return None, excel_chunks
+
+    settings = sniff_csv(input_path, encoding=encoding, sep=sep)
+
+    def csv_chunks(dtype: dict | None = None) -> Iterator[pd.DataFrame]:
+        return iter_csv_chunks(
+            input_path, chunksize=chunksize, encoding=settings["encoding"], sep=settings["sep"], dtype=dtype
+        )
+
+    return {**settings, "engine": "c"}, csv_chunks
+
+
+def run_streaming(
+    input_path: str,
+    output_path: str,
+    config: dict,
+    *,
+    chunksize: int = 100_000,
+    encoding: str | None = None,
+    sep: str | None = None,
+    sheet: str | int | None = None,
+    out_format: str = "csv",
+    learned: dict | None = None,
+    perf: StageRecorder | None = None,
+) -> dict:
+    """
+    Clean a CSV or .xlsx file chunk by chunk with bounded memory.
+    Statistics passes gather fill values, duplicate row positions, IQR bounds
+    and scaler parameters in stage order; a final pass cleans each chunk and
+    appends it to `output_path`.
+    Pass a dict as `learned` to record those parameters (see src/artifact.py)
+    and a StageRecorder as `perf` to time each pass.
+    Returns the same metrics dict as the in-memory pipeline.
+
+    Differences from the in-memory stages: quantiles come from mergeable KLL
+    sketches with the rank error set in the `quantiles` config section
+    (exact for small columns), and IQR bounds for `action: drop` are always
+    computed on one snapshot of the data, as with `execution.vectorized: true`.
+    """
+    settings, chunks = _chunk_source(input_path, chunksize=chunksize, encoding=encoding, sep=sep, sheet=sheet)
+    perf = perf if perf is not None else StageRecorder()
+    _, sketch_error = quantile_settings(config)
+
+    out_cfg = config.get("outliers", {})
+    action = out_cfg.get("action", "flag")
+    method = out_cfg.get("method", "IQR")
+    dup_cfg = config.get("duplicates", {}) or {}
+    dup_strategy = dup_cfg.get("strategy", "remove")
+    scaling = config.get("scaling", {}).get("numeric", "none")
+
+    use_outliers = method == "IQR" and action in ("drop", "cap")
+    use_scaling = scaling in ("standard", "minmax")
+
+    # Pass 1: fill statistics (re-run with pinned dtypes if chunks disagreed)
+    print("Streaming pass: missing-value statistics")
+    with perf.stage("missing statistics") as record:
+        scan = _scan_missing_stats(chunks(), config, sketch_error)
+        record["rows"] = scan["rows"]
+    if not scan["consistent"]:
+        print("Streaming pass: missing-value statistics (dtype-pinned rescan)")
+        with perf.stage("missing statistics rescan", scan["rows"]):
+            scan = _scan_missing_stats(chunks(scan["dtypes"]), config, sketch_error)
+
+    rows = scan["rows"]
+    dtypes = scan["dtypes"] or None
+    numeric_cols = scan["numeric_cols"]
+    plan = _fill_plan(config, scan)
+
+    def filled() -> Iterator[pd.DataFrame]:
+        for chunk in chunks(dtypes):
+            chunk, _ = _apply_missing(chunk, plan)
+            yield chunk
+
+    def prepared() -> Iterator[pd.DataFrame]:
+        return map(_DropPositions(dropped), filled())
+
+    # Pass 2: positions of duplicate rows (hash index, spilled to disk when large)
+    dropped = None
+    if dup_strategy in _DEDUPE_STRATEGIES:
+        print("Streaming pass: duplicate index")
+        with perf.stage("duplicate index", rows):
+            dropped = _duplicate_positions(filled(), dup_cfg)
+
+    bounds: dict = {}
+    scaler_params: dict = {}
+
+    # Pass 3: IQR bounds on filled + deduplicated rows
+    if use_outliers or use_scaling:
+        print("Streaming pass: outlier / scaling statistics")
+        sketches = {col: KLLSketch(sketch_error) for col in numeric_cols} if use_outliers else {}
+        moments = {col: _Moments() for col in numeric_cols} if use_scaling and not use_outliers else {}
+
+        with perf.stage("outlier / scaling statistics", rows):
+            for chunk in prepared():
+                for col in numeric_cols:
+                    values = _numeric_values(chunk[col])
+                    if col in sketches:
+                        sketches[col].update(values)
+                    if col in moments:
+                        moments[col].update(values)
+
+        for col, sketch in sketches.items():
+            q1, q3 = sketch.quantiles([0.25, 0.75])
+            iqr = q3 - q1
+            bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+        if moments:
+            scaler_params = _scaler_params(moments, scaling)
+
+    # Pass 4: scaler parameters on rows left after outlier handling
+    if use_scaling and use_outliers:
+        print("Streaming pass: scaling statistics")
+        moments = {col: _Moments() for col in numeric_cols}
+        with perf.stage("scaling statistics", rows):
+            for chunk in prepared():
+                chunk = _apply_outliers(chunk, bounds, action)
+                for col in numeric_cols:
+                    moments[col].update(_numeric_values(chunk[col]))
+        scaler_params = _scaler_params(moments, scaling)
+
+    params = {
+        "missing": plan,
+        "duplicates": {"strategy": dup_strategy, "subset": duplicate_subset(dup_cfg, scan["columns"])},
+        "outliers": {"action": action, "bounds": bounds},
+        "scaling": {"method": scaling if use_scaling and numeric_cols else "none", "params": scaler_params},
+    }
+    if learned is not None:
+        learned.update(params)
+        learned["schema"] = {
+            "columns": [str(col) for col in scan["columns"]],
+            "numeric": {str(col): scan["numeric_dtypes"][col] for col in numeric_cols},
+        }
+
+    # Final pass: clean and append
+    print("Streaming pass: cleaning and writing")
+    with perf.stage("clean and write", rows):
+        writer = open_chunk_writer(Path(output_path), out_format)
+        metrics = _clean_pass(chunks(dtypes), params, writer, scan["columns"], dropped)
+    metrics["load_settings"] = settings
+    return metrics
+
+
+def apply_artifact(
+    input_path: str,
+    output_path: str,
+    artifact: dict,
+    *,
+    chunksize: int = 100_000,
+    encoding: str | None = None,
+    sep: str | None = None,
+    sheet: str | int | None = None,
+    out_format: str = "csv",
+    perf: StageRecorder | None = None,
+) -> dict:
+    """
+    Clean a CSV or .xlsx file chunk by chunk with the parameters of a fitted pipeline
+    artifact (see src/artifact.py); no statistics are computed from the input.
+    Duplicate removal reads the file twice: once to index row hashes, once to
+    clean. Returns the same metrics dict as run_streaming.
+    """
+    settings, source = _chunk_source(input_path, chunksize=chunksize, encoding=encoding, sep=sep, sheet=sheet)
+    perf = perf if perf is not None else StageRecorder()
+    schema = artifact["schema"]
+    numeric = schema["numeric"]
+    text_dtypes = {col: str for col in schema["columns"] if col not in numeric}
+
+    def chunks() -> Iterator[pd.DataFrame]:
+        for chunk in source(text_dtypes):
+            yield _conform(chunk, schema)
+
+    dropped = None
+    index_record: dict = {}
+    if artifact["duplicates"]["strategy"] in _DEDUPE_STRATEGIES:
+        print("Streaming pass: duplicate index")
+        filled = (_apply_missing(chunk, artifact["missing"])[0] for chunk in chunks())
+        with perf.stage("duplicate index") as index_record:
+            dropped = _duplicate_positions(filled, artifact["duplicates"])
+
+    print("Streaming pass: cleaning and writing")
+    with perf.stage("clean and write") as record:
+        writer = open_chunk_writer(Path(output_path), out_format)
+        metrics = _clean_pass(chunks(), artifact, writer, schema["columns"], dropped)
+        record["rows"] = metrics["rows_before"]
+    # both passes read every row of the input
+    index_record["rows"] = metrics["rows_before"]
+    metrics["load_settings"] = settings
+    return metrics
+
+
+def _conform(chunk: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    # Columns the artifact was fitted on must be present; numeric ones are coerced to their fitted dtype
+    absent = [col for col in schema["columns"] if col not in chunk.columns]
+    if absent:
+        raise ValueError(f"Input is missing columns the pipeline was fitted on: {absent}")
+
+    for col, dtype in schema["numeric"].items():
+        series = chunk[col]
+        if not pd.api.types.is_numeric_dtype(series):
+            series = pd.to_numeric(series, errors="coerce")
+        if pd.api.types.is_float_dtype(np.dtype(dtype)) and series.dtype != dtype:
+            series = series.astype(dtype)
+        chunk[col] = series
+    return chunk
+
+
+def _clean_pass(
+    chunks: Iterator[pd.DataFrame],
+    params: dict,
+    writer,
+    columns: list,
+    dropped: np.ndarray | None = None,
+) -> dict:
+    """
+    Clean each chunk with fitted parameters and append it to `writer`
+    (a chunk writer from src/writer.py).
+    `params` has the missing/duplicates/outliers/scaling sections of an artifact;
+    `dropped` holds the duplicate row positions from _duplicate_positions.
+    """
+    plan = params["missing"]
+    action = params["outliers"]["action"]
+    bounds = params["outliers"]["bounds"]
+    scaler_params = params["scaling"]["params"]
+
+    metrics = {
+        "rows_before": 0,
+        "rows_after": 0,
+        "missing_handled": 0,
+        "duplicates_removed": 0,
+        "outliers_removed": 0,
+        "scaling_applied": params["scaling"]["method"],
+    }
+
+    dedupe = _DropPositions(dropped)
+
+    for chunk in chunks:
+        metrics["rows_before"] += len(chunk)
+
+        chunk, handled = _apply_missing(chunk, plan)
+        metrics["missing_handled"] += handled
+
+        rows = len(chunk)
+        chunk = dedupe(chunk)
+        metrics["duplicates_removed"] += rows - len(chunk)
+
+        if bounds:
+            rows = len(chunk)
+            chunk = _apply_outliers(chunk, bounds, action)
+            if action == "drop":
+                metrics["outliers_removed"] += rows - len(chunk)
+
+        if scaler_params:
+            chunk = _apply_scaling(chunk, scaler_params)
+
+        writer.write(chunk)
+        metrics["rows_after"] += len(chunk)
+
+    writer.close(columns)
+    return metrics
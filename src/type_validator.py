@@ -1,35 +1,200 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from functools import partial
+from typing import Callable
+
+import numpy as np
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from src.column_stats import ColumnStats
+from src.parallel import map_columns
+from src.sketches import HyperLogLog
+
+
+DEFAULT_SAMPLE_SIZE = 1000
+
+# Confidence for sample-based decisions: a ratio is "clearly" above or below
+# a threshold when the Hoeffding margin at this failure rate does not cross it.
+_DECISION_DELTA = 0.001
+
+_NUMERIC_THRESHOLD = 0.7
+_DATETIME_THRESHOLD = 0.6
+
+
+def stratified_sample(series: pd.Series, size: int, strata: int = 10, seed: int = 0) -> pd.Series:
+    """
+    Up to `size` rows drawn evenly from `strata` contiguous blocks of the column,
+    so values from the start, middle and end of the file are all represented.
+    """
+    n = len(series)
+    if n <= size:
+        return series
+
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(0, n, strata + 1).astype(np.int64)
+    per_stratum = max(1, size // strata)
+
+    positions = [
+        lo + rng.choice(hi - lo, size=min(per_stratum, hi - lo), replace=False)
+        for lo, hi in zip(edges[:-1], edges[1:])
+        if hi > lo
+    ]
+    return series.iloc[np.sort(np.concatenate(positions))]
+
+
+def detect_datetime_format(values: pd.Series, max_values: int = 50) -> str | None:
+    """
+    Most common strftime format guessed from a few distinct values, or None.
+    """
+    candidates = stratified_sample(values.dropna(), DEFAULT_SAMPLE_SIZE)
+    candidates = candidates.astype(str).drop_duplicates().head(max_values)
+    guesses = Counter(fmt for fmt in map(guess_datetime_format, candidates) if fmt)
+    if not guesses:
+        return None
+    return guesses.most_common(1)[0][0]
+
+
+def parse_datetime(series: pd.Series, fmt: str | None = None) -> pd.Series:
+    """
+    Fixed-format datetime conversion when a format was detected,
+    otherwise per-value parsing. Unparsable values become NaT.
+    """
+    if fmt is not None:
+        return pd.to_datetime(series, format=fmt, errors="coerce")
+    return pd.to_datetime(series, format="mixed", errors="coerce")
 
 
-def infer_column_types(df: pd.DataFrame) -> dict:
+def _settled(ratio: float, sample_rows: int, threshold: float) -> bool:
+    # True when the sample clearly rules the type in or out
+    margin = math.sqrt(math.log(2 / _DECISION_DELTA) / (2 * sample_rows))
+    return ratio - margin > threshold or ratio + margin < threshold
+
+
+def _is_textual(series: pd.Series) -> bool:
+    return not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series))
+
+
+def _parse_ratios(
+    series: pd.Series,
+    parsable: Callable[..., int],
+    sample_size: int | None,
+    exact: bool,
+) -> dict:
+    """
+    Numeric / datetime parse ratios of one column, sample first where allowed.
+    `parsable(kind, fmt)` counts parsable values over the full column.
+    """
+    total_rows = len(series)
+    textual = _is_textual(series)
+    use_sample = textual and not exact and sample_size is not None and total_rows > sample_size
+    sample = stratified_sample(series, sample_size) if use_sample else None
+    sampled = False
+    fmt = detect_datetime_format(sample if sample is not None else series) if textual else None
+
+    # Try numeric conversion
+    numeric_ratio = None
+    if sample is not None:
+        ratio = pd.to_numeric(sample, errors="coerce").notna().mean()
+        if _settled(ratio, len(sample), _NUMERIC_THRESHOLD):
+            numeric_ratio, sampled = float(ratio), True
+    if numeric_ratio is None:
+        numeric_valid = parsable("numeric", None)
+        numeric_ratio = numeric_valid / total_rows if total_rows > 0 else 0
+
+    # Try datetime conversion (skipped once a sample clearly rules numeric in)
+    datetime_skipped = sampled and numeric_ratio > _NUMERIC_THRESHOLD
+    datetime_ratio = None
+    if sample is not None and not datetime_skipped:
+        ratio = parse_datetime(sample, fmt).notna().mean()
+        if _settled(ratio, len(sample), _DATETIME_THRESHOLD):
+            datetime_ratio, sampled = float(ratio), True
+    if datetime_ratio is None and not datetime_skipped:
+        datetime_valid = parsable("datetime", fmt)
+        datetime_ratio = datetime_valid / total_rows if total_rows > 0 else 0
+
+    return {
+        "numeric_ratio": numeric_ratio,
+        "datetime_ratio": datetime_ratio,
+        "datetime_format": fmt,
+        "sampled_rows": len(sample) if sampled else None,
+    }
+
+
+def _parse_ratios_task(series: pd.Series, sample_size: int | None, exact: bool, with_entry: bool) -> tuple:
+    # Worker side of infer_column_types(workers > 1). with_entry also returns the
+    # column's ColumnStats entry, so the column goes to the pool only once
+    local = ColumnStats(series.to_frame())
+    ratios = _parse_ratios(series, partial(local.parsable_count, series.name), sample_size, exact)
+    return ratios, local.entries([series.name]) if with_entry else {}
+
+
+def infer_column_types(
+    df: pd.DataFrame,
+    stats: ColumnStats | None = None,
+    *,
+    sample_size: int | None = DEFAULT_SAMPLE_SIZE,
+    exact: bool = False,
+    fast: dict | None = None,
+) -> dict:
     """
     Infer and validate column types.
+    Pass a shared ColumnStats to reuse missing/unique counts across modules;
+    its `workers` setting also spreads the text-column parse checks over a
+    process pool.
+
+    Text columns are first checked on a stratified sample of `sample_size`
+    rows; a parse ratio is only recomputed on the full column when the sample
+    is too close to the decision threshold. A datetime format is detected per
+    column and cached in the report ("datetime_format") so full conversions
+    use the fixed-format parser. exact=True (or sample_size=None) computes
+    every ratio on the full column. With `fast` (profile_sketch_settings()),
+    text-column uniqueness is a HyperLogLog estimate whose relative standard
+    error is reported as "uniqueness_error_%".
     Returns a structured report dictionary.
     """
     report = {}
+    if stats is None:
+        stats = ColumnStats(df)
+    stats.check(df)
+    sketched = [] if fast is None else [col for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])]
+    distinct_error = HyperLogLog(fast["precision"]).error if sketched else None
 
     total_rows = len(df)
 
+    # With a pool, text columns get their stats entries from the parse-check tasks
+    pooled = [col for col in df.columns if _is_textual(df[col])] if stats.workers > 1 else []
+    stats.prefetch([col for col in df.columns if col not in sketched and col not in pooled])
+    needed = set(stats.pending([col for col in pooled if col not in sketched]))
+    results = map_columns(
+        _parse_ratios_task,
+        {col: (df[col], sample_size, exact, col in needed) for col in pooled},
+        stats.workers,
+    )
+    ratios = {col: parsed for col, (parsed, _) in results.items()}
+    for _, entries in results.values():
+        stats.adopt(entries)
+
     for col in df.columns:
-        series = df[col]
         col_report = {}
 
+        sketch = stats.sketch(col, fast["precision"], fast["top_k"]) if col in sketched else None
+
         # Missing values
-        missing_count = series.isna().sum()
+        missing_count = stats.missing(col) if sketch is None else sketch["missing"]
         missing_ratio = missing_count / total_rows if total_rows > 0 else 0
 
-        # Try numeric conversion
-        numeric_converted = pd.to_numeric(series, errors="coerce")
-        numeric_valid = numeric_converted.notna().sum()
-        numeric_ratio = numeric_valid / total_rows if total_rows > 0 else 0
-
-        # Try datetime conversion
-        datetime_converted = pd.to_datetime(series, errors="coerce")
-        datetime_valid = datetime_converted.notna().sum()
-        datetime_ratio = datetime_valid / total_rows if total_rows > 0 else 0
+        # Numeric / datetime parse checks
+        parsed = ratios.get(col)
+        if parsed is None:
+            parsed = _parse_ratios(df[col], partial(stats.parsable_count, col), sample_size, exact)
+        numeric_ratio = parsed["numeric_ratio"]
+        datetime_ratio = parsed["datetime_ratio"]
 
         # Uniqueness
-        unique_count = series.nunique(dropna=True)
+        unique_count = stats.nunique(col) if sketch is None else sketch["nunique"]
         uniqueness_ratio = unique_count / total_rows if total_rows > 0 else 0
 
         # Decide detected type
@@ -37,10 +202,10 @@ def infer_column_types(df: pd.DataFrame) -> dict:
         suggestion = "keep as text"
         notes = []
 
-        if numeric_ratio > 0.7:
+        if numeric_ratio > _NUMERIC_THRESHOLD:
             detected_type = "numeric"
             suggestion = "convert to numeric"
-        elif datetime_ratio > 0.6:
+        elif datetime_ratio is not None and datetime_ratio > _DATETIME_THRESHOLD:
             detected_type = "datetime"
             suggestion = "parse as datetime"
 
@@ -52,9 +217,13 @@ def infer_column_types(df: pd.DataFrame) -> dict:
 
         col_report["detected_type"] = detected_type
         col_report["numeric_parsable_%"] = round(numeric_ratio * 100, 2)
-        col_report["datetime_parsable_%"] = round(datetime_ratio * 100, 2)
+        col_report["datetime_parsable_%"] = None if datetime_ratio is None else round(datetime_ratio * 100, 2)
+        col_report["datetime_format"] = parsed["datetime_format"]
+        col_report["sampled_rows"] = parsed["sampled_rows"]
         col_report["missing_%"] = round(missing_ratio * 100, 2)
         col_report["uniqueness_%"] = round(uniqueness_ratio * 100, 2)
+        if sketch is not None:
+            col_report["uniqueness_error_%"] = round(distinct_error * 100, 2)
         col_report["suggested_action"] = suggestion
         col_report["notes"] = notes
 
@@ -74,9 +243,19 @@ def print_type_validation_report(type_report: dict) -> None:
         print("-" * (8 + len(col)))
         print(f"Detected type: {info['detected_type']}")
         print(f"Numeric parsable: {info['numeric_parsable_%']}%")
-        print(f"Datetime parsable: {info['datetime_parsable_%']}%")
+        if info.get("datetime_parsable_%") is None:
+            print("Datetime parsable: skipped (numeric ruled in)")
+        else:
+            print(f"Datetime parsable: {info['datetime_parsable_%']}%")
+        if info.get("datetime_format"):
+            print(f"Datetime format: {info['datetime_format']}")
+        if info.get("sampled_rows"):
+            print(f"Estimated from a stratified sample of {info['sampled_rows']} rows")
         print(f"Missing values: {info['missing_%']}%")
-        print(f"Uniqueness: {info['uniqueness_%']}%")
+        if info.get("uniqueness_error_%") is None:
+            print(f"Uniqueness: {info['uniqueness_%']}%")
+        else:
+            print(f"Uniqueness: ≈{info['uniqueness_%']}% (estimated, ±{info['uniqueness_error_%']}% relative)")
         print(f"Suggested action: {info['suggested_action']}")
 
         if info["notes"]:
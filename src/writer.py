@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import re
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.parallel_csv import PARALLEL_WRITE_MIN_ROWS, csv_chunk_rows, write_csv_parallel
+
+OUTPUT_FORMATS = ["csv", "xlsx", "parquet", "feather"]
+
+# File extension per output format
+_EXTENSIONS = {"csv": ".csv", "xlsx": ".xlsx", "parquet": ".parquet", "feather": ".feather"}
+
+# Rows per worksheet in .xlsx (including the header row)
+EXCEL_MAX_ROWS = 1_048_576
+
+# Formats that can be written chunk by chunk (--streaming / --apply)
+CHUNKED_FORMATS = ["csv", "xlsx"]
+
+_XLSX_BATCH_ROWS = 50_000
+
+
+def output_path(output_dir: Path, out_format: str, stem: str = "cleaned_data") -> Path:
+    if out_format not in _EXTENSIONS:
+        raise ValueError(f"Unsupported output format: {out_format}. Use one of {OUTPUT_FORMATS}.")
+    return output_dir / f"{stem}{_EXTENSIONS[out_format]}"
+
+
+def save_data(
+    df: pd.DataFrame,
+    path: Path,
+    out_format: str,
+    *,
+    compression: str | None = None,
+    row_group_size: int | None = None,
+    workers: int = 1,
+) -> Path:
+    """
+    Write the cleaned frame in the requested format.
+    Parquet and Feather keep numeric, categorical and datetime dtypes.
+    xlsx goes through the write-only XlsxChunkWriter (new sheet every
+    EXCEL_MAX_ROWS rows).
+    `compression`: parquet snappy|zstd|gzip|brotli|none, feather lz4|zstd|none
+    (None = format default). `row_group_size` sets Parquet row groups / Feather
+    record batches.
+    csv with `workers` > 1 formats large frames in row shards on that many
+    processes (same bytes as one to_csv).
+    """
+    if out_format == "csv":
+        if workers > 1 and len(df) >= PARALLEL_WRITE_MIN_ROWS:
+            write_csv_parallel(df, path, workers)
+        else:
+            df.to_csv(path, index=False, chunksize=csv_chunk_rows(df))
+    elif out_format == "xlsx":
+        writer = XlsxChunkWriter(path)
+        for start in range(0, len(df), _XLSX_BATCH_ROWS):
+            writer.write(df.iloc[start : start + _XLSX_BATCH_ROWS])
+        writer.close(list(df.columns))
+    elif out_format == "parquet":
+        _require_pyarrow(out_format)
+        df.to_parquet(
+            path,
+            index=False,
+            compression=None if compression == "none" else (compression or "snappy"),
+            row_group_size=row_group_size,
+        )
+    elif out_format == "feather":
+        _require_pyarrow(out_format)
+        df.reset_index(drop=True).to_feather(
+            path,
+            compression="uncompressed" if compression == "none" else compression,
+            chunksize=row_group_size,
+        )
+    else:
+        raise ValueError(f"Unsupported output format: {out_format}. Use one of {OUTPUT_FORMATS}.")
+
+    return path
+
+
+def _require_pyarrow(fmt: str) -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError(f"Writing {fmt} requires pyarrow (pip install pyarrow).")
+
+
+class CsvChunkWriter:
+    """
+    Appends DataFrame chunks to one CSV file, header written once.
+    append=True continues an existing file (its header is already written).
+    """
+
+    def __init__(self, path: Path, append: bool = False):
+        self.path = Path(path)
+        self.wrote_header = append
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.path, index=False, mode="a" if self.wrote_header else "w", header=not self.wrote_header)
+        self.wrote_header = True
+
+    def close(self, columns: list) -> None:
+        if not self.wrote_header:
+            pd.DataFrame(columns=columns).to_csv(self.path, index=False)
+
+
+_XLSX_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_XLSX_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XLSX_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XLSX_EPOCH = pd.Timestamp("1899-12-30")
+# Characters XML 1.0 cannot carry at all: C0 controls other than tab and line
+# ends, and U+FFFE/U+FFFF. Written as literal characters: Arrow's regex engine
+# has no \u escapes
+_XML_ILLEGAL = "[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]"
+# Lone surrogates are not UTF-8 either; only Python strings (object columns) can hold them
+_SURROGATES = re.compile("[\ud800-\udfff]")
+
+
+def _text(values: pd.Series) -> pd.Series:
+    # values.astype(str), with lone surrogates dropped first
+    if values.dtype == object:
+        values = values.map(lambda v: _SURROGATES.sub("", str(v)))
+    return values.astype(str)
+
+
+def _xml_text(values: pd.Series) -> pd.Series:
+    values = values.str.replace(_XML_ILLEGAL, "", regex=True)
+    values = values.str.replace("&", "&amp;").str.replace("<", "&lt;").str.replace(">", "&gt;")
+    # a literal CR would be read back as LF
+    return values.str.replace("\r", "&#13;")
+
+
+def _xlsx_text_cells(values: pd.Series) -> pd.Series:
+    return '<c t="inlineStr"><is><t xml:space="preserve">' + _xml_text(values) + "</t></is></c>"
+
+
+def _xlsx_number_cells(text: pd.Series, numbers: np.ndarray) -> np.ndarray:
+    # +-inf are written as text, like to_excel's default inf_rep
+    return np.where(
+        np.isinf(numbers),
+        _xlsx_text_cells(text).to_numpy(dtype=object),
+        ("<c><v>" + text + "</v></c>").to_numpy(dtype=object),
+    )
+
+
+def _xlsx_cells(series: pd.Series) -> list:
+    """
+    One <c> element per value of a column, built with column-wide string
+    operations. Missing values become empty cells, like to_excel.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = pd.Series(np.asarray(series), index=series.index)
+    missing = series.isna().to_numpy()
+
+    if pd.api.types.is_bool_dtype(series):
+        cells = np.where(series.to_numpy(dtype=bool), '<c t="b"><v>1</v></c>', '<c t="b"><v>0</v></c>')
+    elif pd.api.types.is_numeric_dtype(series):
+        cells = _xlsx_number_cells(series.astype(str), series.to_numpy(dtype="float64", na_value=np.nan))
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dtype, "tz", None) is not None:
+            raise ValueError("Excel does not support datetimes with timezones; convert them to naive datetimes first.")
+        serial = (series - _XLSX_EPOCH) / pd.Timedelta(days=1)
+        cells = ('<c s="1"><v>' + serial.astype(str) + "</v></c>").to_numpy(dtype=object)
+    else:
+        # text, or a mixed object column where numbers and booleans keep their type and anything else becomes text
+        text = _text(series)
+        cells = _xlsx_text_cells(text).to_numpy(dtype=object)
+        if pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+            is_number = series.map(
+                lambda v: isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_))
+            ).to_numpy(dtype=bool)
+            if is_number.any():
+                numbers = pd.to_numeric(series[is_number]).to_numpy(dtype="float64")
+                cells[is_number] = _xlsx_number_cells(text[is_number], numbers)
+            is_bool = series.map(lambda v: isinstance(v, (bool, np.bool_))).to_numpy(dtype=bool)
+            if is_bool.any():
+                cells[is_bool] = np.where(series[is_bool].to_numpy(dtype=bool), '<c t="b"><v>1</v></c>', '<c t="b"><v>0</v></c>')
+
+    cells = np.array(cells, dtype=object)
+    cells[missing] = "<c/>"
+    return cells.tolist()
+
+
+class XlsxChunkWriter:
+    """
+    Appends DataFrame chunks to an .xlsx workbook, write-only: each chunk's
+    rows are rendered as SpreadsheetML and streamed into the zip entry of the
+    current sheet, so memory stays flat as the workbook grows and no per-cell
+    objects are created. Strings are written inline (no shared-string table).
+    A new sheet (Sheet2, Sheet3, ...) with the header repeated starts whenever
+    a sheet reaches `max_rows` rows.
+    """
+
+    def __init__(self, path: Path, max_rows: int = EXCEL_MAX_ROWS):
+        if max_rows < 2:
+            raise ValueError("max_rows must leave room for a header and at least one data row.")
+        self.path = Path(path)
+        self.max_rows = max_rows
+        # Fast deflate level: the XML is very repetitive, so level 1 already compresses well
+        self.zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+        self.sheet = None
+        self.sheets = 0
+        self.sheet_rows = 0
+
+    def _new_sheet(self, columns: list) -> None:
+        self._end_sheet()
+        if len(columns) > 16_384:
+            raise ValueError(f"Excel sheets hold at most 16384 columns, got {len(columns)}.")
+        self.sheets += 1
+        self.sheet = self.zip.open(f"xl/worksheets/sheet{self.sheets}.xml", "w", force_zip64=True)
+        header = "".join(_xlsx_text_cells(_text(pd.Series(columns, dtype=object))))
+        self.sheet.write(
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<worksheet xmlns="{_XLSX_NS}"><sheetData><row>{header}</row>'.encode("utf-8")
+        )
+        self.sheet_rows = 1
+
+    def _end_sheet(self) -> None:
+        if self.sheet is not None:
+            self.sheet.write(b"</sheetData></worksheet>")
+            self.sheet.close()
+            self.sheet = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        start = 0
+        while start < len(df):
+            if self.sheet is None or self.sheet_rows >= self.max_rows:
+                self._new_sheet(list(df.columns))
+            part = df.iloc[start : start + self.max_rows - self.sheet_rows]
+            columns = [_xlsx_cells(part.iloc[:, i]) for i in range(part.shape[1])]
+            rows = ["<row>" + "".join(cells) + "</row>" for cells in zip(*columns)] if columns else ["<row/>"] * len(part)
+            self.sheet.write("".join(rows).encode("utf-8"))
+            self.sheet_rows += len(part)
+            start += len(part)
+
+    def close(self, columns: list) -> None:
+        if self.sheets == 0:
+            self._new_sheet(columns)
+        self._end_sheet()
+
+        sheets = range(1, self.sheets + 1)
+        self.zip.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + "".join(
+                f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for n in sheets
+            )
+            + "</Types>",
+        )
+        self.zip.writestr(
+            "_rels/.rels",
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{_XLSX_PKG_REL_NS}">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>',
+        )
+        self.zip.writestr(
+            "xl/workbook.xml",
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{_XLSX_NS}" xmlns:r="{_XLSX_REL_NS}"><sheets>'
+            + "".join(f'<sheet name="Sheet{n}" sheetId="{n}" r:id="rId{n}"/>' for n in sheets)
+            + "</sheets></workbook>",
+        )
+        self.zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{_XLSX_PKG_REL_NS}">'
+            + "".join(
+                f'<Relationship Id="rId{n}" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{n}.xml"/>'
+                for n in sheets
+            )
+            + f'<Relationship Id="rId{self.sheets + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>',
+        )
+        # Style 1: the datetime format to_excel uses
+        self.zip.writestr(
+            "xl/styles.xml",
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<styleSheet xmlns="{_XLSX_NS}">'
+            '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            "</styleSheet>",
+        )
+        self.zip.close()
+
+
+def open_chunk_writer(path: Path, out_format: str):
+    """
+    CsvChunkWriter or XlsxChunkWriter for `out_format`.
+    """
+    if out_format == "csv":
+        return CsvChunkWriter(path)
+    if out_format == "xlsx":
+        return XlsxChunkWriter(path)
+    raise ValueError(f"Chunked output supports {CHUNKED_FORMATS}, not {out_format}.")